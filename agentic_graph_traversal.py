@@ -2,23 +2,68 @@
 Agentic Graph Traversal Agent with timeout handling and performance improvements.
 """
 
-from typing import List, Dict, Tuple, Any, Optional, Set
+from typing import List, Dict, Tuple, Any, Optional, Set, Iterable, Iterator, Deque
 from neo4j import GraphDatabase
 from config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
 from vulnerability_scanner import get_vulnerable_packages
+from llm_cache import LLMResponseCache
 import json
-import re
-from dataclasses import dataclass, field
-from heapq import heappush, heappop
+import hashlib
+import queue
+import threading
+from dataclasses import dataclass, field, fields
+from collections import OrderedDict, deque
+from itertools import islice
 import openai
 import os
 from datetime import datetime
 from enum import Enum
 import asyncio
 import aiohttp
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
 import time
-import pickle
+
+
+# Lines of source shown on each side of an import site in code contexts
+CODE_CONTEXT_WINDOW = 2
+# Per-line and total character caps for a formatted code context
+CODE_CONTEXT_LINE_CHARS = 80
+CODE_CONTEXT_MAX_CHARS = 400
+# Formatted code contexts kept for sharing, least recently used evicted first
+CODE_CONTEXT_CACHE_SIZE = 10000
+
+# Completion budget for neighbor analyses: tokens per JSON result plus the wrapper
+TOKENS_PER_NEIGHBOR_RESULT = 80
+RESPONSE_OVERHEAD_TOKENS = 50
+
+# Structured output schema for neighbor analyses, enforced server-side by OpenAI
+NEIGHBOR_ANALYSIS_SCHEMA = {
+    "name": "neighbor_analysis",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "node": {"type": "integer"},
+                        "index": {"type": "integer"},
+                        "priority_score": {"type": "integer"},
+                        "reasoning": {"type": "string"},
+                        "risk_category": {"type": "string", "enum": ["LOW", "MEDIUM", "HIGH", "CRITICAL"]},
+                        "should_explore": {"type": "boolean"}
+                    },
+                    "required": ["node", "index", "priority_score", "reasoning",
+                                 "risk_category", "should_explore"],
+                    "additionalProperties": False
+                }
+            }
+        },
+        "required": ["results"],
+        "additionalProperties": False
+    }
+}
 
 
 class TraversalDecision(Enum):
@@ -51,65 +96,378 @@ class VulnerableNode:
     parent_file: Optional[str] = None
     decision: TraversalDecision = TraversalDecision.EXPLORED
     decision_rationale: str = ""
-    analyzed_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    analyzed_at: str = ""  # Set when the node is popped for analysis
+    
+    def __post_init__(self):
+        self._visit_key = self.make_visit_key(self.package_name, self.file_path)
+    
+    @staticmethod
+    def make_visit_key(package_name: str, file_path: str) -> bytes:
+        """Fixed-size digest of (package, file), so visited checks hash 16 bytes
+        instead of re-hashing two (possibly long) strings each time."""
+        return hashlib.blake2b(f"{package_name}\0{file_path}".encode(), digest_size=16).digest()
+    
+    @property
+    def visit_key(self) -> bytes:
+        """Key identifying this (package, file) pair in TraversalState.visited."""
+        return self._visit_key
+    
+    @property
+    def advisories_key(self) -> str:
+        """Key shared by every node of the same package version (and its advisories)."""
+        return f"{self.package_name}=={self.version}"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for checkpointing.
+        
+        code_context is reloaded from Neo4j on resume and advisories are journaled
+        once per package version, so neither is repeated in every node record.
+        """
+        data = {f.name: getattr(self, f.name) for f in fields(self)
+                if f.name not in ("code_context", "advisories")}
+        data["decision"] = self.decision.value
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], advisories: List[Dict[str, Any]]) -> "VulnerableNode":
+        """Rebuild a node from its checkpoint form."""
+        return cls(**dict(data, code_context="", advisories=advisories,
+                          decision=TraversalDecision(data["decision"])))
+
+
+class BucketQueue:
+    """Max-priority queue of nodes keyed by priority score quantized to 0.1.
+    
+    Scores live in 0-10, so nodes are kept in 101 FIFO buckets and push/pop are
+    O(1) instead of O(log N) Python-level comparisons on a heap. A node whose
+    visit_key is already queued is not queued again.
+    """
+    
+    RESOLUTION = 10  # Buckets per score point
+    
+    def __init__(self, nodes: Iterable[VulnerableNode] = ()):
+        self._buckets = [deque() for _ in range(10 * self.RESOLUTION + 1)]
+        self._top = -1  # Highest bucket that may be non-empty
+        self._size = 0
+        self._pending: Set[bytes] = set()  # visit_keys of queued nodes
+        for node in nodes:
+            self.push(node)
+    
+    def push(self, node: VulnerableNode) -> bool:
+        """Add a node to the bucket for its priority score, unless it is already queued."""
+        if node.visit_key in self._pending:
+            return False
+        self._pending.add(node.visit_key)
+        index = min(max(int(node.priority_score * self.RESOLUTION), 0), len(self._buckets) - 1)
+        self._buckets[index].append(node)
+        self._top = max(self._top, index)
+        self._size += 1
+        return True
+    
+    def pop(self) -> VulnerableNode:
+        """Remove and return a node with the highest priority score."""
+        if not self._size:
+            raise IndexError("pop from empty BucketQueue")
+        while not self._buckets[self._top]:
+            self._top -= 1
+        self._size -= 1
+        node = self._buckets[self._top].popleft()
+        self._pending.discard(node.visit_key)
+        return node
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __contains__(self, visit_key: bytes) -> bool:
+        return visit_key in self._pending
     
-    def __lt__(self, other):
-        # For heap - higher priority scores come first
-        return self.priority_score > other.priority_score
+    def __iter__(self) -> Iterator[VulnerableNode]:
+        """Iterate from highest to lowest priority, in pop order."""
+        for index in range(self._top, -1, -1):
+            yield from self._buckets[index]
 
 
 @dataclass
 class TraversalState:
-    """Maintains state for resumable traversal."""
-    priority_queue: List[VulnerableNode]
-    visited: Set[Tuple[str, str]]
+    """Maintains state for resumable traversal.
+    
+    Checkpoints are an append-only JSON Lines journal: each save appends only the
+    nodes analyzed or skipped since the previous save, plus the current queue.
+    The journal is compacted into a full snapshot every snapshot_interval steps
+    to bound replay time.
+    
+    traversal_history and skipped_nodes keep only the latest history_limit
+    entries; older ones are streamed to overflow_file as they are evicted.
+    """
+    priority_queue: BucketQueue
+    visited: Set[bytes]
     analyzed_nodes: List[VulnerableNode]
-    traversal_history: List[Dict]
-    skipped_nodes: List[Dict]
+    traversal_history: Deque[Dict]
+    skipped_nodes: Deque[Dict]
     step_counter: int
     start_time: float
-    checkpoint_file: str = "traversal_checkpoint.pkl"
+    checkpoint_file: str = "traversal_checkpoint.jsonl"
+    snapshot_interval: int = 1000
+    history_limit: int = 1000
+    overflow_file: str = "traversal_history.jsonl"
+    
+    # Entries ever added to the bounded buffers, including evicted ones
+    _skipped_total: int = field(default=0, repr=False)
+    _history_total: int = field(default=0, repr=False)
+    _overflow: Optional[Any] = field(default=None, repr=False)
+    
+    # Journal cursors: how much of each list has already been written
+    _saved_analyzed: int = field(default=0, repr=False)
+    _saved_skipped: int = field(default=0, repr=False)
+    _saved_history: int = field(default=0, repr=False)
+    _saved_advisories: Set[str] = field(default_factory=set, repr=False)
+    _last_snapshot_step: Optional[int] = field(default=None, repr=False)
+    
+    # Background writer: records are built on the caller, file I/O happens here
+    _write_queue: Optional[queue.Queue] = field(default=None, repr=False)
+    _writer: Optional[threading.Thread] = field(default=None, repr=False)
+    
+    def __post_init__(self):
+        self.traversal_history = deque(self.traversal_history, maxlen=self.history_limit)
+        self.skipped_nodes = deque(self.skipped_nodes, maxlen=self.history_limit)
+        self._history_total = max(self._history_total, len(self.traversal_history))
+        self._skipped_total = max(self._skipped_total, len(self.skipped_nodes))
+    
+    @property
+    def skipped_count(self) -> int:
+        """Number of nodes skipped so far, including ones evicted from skipped_nodes."""
+        return self._skipped_total
+    
+    def add_skipped(self, node: VulnerableNode, reason: str):
+        """Record a skipped node, streaming the oldest entry out if the buffer is full."""
+        if len(self.skipped_nodes) == self.skipped_nodes.maxlen:
+            evicted = self.skipped_nodes[0]
+            self._write_overflow({"type": "skipped", "node": evicted["node"].to_dict(),
+                                  "reason": evicted["reason"]})
+        self.skipped_nodes.append({"node": node, "reason": reason})
+        self._skipped_total += 1
+    
+    def add_history(self, entry: Dict):
+        """Record a history entry, streaming the oldest entry out if the buffer is full."""
+        if len(self.traversal_history) == self.traversal_history.maxlen:
+            self._write_overflow({"type": "history", "entry": self.traversal_history[0]})
+        self.traversal_history.append(entry)
+        self._history_total += 1
+    
+    def _write_overflow(self, record: Dict[str, Any]):
+        """Append an evicted entry to the overflow file, kept open for the run."""
+        if self._overflow is None:
+            self._overflow = open(self.overflow_file, 'a', buffering=1)
+        self._overflow.write(json.dumps(record) + "\n")
+    
+    def truncate_overflow(self):
+        """Empty the overflow file, dropping entries streamed out by an earlier run."""
+        if self._overflow is not None:
+            self._overflow.close()
+        self._overflow = open(self.overflow_file, 'w', buffering=1)
     
     def save_checkpoint(self):
-        """Save current state to disk for resumption."""
-        state_dict = {
-            'priority_queue': self.priority_queue,
-            'visited': self.visited,
-            'analyzed_nodes': self.analyzed_nodes,
-            'traversal_history': self.traversal_history,
-            'skipped_nodes': self.skipped_nodes,
-            'step_counter': self.step_counter,
-            'start_time': self.start_time
+        """Queue the changes since the last save for appending to the checkpoint journal.
+        
+        Records are built synchronously so they reflect the state at this step;
+        writing and fsync run on a background thread. Call flush_checkpoints()
+        to wait for queued saves to reach disk.
+        """
+        if (self._last_snapshot_step is None
+                or self.step_counter - self._last_snapshot_step >= self.snapshot_interval):
+            # Evicted entries already live in the overflow file
+            self._saved_analyzed = 0
+            self._saved_skipped = self._skipped_total - len(self.skipped_nodes)
+            self._saved_history = self._history_total - len(self.traversal_history)
+            self._saved_advisories = set()
+            meta = json.dumps({"type": "meta", "start_time": self.start_time}) + "\n"
+            job = ("snapshot", [meta] + self._journal_lines(), self.step_counter)
+            self._last_snapshot_step = self.step_counter
+        else:
+            job = ("append", self._journal_lines(), self.step_counter)
+        
+        if self._writer is None:
+            self._write_queue = queue.Queue(maxsize=2)
+            self._writer = threading.Thread(target=self._write_checkpoints, daemon=True)
+            self._writer.start()
+        # Blocks only if the writer is two saves behind; every delta must be written
+        self._write_queue.put(job)
+    
+    def flush_checkpoints(self):
+        """Wait for queued checkpoint writes to finish and stop the writer thread."""
+        if self._overflow is not None:
+            self._overflow.close()
+            self._overflow = None
+        if self._writer is None:
+            return
+        self._write_queue.put(None)
+        self._writer.join()
+        self._writer = self._write_queue = None
+    
+    def _write_checkpoints(self):
+        """Writer thread: apply queued snapshots and appends in order."""
+        while True:
+            job = self._write_queue.get()
+            if job is None:
+                return
+            mode, lines, step = job
+            try:
+                if mode == "snapshot":
+                    # Rewrite the journal as a single full snapshot, atomically
+                    tmp_file = f"{self.checkpoint_file}.tmp"
+                    with open(tmp_file, 'w') as f:
+                        f.writelines(lines)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_file, self.checkpoint_file)
+                else:
+                    with open(self.checkpoint_file, 'a') as f:
+                        f.writelines(lines)
+                        f.flush()
+                        os.fsync(f.fileno())
+                print(f"Checkpoint saved at step {step}")
+            except OSError as e:
+                print(f"Warning: Failed to write checkpoint at step {step}: {e}")
+    
+    def _journal_lines(self) -> List[str]:
+        """Build journal records for everything not yet written and advance the cursors."""
+        records = []
+        
+        def node_record(node: VulnerableNode) -> Dict[str, Any]:
+            # Advisory lists are large and shared by all nodes of a package version,
+            # so each one is written once, ahead of the first node that needs it
+            key = node.advisories_key
+            if key not in self._saved_advisories:
+                records.append({"type": "advisories", "key": key, "advisories": node.advisories})
+                self._saved_advisories.add(key)
+            return node.to_dict()
+        
+        for node in self.analyzed_nodes[self._saved_analyzed:]:
+            records.append({"type": "analyzed", "node": node_record(node)})
+        # Entries added since the last save that were already evicted are in the overflow file
+        unsaved_skipped = min(self._skipped_total - self._saved_skipped, len(self.skipped_nodes))
+        for entry in islice(self.skipped_nodes, len(self.skipped_nodes) - unsaved_skipped, None):
+            records.append({"type": "skipped", "node": node_record(entry["node"]), "reason": entry["reason"]})
+        unsaved_history = min(self._history_total - self._saved_history, len(self.traversal_history))
+        for entry in islice(self.traversal_history, len(self.traversal_history) - unsaved_history, None):
+            records.append({"type": "history", "entry": entry})
+        queue_rows = [node_record(node) for node in self.priority_queue]
+        records.append({"type": "queue", "columns": self._to_columns(queue_rows)})
+        records.append({"type": "progress", "step_counter": self.step_counter,
+                        "skipped_total": self._skipped_total, "history_total": self._history_total})
+        
+        self._saved_analyzed = len(self.analyzed_nodes)
+        self._saved_skipped = self._skipped_total
+        self._saved_history = self._history_total
+        return [json.dumps(record) + "\n" for record in records]
+    
+    # Low-cardinality queue columns stored as a value dictionary plus indices
+    DICTIONARY_COLUMNS = ("package_name", "version", "risk_category", "decision", "parent_file")
+    
+    @classmethod
+    def _to_columns(cls, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Transpose node records into one list per field.
+        
+        The queue is rewritten on every save, so column form keeps each field
+        name once per save instead of once per node.
+        """
+        columns = {}
+        for name in (rows[0] if rows else {}):
+            values = [row[name] for row in rows]
+            if name in cls.DICTIONARY_COLUMNS:
+                dictionary = list(dict.fromkeys(values))
+                positions = {value: i for i, value in enumerate(dictionary)}
+                columns[name] = {"dictionary": dictionary, "indices": [positions[v] for v in values]}
+            else:
+                columns[name] = values
+        return columns
+    
+    @staticmethod
+    def _from_columns(columns: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Rebuild node records from their column form."""
+        decoded = {
+            name: ([values["dictionary"][i] for i in values["indices"]]
+                   if isinstance(values, dict) else values)
+            for name, values in columns.items()
         }
-        with open(self.checkpoint_file, 'wb') as f:
-            pickle.dump(state_dict, f)
-        print(f"Checkpoint saved at step {self.step_counter}")
+        return [dict(zip(decoded, row)) for row in zip(*decoded.values())]
     
     @classmethod
-    def load_checkpoint(cls, checkpoint_file: str = "traversal_checkpoint.pkl"):
-        """Load state from disk."""
+    def load_checkpoint(cls, checkpoint_file: str = "traversal_checkpoint.jsonl"):
+        """Load state from disk by replaying the checkpoint journal."""
         try:
-            with open(checkpoint_file, 'rb') as f:
-                state_dict = pickle.load(f)
-            
-            state = cls(
-                priority_queue=state_dict['priority_queue'],
-                visited=state_dict['visited'],
-                analyzed_nodes=state_dict['analyzed_nodes'],
-                traversal_history=state_dict['traversal_history'],
-                skipped_nodes=state_dict['skipped_nodes'],
-                step_counter=state_dict['step_counter'],
-                start_time=state_dict['start_time'],
-                checkpoint_file=checkpoint_file
-            )
-            print(f"Resumed from checkpoint at step {state.step_counter}")
-            return state
+            with open(checkpoint_file, 'r') as f:
+                lines = f.readlines()
         except FileNotFoundError:
             return None
-        except ModuleNotFoundError as e:
-            print(f"Warning: Checkpoint file contains outdated module references: {e}")
+        
+        state = cls(
+            priority_queue=BucketQueue(),
+            visited=set(),
+            analyzed_nodes=[],
+            traversal_history=[],
+            skipped_nodes=[],
+            step_counter=0,
+            start_time=time.time(),
+            checkpoint_file=checkpoint_file
+        )
+        
+        advisories_by_key = {}
+        
+        def load_node(data: Dict[str, Any]) -> VulnerableNode:
+            node = VulnerableNode.from_dict(data, advisories=[])
+            node.advisories = advisories_by_key[node.advisories_key]
+            return node
+        
+        try:
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write from an interrupted save - everything before it is intact
+                    break
+                
+                record_type = record["type"]
+                if record_type == "meta":
+                    state.start_time = record["start_time"]
+                elif record_type == "advisories":
+                    advisories_by_key[record["key"]] = record["advisories"]
+                elif record_type == "analyzed":
+                    node = load_node(record["node"])
+                    state.analyzed_nodes.append(node)
+                    state.visited.add(node.visit_key)
+                elif record_type == "skipped":
+                    # Replayed entries were streamed to the overflow file when first evicted
+                    state.skipped_nodes.append({
+                        "node": load_node(record["node"]),
+                        "reason": record["reason"]
+                    })
+                    state._skipped_total += 1
+                elif record_type == "history":
+                    state.traversal_history.append(record["entry"])
+                    state._history_total += 1
+                elif record_type == "queue":
+                    state.priority_queue = BucketQueue(
+                        load_node(node) for node in cls._from_columns(record["columns"])
+                    )
+                elif record_type == "progress":
+                    state.step_counter = record["step_counter"]
+                    state._skipped_total = record["skipped_total"]
+                    state._history_total = record["history_total"]
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Warning: Checkpoint file is not a valid traversal journal: {e}")
             print("Starting fresh traversal...")
             return None
+        
+        # Continue appending to the same journal
+        state._saved_analyzed = len(state.analyzed_nodes)
+        state._saved_skipped = state._skipped_total
+        state._saved_history = state._history_total
+        state._saved_advisories = set(advisories_by_key)
+        state._last_snapshot_step = state.step_counter
+        
+        print(f"Resumed from checkpoint at step {state.step_counter}")
+        return state
 
 
 class AgenticGraphTraversalAgent:
@@ -117,7 +475,9 @@ class AgenticGraphTraversalAgent:
     
     def __init__(self, neo4j_uri: str = NEO4J_URI, neo4j_user: str = NEO4J_USER, 
                  neo4j_password: str = NEO4J_PASSWORD, openai_api_key: Optional[str] = None,
-                 llm_timeout: int = 30, use_cache: bool = True, batch_size: int = 5):
+                 llm_timeout: int = 30, use_cache: bool = True, batch_size: int = 5,
+                 neo4j_database: str = "neo4j", max_concurrent_llm_calls: int = 8,
+                 nodes_per_prompt: int = 4):
         """
         Initialize the agent with optimizations.
         
@@ -129,171 +489,167 @@ class AgenticGraphTraversalAgent:
             llm_timeout: Timeout for LLM calls in seconds
             use_cache: Whether to cache LLM responses
             batch_size: Number of neighbors to analyze in one LLM call
+            neo4j_database: Database name (set explicitly to skip default-DB discovery)
+            max_concurrent_llm_calls: Frontier nodes analyzed concurrently (bounds OpenAI request rate)
+            nodes_per_prompt: Number of frontier nodes whose neighbors share one LLM call
         """
         self.driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
+        self.neo4j_database = neo4j_database
+        self._session = None
+        # Importers per file path from the prefetched subgraph (see prefetch_importers)
+        self._importer_cache: Dict[str, List[Dict[str, Any]]] = {}
         
-        # Initialize OpenAI client
-        api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
-        if api_key:
-            self.llm_client = openai.OpenAI(api_key=api_key)
-        else:
+        # The async OpenAI client is bound to an event loop, so it is created per traversal
+        self.openai_api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
+        if not self.openai_api_key:
             raise ValueError("OpenAI API key is required.")
+        self.llm_client = None
+        self._llm_semaphore = None
         
         # Optimization settings
         self.llm_timeout = llm_timeout
         self.use_cache = use_cache
         self.batch_size = batch_size
+        self.max_concurrent_llm_calls = max_concurrent_llm_calls
+        self.nodes_per_prompt = nodes_per_prompt
         
-        # Cache for LLM responses
-        self.llm_cache = {}
-        self.cache_file = "llm_cache.json"
-        if use_cache:
-            self._load_cache()
+        # Cache for LLM responses, keyed by a hash of the full request
+        self.cache_file = "llm_cache.sqlite"
         
-        # Executor for timeout handling
-        self.executor = ThreadPoolExecutor(max_workers=3)
-    
-    def _load_cache(self):
-        """Load LLM response cache from disk."""
-        try:
-            with open(self.cache_file, 'r') as f:
-                self.llm_cache = json.load(f)
-            print(f"Loaded {len(self.llm_cache)} cached LLM responses")
-        except FileNotFoundError:
-            self.llm_cache = {}
-    
-    def _save_cache(self):
-        """Save LLM response cache to disk."""
-        if self.use_cache:
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.llm_cache, f)
+        # One shared string per import site, however many nodes reference it; bounded
+        # to CODE_CONTEXT_CACHE_SIZE sites and cleared when a traversal ends
+        self._code_contexts: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+        self.llm_cache = LLMResponseCache(self.cache_file) if use_cache else None
     
     def close(self):
-        """Close database connection and save cache."""
+        """Close database connection and cache."""
         self.driver.close()
-        self.executor.shutdown()
-        self._save_cache()
-    
-    def _get_cache_key(self, current_node: VulnerableNode, neighbors: List[Dict]) -> str:
-        """Generate cache key for LLM request."""
-        # Create a deterministic key based on the context
-        key_parts = [
-            current_node.package_name,
-            current_node.version,
-            current_node.file_path,
-            str(len(neighbors)),
-            # Include first few file paths to differentiate contexts
-            '|'.join(sorted([n['file_path'] for n in neighbors[:3]]))
-        ]
-        return '::'.join(key_parts)
-    
-    def build_prompt_and_prioritize_with_timeout(self, current_node: VulnerableNode, 
-                                                neighbors: List[Dict[str, Any]], 
-                                                advisories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.llm_cache:
+            self.llm_cache.close()
+    
+    async def build_prompt_and_prioritize_with_timeout(
+            self, sections: List[Tuple[VulnerableNode, List[Dict[str, Any]], List[Dict[str, Any]]]]
+    ) -> List[List[Dict[str, Any]]]:
         """
-        Build prompt and get priorities with timeout handling.
+        Build one prompt for several (node, neighbors, advisories) sections and get
+        priorities for each section's neighbors with timeout handling.
         """
+        request = self._build_llm_request(sections)
+        node_paths = ", ".join(node.file_path for node, _, _ in sections)
+        
         # Check cache first
-        if self.use_cache:
-            cache_key = self._get_cache_key(current_node, neighbors)
-            if cache_key in self.llm_cache:
-                print(f"  Using cached LLM response for {current_node.file_path}")
-                return self.llm_cache[cache_key]
+        cache_key = None
+        if self.llm_cache:
+            cache_key = LLMResponseCache.make_key(**request)
+            cached = self.llm_cache.get(cache_key)
+            if cached is not None:
+                print(f"  Using cached LLM response for {node_paths}")
+                return self._parse_llm_analysis(sections, cached)
         
         try:
-            # Run LLM call with timeout
-            future = self.executor.submit(
-                self._llm_analyze_neighbors,
-                current_node, neighbors, advisories
-            )
-            result = future.result(timeout=self.llm_timeout)
+            # Run LLM call with timeout, bounded by the shared concurrency limit
+            async with self._llm_semaphore:
+                analysis = await asyncio.wait_for(
+                    self._llm_analyze_neighbors(request),
+                    timeout=self.llm_timeout
+                )
+            result = self._parse_llm_analysis(sections, analysis)
             
-            # Cache the result
-            if self.use_cache:
-                self.llm_cache[cache_key] = result
+            # Cache the raw response once it is known to parse
+            if self.llm_cache:
+                self.llm_cache.set(cache_key, analysis)
                 
             return result
             
-        except TimeoutError:
-            raise RuntimeError(f"LLM timeout after {self.llm_timeout} seconds for {current_node.file_path}")
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"LLM timeout after {self.llm_timeout} seconds for {node_paths}")
         except Exception as e:
-            raise RuntimeError(f"LLM error for {current_node.file_path}: {e}")
+            raise RuntimeError(f"LLM error for {node_paths}: {e}")
     
-    def _llm_analyze_neighbors(self, current_node: VulnerableNode, 
-                              neighbors: List[Dict[str, Any]], 
-                              advisories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Actual LLM analysis - runs in separate thread."""
-        prompt = self._build_analysis_prompt(current_node, neighbors, advisories)
+    def _build_llm_request(
+            self, sections: List[Tuple[VulnerableNode, List[Dict[str, Any]], List[Dict[str, Any]]]]
+    ) -> Dict[str, Any]:
+        """Build the chat completion request for scoring several nodes' neighbors."""
+        prompt = self._build_analysis_prompt(sections)
+        # Size the completion to the number of results asked for, not a fixed cap
+        result_count = sum(len(neighbors[:self.batch_size]) for _, neighbors, _ in sections)
         
-        response = self.llm_client.chat.completions.create(
-            model="gpt-3.5-turbo",  # Use faster model
-            messages=[
+        return {
+            "model": "gpt-4o-mini",  # Fast model with structured output support
+            "messages": [
                 {"role": "system", "content": "You are a security expert. Be concise."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.2,
-            max_tokens=1000  # Reduced for faster response
-        )
-        
-        analysis = response.choices[0].message.content
-        return self._parse_llm_analysis(neighbors, analysis, advisories)
+            "temperature": 0.2,
+            "max_tokens": TOKENS_PER_NEIGHBOR_RESULT * result_count + RESPONSE_OVERHEAD_TOKENS,
+            "response_format": {"type": "json_schema", "json_schema": NEIGHBOR_ANALYSIS_SCHEMA}
+        }
     
+    async def _llm_analyze_neighbors(self, request: Dict[str, Any]) -> str:
+        """Actual LLM call - awaited concurrently with the rest of the frontier."""
+        response = await self.llm_client.chat.completions.create(**request)
+        return response.choices[0].message.content
     
-    def _build_analysis_prompt(self, current_node: VulnerableNode, 
-                              neighbors: List[Dict[str, Any]], 
-                              advisories: List[Dict[str, Any]]) -> str:
-        """Build a more concise prompt for faster LLM response."""
-        highest_advisory = max(advisories, key=lambda x: x.get("cvss_score", 0))
-        
-        prompt = f"""Analyze security impact of {current_node.package_name} {current_node.version} (CVSS: {highest_advisory.get('cvss_score', 0)}).
-
-Analyzing from: {current_node.file_path}
+    def _build_analysis_prompt(
+            self, sections: List[Tuple[VulnerableNode, List[Dict[str, Any]], List[Dict[str, Any]]]]
+    ) -> str:
+        """Build a concise prompt covering the neighbors of several nodes."""
+        prompt = """Analyze the security impact of vulnerable packages on the files that import them.
 
 Rate each file (0-10) based on security risk. Consider:
 - Authentication/security components = 8-10
 - User-facing APIs/routes = 6-8  
 - Data processing = 4-6
 - Tests/examples = 0-3
-
-FILES:
 """
         
-        # Batch neighbors for efficiency
-        for i, neighbor in enumerate(neighbors[:self.batch_size]):
-            prompt += f"\n{i+1}. {neighbor['file_path']}"
-            prompt += f"\n   Import: {neighbor['import_statement'][:100]}..."
+        for node_idx, (current_node, neighbors, advisories) in enumerate(sections, 1):
+            highest_advisory = max(advisories, key=lambda x: x.get("cvss_score", 0))
+            prompt += (f"\nNODE {node_idx}: {current_node.package_name} {current_node.version} "
+                       f"(CVSS: {highest_advisory.get('cvss_score', 0)}), "
+                       f"analyzing from: {current_node.file_path}\nFILES:")
+            
+            # Batch neighbors for efficiency
+            for i, neighbor in enumerate(neighbors[:self.batch_size]):
+                prompt += f"\n{i+1}. {neighbor['file_path']}"
+                prompt += f"\n   Import: {neighbor['import_statement'][:100]}..."
+            prompt += "\n"
         
         prompt += """
-
-Respond with JSON only:
-[{"index": 1, "priority_score": 8, "reasoning": "Auth component", "risk_category": "HIGH", "should_explore": true}]
+Return one result per file, where "node" is the NODE number and "index" the file number.
+Keep each reasoning under 15 words.
 """
         
         return prompt
     
-    def _parse_llm_analysis(self, neighbors: List[Dict[str, Any]], 
-                           llm_response: str, 
-                           advisories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Parse LLM response with error handling."""
+    def _parse_llm_analysis(
+            self, sections: List[Tuple[VulnerableNode, List[Dict[str, Any]], List[Dict[str, Any]]]],
+            llm_response: str
+    ) -> List[List[Dict[str, Any]]]:
+        """Parse LLM response with error handling, splitting results by node."""
         try:
-            # Extract JSON from response
-            json_match = re.search(r'\[.*\]', llm_response, re.DOTALL)
-            if json_match:
-                analysis_results = json.loads(json_match.group())
-            else:
-                raise ValueError("Failed to parse LLM response - no valid JSON found")
+            # The response schema is enforced server-side, so the reply is the object itself
+            analysis_results = json.loads(llm_response)["results"]
             
-            max_cvss = max((adv.get("cvss_score", 0) for adv in advisories), default=5.0)
+            max_cvss_by_section = [
+                max((adv.get("cvss_score", 0) for adv in advisories), default=5.0)
+                for _, _, advisories in sections
+            ]
             
-            analyzed_neighbors = []
+            analyzed_by_section = [[] for _ in sections]
             for result in analysis_results:
+                node_idx = result["node"] - 1
+                if not 0 <= node_idx < len(sections):
+                    continue
+                neighbors = sections[node_idx][1]
+                
                 idx = result["index"] - 1
                 if 0 <= idx < len(neighbors):
                     neighbor = neighbors[idx].copy()
                     
                     # Combine scores
                     context_score = result["priority_score"] / 10.0
-                    cvss_normalized = max_cvss / 10.0
+                    cvss_normalized = max_cvss_by_section[node_idx] / 10.0
                     combined_score = (0.6 * context_score + 0.4 * cvss_normalized) * 10
                     
                     neighbor.update({
@@ -304,13 +660,14 @@ Respond with JSON only:
                         "exploitation_scenario": result.get("exploitation_scenario", "")
                     })
                     
-                    analyzed_neighbors.append(neighbor)
+                    analyzed_by_section[node_idx].append(neighbor)
             
             # Skip any neighbors not analyzed by LLM
             # (This ensures we only use LLM-based decisions)
             
-            analyzed_neighbors.sort(key=lambda x: x["priority_score"], reverse=True)
-            return analyzed_neighbors
+            for analyzed_neighbors in analyzed_by_section:
+                analyzed_neighbors.sort(key=lambda x: x["priority_score"], reverse=True)
+            return analyzed_by_section
             
         except Exception as e:
             raise RuntimeError(f"Failed to parse LLM response: {e}")
@@ -330,19 +687,45 @@ Respond with JSON only:
         Returns:
             List of analyzed vulnerable nodes
         """
+        return asyncio.run(self._traverse_vulnerability_graph(
+            max_depth, max_nodes, max_time_minutes, resume_from_checkpoint
+        ))
+    
+    async def _traverse_vulnerability_graph(self, max_depth: int, max_nodes: int,
+                                            max_time_minutes: int,
+                                            resume_from_checkpoint: bool) -> List[VulnerableNode]:
+        """Run the traversal inside one event loop so LLM calls can overlap."""
+        self.llm_client = openai.AsyncOpenAI(api_key=self.openai_api_key)
+        self._llm_semaphore = asyncio.Semaphore(self.max_concurrent_llm_calls)
+        # One Neo4j session serves every query of the traversal
+        self._session = self.driver.session(database=self.neo4j_database)
+        self._importer_cache = {}
+        try:
+            return await self._run_traversal(max_depth, max_nodes, max_time_minutes,
+                                             resume_from_checkpoint)
+        finally:
+            self._session.close()
+            self._session = None
+            await self.llm_client.close()
+    
+    async def _run_traversal(self, max_depth: int, max_nodes: int, max_time_minutes: int,
+                             resume_from_checkpoint: bool) -> List[VulnerableNode]:
+        """Traversal loop: pop a frontier, fetch its neighbors, score them concurrently."""
         print("Starting optimized vulnerability graph traversal...")
         
         # Try to resume from checkpoint
         state = None
         if resume_from_checkpoint:
             state = TraversalState.load_checkpoint()
+            if state is not None:
+                self._restore_code_contexts(state.analyzed_nodes + list(state.priority_queue))
         
         if state is None:
             # Initialize new traversal
             vulnerable_packages = get_vulnerable_packages()
             
             state = TraversalState(
-                priority_queue=[],
+                priority_queue=BucketQueue(),
                 visited=set(),
                 analyzed_nodes=[],
                 traversal_history=[],
@@ -350,73 +733,176 @@ Respond with JSON only:
                 step_counter=0,
                 start_time=time.time()
             )
+            # Overflow entries only belong with the checkpoint they were evicted from
+            state.truncate_overflow()
             
-            # Initialize queue with vulnerable packages
+            # Initialize queue with vulnerable packages, several packages per LLM call
             print("Initializing with vulnerable packages...")
-            for package_name, version, advisories in vulnerable_packages:
-                neighbors = self.list_neighbors(package_name, version)
-                
-                if neighbors:
-                    # Use LLM for initial scoring
-                    initial_scored = self.build_prompt_and_prioritize_with_timeout(
-                        VulnerableNode(
-                            package_name=package_name,
-                            version=version,
-                            file_path="<root>",
-                            import_line="",
-                            import_line_number=0,
-                            code_context="",
-                            advisories=advisories,
-                            traversal_depth=0
-                        ),
-                        neighbors[:10],
-                        advisories
-                    )
-                    
-                    for neighbor in initial_scored[:5]:
-                        node = VulnerableNode(
-                            package_name=package_name,
-                            version=version,
-                            file_path=neighbor["file_path"],
-                            import_line=neighbor["import_statement"],
-                            import_line_number=neighbor["line_number"],
-                            code_context=neighbor["code_context"],
-                            advisories=advisories,
-                            priority_score=neighbor["priority_score"],
-                            llm_reasoning=neighbor.get("llm_reasoning", ""),
-                            risk_category=neighbor.get("risk_category", "UNKNOWN"),
-                            traversal_depth=1
-                        )
-                        heappush(state.priority_queue, node)
+            neighbors_by_package = self.list_neighbors(
+                [(package_name, version) for package_name, version, _ in vulnerable_packages]
+            )
+            seeds = [
+                (
+                    VulnerableNode(
+                        package_name=package_name,
+                        version=version,
+                        file_path="<root>",
+                        import_line="",
+                        import_line_number=0,
+                        code_context="",
+                        advisories=advisories,
+                        traversal_depth=0
+                    ),
+                    neighbors_by_package[package_name][:10],
+                    advisories
+                )
+                for package_name, version, advisories in vulnerable_packages
+                if neighbors_by_package.get(package_name)
+            ]
+            await asyncio.gather(*[
+                self._seed_packages(state, chunk) for chunk in self._chunk_sections(seeds)
+            ])
+        
+        # Fetch the importer subgraph below the queued files once, instead of
+        # one importer query per traversal level
+        try:
+            self.prefetch_importers([node.file_path for node in state.priority_queue], max_depth)
+        except Exception as e:
+            print(f"  Error prefetching importer subgraph: {e}")
         
         # Time limit
         max_time_seconds = max_time_minutes * 60
         checkpoint_interval = 10  # Save checkpoint every 10 nodes
         
-        # Traverse graph
-        while state.priority_queue and len(state.analyzed_nodes) < max_nodes:
-            # Check time limit
-            elapsed = time.time() - state.start_time
-            if elapsed > max_time_seconds:
-                print(f"\nTime limit reached ({max_time_minutes} minutes)")
-                break
+        # Queued checkpoint writes are flushed however the loop exits
+        try:
+            # Traverse graph one frontier batch at a time
+            while state.priority_queue and len(state.analyzed_nodes) < max_nodes:
+                # Check time limit
+                elapsed = time.time() - state.start_time
+                if elapsed > max_time_seconds:
+                    print(f"\nTime limit reached ({max_time_minutes} minutes)")
+                    break
+                
+                frontier = self._pop_frontier(state, max_depth, max_nodes, checkpoint_interval)
+                if not frontier:
+                    continue
+                
+                # Find next level neighbors for the whole frontier in one round trip
+                try:
+                    importers = self.list_importers([node.file_path for node in frontier])
+                except Exception as e:
+                    print(f"  Error fetching neighbors: {e}")
+                    continue
+                
+                sections = [
+                    (node, importers[node.file_path], node.advisories)
+                    for node in frontier if importers.get(node.file_path)
+                ]
+                await asyncio.gather(*[
+                    self._expand_nodes(state, chunk) for chunk in self._chunk_sections(sections)
+                ])
             
-            current_node = heappop(state.priority_queue)
+            # Final checkpoint
+            state.save_checkpoint()
+        finally:
+            state.flush_checkpoints()
+            self._code_contexts.clear()
+        
+        elapsed_minutes = (time.time() - state.start_time) / 60
+        print(f"\nTraversal complete in {elapsed_minutes:.1f} minutes")
+        print(f"Analyzed {len(state.analyzed_nodes)} nodes, skipped {state.skipped_count} nodes")
+        
+        return state.analyzed_nodes
+    
+    def _chunk_sections(self, sections: List[Tuple]) -> List[List[Tuple]]:
+        """Split prompt sections into groups of nodes_per_prompt."""
+        return [sections[i:i + self.nodes_per_prompt]
+                for i in range(0, len(sections), self.nodes_per_prompt)]
+    
+    async def _seed_packages(self, state: TraversalState,
+                             seeds: List[Tuple[VulnerableNode, List[Dict[str, Any]], List[Dict[str, Any]]]]):
+        """Score the direct importers of several vulnerable packages and queue the top ones."""
+        # Use LLM for initial scoring
+        scored_by_seed = await self.build_prompt_and_prioritize_with_timeout(seeds)
+        
+        for (root, _, advisories), initial_scored in zip(seeds, scored_by_seed):
+            for neighbor in initial_scored[:5]:
+                node = VulnerableNode(
+                    package_name=root.package_name,
+                    version=root.version,
+                    file_path=neighbor["file_path"],
+                    import_line=neighbor["import_statement"],
+                    import_line_number=neighbor["line_number"],
+                    code_context=neighbor["code_context"],
+                    advisories=advisories,
+                    priority_score=neighbor["priority_score"],
+                    llm_reasoning=neighbor.get("llm_reasoning", ""),
+                    risk_category=neighbor.get("risk_category", "UNKNOWN"),
+                    traversal_depth=1
+                )
+                state.priority_queue.push(node)
+    
+    async def _expand_nodes(self, state: TraversalState,
+                            sections: List[Tuple[VulnerableNode, List[Dict[str, Any]], List[Dict[str, Any]]]]):
+        """Score several nodes' importers in one LLM call and queue the ones worth exploring."""
+        try:
+            # Analyze neighbors with timeout protection
+            analyzed_by_node = await self.build_prompt_and_prioritize_with_timeout(sections)
+        except Exception as e:
+            print(f"  Error processing neighbors: {e}")
+            return
+        
+        # Add high-priority neighbors to queue
+        for (current_node, _, _), analyzed_neighbors in zip(sections, analyzed_by_node):
+            for neighbor in analyzed_neighbors:
+                if not (neighbor.get("should_explore", False) and neighbor["priority_score"] >= 5):
+                    continue
+                
+                # Only neighbors that will actually be queued become VulnerableNodes
+                visit_key = VulnerableNode.make_visit_key(current_node.package_name, neighbor["file_path"])
+                if visit_key in state.visited or visit_key in state.priority_queue:
+                    continue
+                
+                next_node = VulnerableNode(
+                    package_name=current_node.package_name,
+                    version=current_node.version,
+                    file_path=neighbor["file_path"],
+                    import_line=neighbor["import_statement"],
+                    import_line_number=neighbor["line_number"],
+                    code_context=neighbor["code_context"],
+                    advisories=current_node.advisories,
+                    priority_score=neighbor["priority_score"],
+                    llm_reasoning=neighbor.get("llm_reasoning", ""),
+                    risk_category=neighbor.get("risk_category", "UNKNOWN"),
+                    traversal_depth=current_node.traversal_depth + 1,
+                    parent_file=current_node.file_path
+                )
+                state.priority_queue.push(next_node)
+    
+    def _pop_frontier(self, state: TraversalState, max_depth: int, max_nodes: int,
+                      checkpoint_interval: int) -> List[VulnerableNode]:
+        """Pop up to max_concurrent_llm_calls unvisited nodes to expand together."""
+        frontier = []
+        while (state.priority_queue and len(frontier) < self.max_concurrent_llm_calls
+               and len(state.analyzed_nodes) < max_nodes):
+            current_node = state.priority_queue.pop()
             
             # Skip if already visited
-            node_key = (current_node.package_name, current_node.file_path)
-            if node_key in state.visited:
+            if current_node.visit_key in state.visited:
                 continue
             
             # Check depth limit
             if current_node.traversal_depth > max_depth:
                 current_node.decision = TraversalDecision.SKIPPED_DEPTH_LIMIT
-                state.skipped_nodes.append({"node": current_node, "reason": "depth_limit"})
+                state.add_skipped(current_node, "depth_limit")
                 continue
             
-            state.visited.add(node_key)
+            state.visited.add(current_node.visit_key)
+            current_node.analyzed_at = datetime.now().isoformat()
             state.analyzed_nodes.append(current_node)
             state.step_counter += 1
+            frontier.append(current_node)
             
             print(f"[Step {state.step_counter}] Analyzing: {current_node.file_path} "
                   f"(priority: {current_node.priority_score:.2f}, risk: {current_node.risk_category})")
@@ -424,118 +910,231 @@ Respond with JSON only:
             # Save checkpoint periodically
             if state.step_counter % checkpoint_interval == 0:
                 state.save_checkpoint()
-            
-            # Find next level neighbors (with timeout protection)
-            try:
-                with self.driver.session() as session:
-                    query = """
-                    MATCH (f1:File)-[r:DIRECT_IMPORTS|RELATIVE_IMPORTS]->(f2:File)
-                    WHERE f2.path = $file_path
-                    RETURN f1.path as importing_file, 
-                           f1.code as code,
-                           r.import_statement as import_statement,
-                           r.line_number as line_number
-                    LIMIT 20
-                    """
-                    
-                    result = session.run(query, file_path=current_node.file_path)
-                    
-                    next_neighbors = []
-                    for record in result:
-                        next_neighbors.append({
-                            "file_path": record["importing_file"],
-                            "import_statement": record["import_statement"],
-                            "line_number": record["line_number"],
-                            "code_context": self._extract_code_context(
-                                record["code"] or "", 
-                                record["line_number"]
-                            )
-                        })
-                
-                # Analyze neighbors with timeout protection
-                if next_neighbors:
-                    analyzed_neighbors = self.build_prompt_and_prioritize_with_timeout(
-                        current_node, next_neighbors, current_node.advisories
-                    )
-                    
-                    # Add high-priority neighbors to queue
-                    for neighbor in analyzed_neighbors:
-                        if neighbor.get("should_explore", False) and neighbor["priority_score"] >= 5:
-                            next_node = VulnerableNode(
-                                package_name=current_node.package_name,
-                                version=current_node.version,
-                                file_path=neighbor["file_path"],
-                                import_line=neighbor["import_statement"],
-                                import_line_number=neighbor["line_number"],
-                                code_context=neighbor["code_context"],
-                                advisories=current_node.advisories,
-                                priority_score=neighbor["priority_score"],
-                                llm_reasoning=neighbor.get("llm_reasoning", ""),
-                                risk_category=neighbor.get("risk_category", "UNKNOWN"),
-                                traversal_depth=current_node.traversal_depth + 1,
-                                parent_file=current_node.file_path
-                            )
-                            heappush(state.priority_queue, next_node)
-                
-            except Exception as e:
-                print(f"  Error processing neighbors: {e}")
-                continue
         
-        # Final checkpoint
-        state.save_checkpoint()
+        return frontier
+    
+    def _read(self, query: str, **params) -> List[Any]:
+        """Run a read query in a managed read transaction on the traversal's session.
         
-        elapsed_minutes = (time.time() - state.start_time) / 60
-        print(f"\nTraversal complete in {elapsed_minutes:.1f} minutes")
-        print(f"Analyzed {len(state.analyzed_nodes)} nodes, skipped {len(state.skipped_nodes)} nodes")
+        Outside a traversal a short-lived session is opened for the single query.
+        """
+        def work(tx):
+            return list(tx.run(query, **params))
         
-        return state.analyzed_nodes
+        if self._session is not None:
+            return self._session.execute_read(work)
+        with self.driver.session(database=self.neo4j_database) as session:
+            return session.execute_read(work)
     
-    def list_neighbors(self, package_name: str, version: str, 
-                      import_site_snippet: Optional[str] = None) -> List[Dict[str, Any]]:
-        """List all files that import the given package."""
-        with self.driver.session() as session:
-            query = """
+    def _restore_code_contexts(self, nodes: List[VulnerableNode]):
+        """Reload code contexts that are not stored in checkpoints, in one query."""
+        if not nodes:
+            return
+        
+        # Sites are grouped by file so each file's code is split only once
+        query = """
+        UNWIND $sites AS site
+        WITH site.file_path AS file_path, collect(site.line_number) AS line_numbers
+        MATCH (f:File)
+        WHERE f.path = file_path
+        WITH file_path, line_numbers, split(coalesce(f.code, ''), '\\n') AS lines
+        UNWIND line_numbers AS line_number
+        WITH file_path, line_number, lines,
+             CASE WHEN line_number > $window THEN line_number - 1 - $window ELSE 0 END AS context_start
+        RETURN file_path,
+               line_number,
+               context_start,
+               lines[context_start..line_number + $window] as code_lines
+        """
+        
+        sites = {(node.file_path, node.import_line_number) for node in nodes}
+        result = self._read(
+            query,
+            sites=[{"file_path": path, "line_number": line} for path, line in sites],
+            window=CODE_CONTEXT_WINDOW
+        )
+        contexts = {
+            (record["file_path"], record["line_number"]): self._extract_code_context(
+                record["file_path"], record["code_lines"], record["context_start"], record["line_number"]
+            )
+            for record in result
+        }
+        
+        for node in nodes:
+            node.code_context = contexts.get((node.file_path, node.import_line_number), "")
+    
+    def prefetch_importers(self, root_paths: List[str], max_depth: int):
+        """Load the importer subgraph up to max_depth hops above the given files in one query.
+        
+        Files whose importers are fully covered by the subgraph are answered by
+        list_importers from memory afterwards.
+        
+        Args:
+            root_paths: Paths of the files the traversal starts from
+            max_depth: Number of import hops to fetch above the roots
+        """
+        if not root_paths or max_depth < 1:
+            return
+        
+        # Variable-length bounds cannot be parameters, so max_depth is inlined.
+        # Each import relationship is kept once, at its shortest distance from a root.
+        query = f"""
+        MATCH path = (root:File)<-[:DIRECT_IMPORTS|RELATIVE_IMPORTS*1..{int(max_depth)}]-(:File)
+        WHERE root.path IN $root_paths
+        UNWIND range(0, length(path) - 1) AS i
+        WITH relationships(path)[i] AS r, min(i) AS distance
+        WITH startNode(r) AS f1, collect({{target_path: endNode(r).path, r: r, distance: distance}}) AS hits
+        WITH f1, hits, split(coalesce(f1.code, ''), '\\n') AS lines
+        UNWIND hits AS hit
+        WITH hit.target_path AS target_path, hit.distance AS distance, f1, hit.r AS r, lines,
+             CASE WHEN hit.r.line_number > $window THEN hit.r.line_number - 1 - $window ELSE 0 END AS context_start
+        RETURN target_path,
+               distance,
+               f1.path as file_path,
+               r.import_statement as import_statement,
+               r.line_number as line_number,
+               context_start,
+               lines[context_start..r.line_number + $window] as code_lines
+        """
+        
+        result = self._read(query, root_paths=list(set(root_paths)), window=CODE_CONTEXT_WINDOW)
+        
+        # Roots, and importers short of the depth bound, have all their importers in the result
+        importers_by_path = {path: [] for path in root_paths}
+        for record in result:
+            if record["distance"] + 1 < max_depth:
+                importers_by_path.setdefault(record["file_path"], [])
+            importers = importers_by_path.setdefault(record["target_path"], [])
+            if len(importers) < 20:  # Same per-file cap as list_importers
+                importers.append(self._neighbor_from_record(record))
+        
+        self._importer_cache.update(importers_by_path)
+        print(f"Prefetched importers for {len(importers_by_path)} files")
+    
+    def list_importers(self, file_paths: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """List the files importing each of the given files, using one UNWIND query.
+        
+        Files covered by a prefetched subgraph are answered without a query.
+        """
+        importers_by_path = {path: self._importer_cache[path]
+                             for path in file_paths if path in self._importer_cache}
+        missing = list({path for path in file_paths if path not in importers_by_path})
+        if not missing:
+            return importers_by_path
+        
+        # Only a window of lines around each import site is sent back, not f1.code.
+        # Rows are grouped by importing file so its code is split once even when
+        # it imports several of the target files.
+        query = """
+        UNWIND $file_paths AS target_path
+        CALL {
+            WITH target_path
+            MATCH (f1:File)-[r:DIRECT_IMPORTS|RELATIVE_IMPORTS]->(f2:File)
+            WHERE f2.path = target_path
+            RETURN f1, r
+            LIMIT 20
+        }
+        WITH f1, collect({target_path: target_path, r: r}) AS hits
+        WITH f1, hits, split(coalesce(f1.code, ''), '\\n') AS lines
+        UNWIND hits AS hit
+        WITH hit.target_path AS target_path, f1, hit.r AS r, lines,
+             CASE WHEN hit.r.line_number > $window THEN hit.r.line_number - 1 - $window ELSE 0 END AS context_start
+        RETURN target_path,
+               f1.path as file_path,
+               r.import_statement as import_statement,
+               r.line_number as line_number,
+               context_start,
+               lines[context_start..r.line_number + $window] as code_lines
+        """
+        
+        result = self._read(query, file_paths=missing, window=CODE_CONTEXT_WINDOW)
+        
+        for record in result:
+            importers_by_path.setdefault(record["target_path"], []).append(
+                self._neighbor_from_record(record)
+            )
+        
+        return importers_by_path
+    
+    def list_neighbors(self, packages: List[Tuple[str, str]]) -> Dict[str, List[Dict[str, Any]]]:
+        """List the files importing each of the given (package_name, version) pairs in one query."""
+        # Only a window of lines around each import site is sent back, not f.code.
+        # Rows are grouped by file so its code is split once for all of its imports.
+        query = """
+        UNWIND $packages AS pkg
+        CALL {
+            WITH pkg
             MATCH (f:File)-[r:EXTERNAL_DEPENDENCIES]->(m:Module)
-            WHERE m.name = $package_name
-            RETURN f.path as file_path, 
-                   f.code as code,
-                   r.import_statement as import_statement,
-                   r.line_number as line_number
+            WHERE m.name = pkg.name
+            RETURN f, r
             LIMIT 50
-            """
-            
-            result = session.run(query, package_name=package_name)
-            
-            neighbors = []
-            for record in result:
-                neighbors.append({
-                    "file_path": record["file_path"],
-                    "import_statement": record["import_statement"],
-                    "line_number": record["line_number"],
-                    "code_context": self._extract_code_context(
-                        record["code"] or "", 
-                        record["line_number"]
-                    )
-                })
-            
-            return neighbors
+        }
+        WITH f, collect({pkg: pkg, r: r}) AS hits
+        WITH f, hits, split(coalesce(f.code, ''), '\\n') AS lines
+        UNWIND hits AS hit
+        WITH hit.pkg AS pkg, f, hit.r AS r, lines,
+             CASE WHEN hit.r.line_number > $window THEN hit.r.line_number - 1 - $window ELSE 0 END AS context_start
+        RETURN pkg.name as package_name,
+               f.path as file_path,
+               r.import_statement as import_statement,
+               r.line_number as line_number,
+               context_start,
+               lines[context_start..r.line_number + $window] as code_lines
+        """
+        
+        result = self._read(
+            query,
+            packages=[{"name": name, "version": version} for name, version in packages],
+            window=CODE_CONTEXT_WINDOW
+        )
+        
+        neighbors_by_package = {}
+        for record in result:
+            neighbors_by_package.setdefault(record["package_name"], []).append(
+                self._neighbor_from_record(record)
+            )
+        
+        return neighbors_by_package
     
-    def _extract_code_context(self, code: str, line_number: int, window: int = 5) -> str:
-        """Extract smaller code context for efficiency."""
-        if not code:
-            return ""
+    def _neighbor_from_record(self, record) -> Dict[str, Any]:
+        """Build a neighbor dict from a row carrying a server-side code window."""
+        return {
+            "file_path": record["file_path"],
+            "import_statement": record["import_statement"],
+            "line_number": record["line_number"],
+            "code_context": self._extract_code_context(
+                record["file_path"],
+                record["code_lines"],
+                record["context_start"],
+                record["line_number"]
+            )
+        }
+    
+    def _extract_code_context(self, file_path: str, code_lines: Optional[List[str]],
+                              context_start: int, line_number: int) -> str:
+        """Format a window of source lines (already sliced by Neo4j) around an import.
         
-        lines = code.split('\n')
-        start = max(0, line_number - 1 - window)
-        end = min(len(lines), line_number + window)
+        The result is capped at CODE_CONTEXT_MAX_CHARS and shared between every
+        node that refers to the same import site while the site stays cached.
+        """
+        site = (file_path, line_number)
+        if site in self._code_contexts:
+            self._code_contexts.move_to_end(site)
+            return self._code_contexts[site]
+        if not code_lines:
+            return ""
         
         context_lines = []
-        for i in range(start, end):
-            line_num = i + 1
+        for offset, line in enumerate(code_lines):
+            line_num = context_start + offset + 1
             prefix = ">>> " if line_num == line_number else "    "
-            context_lines.append(f"{line_num:4d}{prefix}{lines[i][:100]}")  # Truncate long lines
+            context_lines.append(f"{line_num:4d}{prefix}{line[:CODE_CONTEXT_LINE_CHARS]}")  # Truncate long lines
         
-        return '\n'.join(context_lines)
+        context = '\n'.join(context_lines)[:CODE_CONTEXT_MAX_CHARS]
+        self._code_contexts[site] = context
+        if len(self._code_contexts) > CODE_CONTEXT_CACHE_SIZE:
+            self._code_contexts.popitem(last=False)
+        return context
 
 
 if __name__ == "__main__":
@@ -543,7 +1142,9 @@ if __name__ == "__main__":
     agent = AgenticGraphTraversalAgent(
         llm_timeout=30,  # 30 second timeout per LLM call
         use_cache=True,  # Cache LLM responses
-        batch_size=5     # Analyze 5 files at a time
+        batch_size=5,    # Analyze 5 files at a time
+        max_concurrent_llm_calls=8,  # Expand 8 frontier nodes concurrently
+        nodes_per_prompt=4  # Score 4 nodes' neighbors per LLM call
     )
     
     try:
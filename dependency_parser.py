@@ -8,12 +8,143 @@ categorizing them into three types:
 3. External package dependencies (requirements.txt, package.json, etc.)
 """
 
+import functools
+import io
+import os
 import re
 import json
+from collections import Counter
+from dataclasses import dataclass, asdict
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Any, List, Dict, Optional, Tuple, Iterator, Union
 import config
 
+# Use orjson for package.json when available, falling back to the stdlib parser
+# (orjson.JSONDecodeError subclasses json.JSONDecodeError)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+# Literals every import statement of a language contains; files without any of
+# them cannot match an import pattern and are not scanned
+IMPORT_KEYWORDS = {
+    'python': ('import',),
+    'java': ('import',),
+    'javascript': ('import', 'require'),
+    'typescript': ('import', 'require'),
+}
+
+# Files larger than this are generated or vendored blobs, not scanned for imports
+MAX_SCAN_BYTES = 2_000_000
+# Lines at least this long (minified bundles, embedded data) are blanked before scanning
+MAX_LINE_LEN = 4096
+LONG_LINE_RE = re.compile(r'[^\n]{%d,}' % MAX_LINE_LEN)
+
+# Common standard library modules for different languages
+PYTHON_STDLIB = frozenset({
+    'os', 'sys', 're', 'json', 'datetime', 'pathlib', 'typing',
+    'collections', 'itertools', 'functools', 'logging', 'argparse'
+})
+
+# Java standard library packages, matched on the first two dotted components
+JAVA_STDLIB_PACKAGES = frozenset({
+    'java.lang', 'java.util', 'java.io', 'java.net', 'java.math'
+})
+
+JS_STDLIB = frozenset({
+    'fs', 'path', 'http', 'https', 'url', 'querystring', 'crypto'
+})
+
+
+@dataclass
+class Dependency:
+    """A direct or relative import found in a source file.
+    
+    Uses __slots__ instead of a per-record dict; __getitem__ and get keep the
+    dict-style access used by Neo4jManager and the statistics helpers working.
+    """
+    __slots__ = ('source_file', 'import_name', 'import_statement', 'line_number',
+                 'dependency_type', 'dependency_category', 'resolved_path', 'source_language')
+    
+    source_file: str
+    import_name: str
+    import_statement: str
+    line_number: int
+    dependency_type: str
+    dependency_category: str
+    resolved_path: Optional[str]
+    source_language: str
+    
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+    
+    def to_dict(self) -> Dict:
+        """Convert to a plain dictionary for serialization."""
+        return asdict(self)
+
+
+@functools.lru_cache(maxsize=65536)
+def _resolve_relative_path_cached(source_dir: str, relative_import: str) -> Optional[str]:
+    """Resolve a relative import from a source directory to a file path (memoized).
+    
+    Works on plain strings with os.path rather than building Path objects.
+    """
+    try:
+        # Handle different relative import patterns
+        if relative_import.startswith('.'):
+            # Python-style relative imports
+            parts = relative_import.split('.')
+            dots = len([p for p in parts if p == ''])
+            
+            if dots == 1:  # from .module import
+                target_path = os.path.join(source_dir, f"{parts[1]}.py")
+            elif dots == 2:  # from ..module import
+                target_path = os.path.join(os.path.dirname(source_dir), f"{parts[2]}.py")
+            elif dots == 3:  # from ...module import
+                target_path = os.path.join(os.path.dirname(os.path.dirname(source_dir)), f"{parts[3]}.py")
+            else:
+                return None
+            
+            return target_path
+        
+        elif relative_import.startswith('./') or relative_import.startswith('../'):
+            # JavaScript/TypeScript-style relative imports ('.' segments are dropped, '..' kept)
+            segments = [segment for segment in relative_import.split('/') if segment not in ('', '.')]
+            return os.path.join(source_dir, *segments) or '.'
+        
+        # For Python relative imports without dots (already stripped by regex)
+        # This handles cases like "from .app import Flask" -> relative_import = "app"
+        # e.g., "from .sansio.scaffold import something" -> relative_import = "sansio.scaffold"
+        else:
+            module_path_parts = relative_import.split('.')
+            
+            # Check if the first part of the import matches the current directory name
+            # This happens when we're in a package and importing from a submodule
+            # e.g., in src/flask/sansio/__init__.py doing "from .sansio.scaffold"
+            if module_path_parts and os.path.basename(source_dir) == module_path_parts[0]:
+                # The import is referring to the current package, don't duplicate it
+                module_path_parts = module_path_parts[1:]
+            
+            if not module_path_parts:
+                return source_dir or '.'
+            
+            # Intermediate parts are directories, the last part is the file name
+            return os.path.join(source_dir, *module_path_parts[:-1], f"{module_path_parts[-1]}.py")
+        
+    except Exception:
+        pass
+    
+    return None
+
 
 class DependencyParser:
     """Parser for extracting dependencies from source code and configuration files."""
@@ -22,8 +153,89 @@ class DependencyParser:
         self.import_patterns = config.IMPORT_PATTERNS
         self.package_patterns = config.PACKAGE_DEPENDENCY_PATTERNS
         self.package_files = config.PACKAGE_DEPENDENCY_FILES
+        
+        # One fused regex per language and import kind, scanned over the whole file
+        self._compiled_direct = {
+            language: self._compile_union(patterns.get('direct_imports', []))
+            for language, patterns in self.import_patterns.items()
+        }
+        self._compiled_relative = {
+            language: self._compile_union(patterns.get('relative_imports', []))
+            for language, patterns in self.import_patterns.items()
+        }
+        # Package file parsers, dispatched on file name
+        self._package_handlers = {
+            'package.json': self._parse_package_json,
+            'requirements.txt': self._parse_requirements_txt,
+            'pom.xml': self._parse_pom_xml,
+            'build.gradle': self._parse_gradle,
+            'build.gradle.kts': self._parse_gradle,
+        }
+        self._compiled_package = {
+            file_name: [re.compile(p, re.DOTALL if file_name == 'pom.xml' else 0) for p in patterns]
+            for file_name, patterns in self.package_patterns.items()
+            if file_name != 'package.json'
+        }
     
-    def parse_file_dependencies(self, file_path: str, content: str, language: str) -> List[Dict]:
+    @staticmethod
+    def _compile_union(patterns: List[str]) -> re.Pattern:
+        """
+        Fuse line-oriented import patterns into a single MULTILINE alternation.
+        
+        Each pattern becomes a named group g<i>; its first capture group is the
+        import name. Anchors are widened to tolerate the indentation and trailing
+        whitespace that per-line scanning used to strip, and a leading 'comment'
+        alternative consumes '#' comment lines so they are never matched.
+        
+        Leading '.*' prefixes are dropped (finditer already searches, and the
+        prefix only adds backtracking), and '^\\s*' becomes '^[ \\t]*' so an
+        anchored pattern can neither span lines nor stack two whitespace loops.
+        """
+        alternatives = [r'(?P<comment>^[ \t]*#[^\n]*)']
+        for i, pattern in enumerate(patterns):
+            anchored = pattern.startswith('^')
+            body = pattern[1:] if anchored else pattern
+            for prefix in ('.*?', '.*'):
+                if body.startswith(prefix):
+                    body, anchored = body[len(prefix):], False
+                    break
+            if anchored:
+                if body.startswith(r'\s*'):
+                    body = body[len(r'\s*'):]
+                pattern = r'^[ \t]*' + body
+            else:
+                pattern = body
+            if pattern.endswith('$') and not pattern.endswith('\\$'):
+                pattern = pattern[:-1] + r'[ \t\r]*$'
+            alternatives.append(f'(?P<g{i}>{pattern})')
+        return re.compile('|'.join(alternatives), re.MULTILINE | re.IGNORECASE)
+    
+    def _scan_imports(self, content: str, union: re.Pattern) -> Iterator[Tuple[int, str, str]]:
+        """
+        Scan a whole file with a fused import regex.
+        
+        Yields:
+            (line_number, stripped_line, import_name) for each import match
+        """
+        # Matches arrive in order, so line numbers are advanced by counting the
+        # newlines between consecutive matches; the file is never split into lines
+        line_number = 1
+        counted_to = 0
+        for match in union.finditer(content):
+            name = match.lastgroup
+            if name == 'comment':
+                continue
+            import_name = match.group(union.groupindex[name] + 1)
+            
+            start = match.start()
+            line_number += content.count('\n', counted_to, start)
+            counted_to = start
+            line_start = content.rfind('\n', 0, start) + 1
+            line_end = content.find('\n', start)
+            line = content[line_start:line_end if line_end != -1 else len(content)].strip()
+            yield line_number, line, import_name
+    
+    def parse_file_dependencies(self, file_path: str, content: str, language: str) -> List[Dependency]:
         """
         Parse dependencies from a source code file.
         
@@ -33,23 +245,35 @@ class DependencyParser:
             language: Programming language
             
         Returns:
-            List of dependency dictionaries
+            List of Dependency records
         """
         dependencies = []
         
         if language not in self.import_patterns:
             return dependencies
         
+        if len(content) > MAX_SCAN_BYTES:
+            print(f"Skipping import scan of {file_path}: {len(content)} bytes exceeds {MAX_SCAN_BYTES}")
+            return dependencies
+        if len(content) >= MAX_LINE_LEN:
+            # Newlines are kept, so line numbers of the remaining imports are unchanged
+            content = LONG_LINE_RE.sub('', content)
+        
+        keywords = IMPORT_KEYWORDS.get(language)
+        if keywords and not any(keyword in content for keyword in keywords):
+            return dependencies
+        
         language_patterns = self.import_patterns[language]
         
         # Parse direct imports
         if 'direct_imports' in language_patterns:
-            direct_deps = self._parse_direct_imports(content, language_patterns['direct_imports'], file_path)
+            direct_deps = self._parse_direct_imports(content, self._compiled_direct[language], file_path, language)
             dependencies.extend(direct_deps)
         
         # Parse relative imports
         if 'relative_imports' in language_patterns:
-            relative_deps = self._parse_relative_imports(content, language_patterns['relative_imports'], file_path)
+            relative_deps = self._parse_relative_imports(content, self._compiled_relative[language], file_path,
+                                                         language)
             dependencies.extend(relative_deps)
         
         return dependencies
@@ -69,296 +293,243 @@ class DependencyParser:
         file_name = Path(file_path).name
         
         if file_name in self.package_patterns:
-            patterns = self.package_patterns[file_name]
+            patterns = self._compiled_package.get(file_name, [])
             dependencies = self._parse_package_file(content, patterns, file_path, file_name)
         
         return dependencies
     
-    def _parse_direct_imports(self, content: str, patterns: List[str], file_path: str) -> List[Dict]:
+    def _parse_direct_imports(self, content: str, union: re.Pattern, file_path: str,
+                              language: str) -> List[Dependency]:
         """Parse direct import statements."""
         dependencies = []
         
-        for line_num, line in enumerate(content.split('\n'), 1):
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-                
-            for pattern in patterns:
-                matches = re.finditer(pattern, line, re.IGNORECASE)
-                for match in matches:
-                    import_name = match.group(1)
-                    if import_name and not self._is_standard_library(import_name):
-                        # Mark as direct_import - the Neo4j manager will try to resolve it
-                        # If it can't find a local file, it will create an external dependency
-                        dependencies.append({
-                            'source_file': file_path,
-                            'import_name': import_name,
-                            'import_statement': line,
-                            'line_number': line_num,
-                            'dependency_type': 'direct_import',
-                            'dependency_category': 'direct_imports'
-                        })
+        for line_num, line, import_name in self._scan_imports(content, union):
+            if import_name and not self._is_standard_library(import_name):
+                # Mark as direct_import - the Neo4j manager will try to resolve it
+                # If it can't find a local file, it will create an external dependency
+                dependencies.append(Dependency(
+                    source_file=file_path,
+                    import_name=import_name,
+                    import_statement=line,
+                    line_number=line_num,
+                    dependency_type='direct_import',
+                    dependency_category='direct_imports',
+                    resolved_path=None,
+                    source_language=language
+                ))
         
         return dependencies
     
-    def _parse_relative_imports(self, content: str, patterns: List[str], file_path: str) -> List[Dict]:
+    def _parse_relative_imports(self, content: str, union: re.Pattern, file_path: str,
+                                language: str) -> List[Dependency]:
         """Parse relative import statements."""
         dependencies = []
         
-        for line_num, line in enumerate(content.split('\n'), 1):
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-                
-            for pattern in patterns:
-                matches = re.finditer(pattern, line, re.IGNORECASE)
-                for match in matches:
-                    import_name = match.group(1)
-                    if import_name:
-                        # For Java, package declarations are NOT dependencies - they're namespace declarations
-                        # Skip package declarations as they don't represent actual dependencies
-                        if 'package' in line:
-                            # This is a Java package declaration - skip it
-                            continue
-                        else:
-                            # Try to resolve relative path for other languages
-                            resolved_path = self._resolve_relative_path(file_path, import_name)
-                            if resolved_path:
-                                dependencies.append({
-                                    'source_file': file_path,
-                                    'import_name': import_name,
-                                    'resolved_path': resolved_path,
-                                    'import_statement': line,
-                                    'line_number': line_num,
-                                    'dependency_type': 'relative_import',
-                                    'dependency_category': 'relative_imports'
-                                })
+        for line_num, line, import_name in self._scan_imports(content, union):
+            if import_name:
+                # For Java, package declarations are NOT dependencies - they're namespace declarations
+                # Skip package declarations as they don't represent actual dependencies
+                if 'package' in line:
+                    # This is a Java package declaration - skip it
+                    continue
+                else:
+                    # Try to resolve relative path for other languages
+                    resolved_path = self._resolve_relative_path(file_path, import_name)
+                    if resolved_path:
+                        dependencies.append(Dependency(
+                            source_file=file_path,
+                            import_name=import_name,
+                            import_statement=line,
+                            line_number=line_num,
+                            dependency_type='relative_import',
+                            dependency_category='relative_imports',
+                            resolved_path=resolved_path,
+                            source_language=language
+                        ))
         
         return dependencies
     
-    def _parse_package_file(self, content: str, patterns: List[str], file_path: str, file_name: str) -> List[Dict]:
+    def _parse_package_file(self, content: str, patterns: List[re.Pattern], file_path: str, file_name: str) -> List[Dict]:
         """Parse package configuration files."""
+        handler = self._package_handlers.get(file_name)
+        if handler is None:
+            return []
+        return handler(content, patterns, file_path)
+    
+    def _parse_package_json(self, content: str, patterns: List[re.Pattern], file_path: str) -> List[Dict]:
+        """Parse npm package.json dependencies and devDependencies."""
+        try:
+            data = _json_loads(content)
+        except json.JSONDecodeError:
+            return []
+        
+        deps = data.get('dependencies', {})
+        dev_deps = data.get('devDependencies', {})
+        
+        dependencies = [
+            {
+                'source_file': file_path,
+                'package_name': package_name,
+                'package_version': version,
+                'package_manager': 'npm',
+                'dependency_type': 'package_dependency',
+                'dependency_category': 'external_dependencies'
+            }
+            for package_name, version in deps.items()
+        ]
+        dependencies.extend(
+            {
+                'source_file': file_path,
+                'package_name': package_name,
+                'package_version': version,
+                'package_manager': 'npm',
+                'dependency_type': 'package_dependency',
+                'dependency_category': 'external_dependencies',
+                'is_dev_dependency': True
+            }
+            for package_name, version in dev_deps.items()
+        )
+        
+        return dependencies
+    
+    def _parse_requirements_txt(self, content: str, patterns: List[re.Pattern], file_path: str) -> List[Dict]:
+        """Parse pip requirements.txt lines."""
         dependencies = []
         
-        if file_name == 'package.json':
-            # Handle JSON format
-            try:
-                data = json.loads(content)
-                deps = data.get('dependencies', {})
-                dev_deps = data.get('devDependencies', {})
-                
-                for package_name, version in deps.items():
-                    dependencies.append({
-                        'source_file': file_path,
-                        'package_name': package_name,
-                        'package_version': version,
-                        'package_manager': 'npm',
-                        'dependency_type': 'package_dependency',
-                        'dependency_category': 'external_dependencies'
-                    })
-                
-                for package_name, version in dev_deps.items():
+        for line_num, line in enumerate(io.StringIO(content), 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            
+            for pattern in patterns:
+                match = pattern.match(line)
+                if match:
+                    package_name = match.group(1)
+                    version = match.group(2) if len(match.groups()) > 1 else None
+                    
                     dependencies.append({
                         'source_file': file_path,
                         'package_name': package_name,
                         'package_version': version,
-                        'package_manager': 'npm',
+                        'package_manager': 'pip',
                         'dependency_type': 'package_dependency',
                         'dependency_category': 'external_dependencies',
-                        'is_dev_dependency': True
+                        'line_number': line_num
                     })
-            except json.JSONDecodeError:
-                pass
-        
-        elif file_name == 'requirements.txt':
-            # Handle requirements.txt format
-            for line_num, line in enumerate(content.split('\n'), 1):
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                for pattern in patterns:
-                    match = re.match(pattern, line)
-                    if match:
-                        package_name = match.group(1)
-                        version = match.group(2) if len(match.groups()) > 1 else None
-                        
-                        dependencies.append({
-                            'source_file': file_path,
-                            'package_name': package_name,
-                            'package_version': version,
-                            'package_manager': 'pip',
-                            'dependency_type': 'package_dependency',
-                            'dependency_category': 'external_dependencies',
-                            'line_number': line_num
-                        })
-                        break
-        
-        elif file_name == 'pom.xml':
-            # Handle Maven XML format
-            for pattern in patterns:
-                matches = re.finditer(pattern, content, re.DOTALL)
-                for match in matches:
-                    if len(match.groups()) >= 3:
-                        group_id = match.group(1)
-                        artifact_id = match.group(2)
-                        version = match.group(3)
-                        package_name = f"{group_id}:{artifact_id}"
-                        
-                        dependencies.append({
-                            'source_file': file_path,
-                            'package_name': package_name,
-                            'package_version': version,
-                            'package_manager': 'maven',
-                            'dependency_type': 'package_dependency',
-                            'dependency_category': 'external_dependencies'
-                        })
-        
-        elif file_name in ['build.gradle', 'build.gradle.kts']:
-            # Handle Gradle format
-            for pattern in patterns:
-                matches = re.finditer(pattern, content)
-                for match in matches:
-                    package_name = match.group(1)
+                    break
+        
+        return dependencies
+    
+    def _parse_pom_xml(self, content: str, patterns: List[re.Pattern], file_path: str) -> List[Dict]:
+        """Parse Maven pom.xml dependencies."""
+        dependencies = []
+        
+        for pattern in patterns:
+            matches = pattern.finditer(content)
+            for match in matches:
+                if len(match.groups()) >= 3:
+                    group_id = match.group(1)
+                    artifact_id = match.group(2)
+                    version = match.group(3)
+                    package_name = f"{group_id}:{artifact_id}"
                     
                     dependencies.append({
                         'source_file': file_path,
                         'package_name': package_name,
-                        'package_version': None,  # Gradle often doesn't specify versions in build files
-                        'package_manager': 'gradle',
+                        'package_version': version,
+                        'package_manager': 'maven',
                         'dependency_type': 'package_dependency',
                         'dependency_category': 'external_dependencies'
                     })
         
         return dependencies
     
-    def _resolve_relative_path(self, source_file: str, relative_import: str) -> Optional[str]:
-        """Resolve a relative import to an absolute file path."""
-        try:
-            source_path = Path(source_file)
-            source_dir = source_path.parent
-            
-            # Handle different relative import patterns
-            if relative_import.startswith('.'):
-                # Python-style relative imports
-                parts = relative_import.split('.')
-                dots = len([p for p in parts if p == ''])
-                
-                if dots == 1:  # from .module import
-                    target_path = source_dir / f"{parts[1]}.py"
-                elif dots == 2:  # from ..module import
-                    target_path = source_dir.parent / f"{parts[2]}.py"
-                elif dots == 3:  # from ...module import
-                    target_path = source_dir.parent.parent / f"{parts[3]}.py"
-                else:
-                    return None
-                
-                return str(target_path)
-            
-            elif relative_import.startswith('./') or relative_import.startswith('../'):
-                # JavaScript/TypeScript-style relative imports
-                target_path = source_dir / relative_import
-                return str(target_path)
-            
-            # For Python relative imports without dots (already stripped by regex)
-            # This handles cases like "from .app import Flask" -> relative_import = "app"
-            # e.g., "from .sansio.scaffold import something" -> relative_import = "sansio.scaffold"
-            else:
-                # This handles Python relative imports where the leading dot was stripped by regex
-                # e.g., "from .app import Flask" -> relative_import = "app"
-                # e.g., "from .sansio.scaffold import something" -> relative_import = "sansio.scaffold"
-                module_path_parts = relative_import.split('.')
-                
-                # Check if the first part of the import matches the current directory name
-                # This happens when we're in a package and importing from a submodule
-                # e.g., in src/flask/sansio/__init__.py doing "from .sansio.scaffold"
-                if module_path_parts and source_dir.name == module_path_parts[0]:
-                    # The import is referring to the current package, don't duplicate it
-                    # Skip the first part and build from current directory
-                    target_path = source_dir
-                    for i, part in enumerate(module_path_parts[1:]):
-                        if i == len(module_path_parts[1:]) - 1:
-                            # Last part is the file name
-                            target_path = target_path / f"{part}.py"
-                        else:
-                            # Intermediate parts are directories
-                            target_path = target_path / part
-                else:
-                    # Normal case: build path from current directory
-                    target_path = source_dir
-                    for i, part in enumerate(module_path_parts):
-                        if i == len(module_path_parts) - 1:
-                            # Last part is the file name
-                            target_path = target_path / f"{part}.py"
-                        else:
-                            # Intermediate parts are directories
-                            target_path = target_path / part
+    def _parse_gradle(self, content: str, patterns: List[re.Pattern], file_path: str) -> List[Dict]:
+        """Parse Gradle build file dependencies."""
+        dependencies = []
+        
+        for pattern in patterns:
+            matches = pattern.finditer(content)
+            for match in matches:
+                package_name = match.group(1)
                 
-                return str(target_path)
-            
-        except Exception:
-            pass
+                dependencies.append({
+                    'source_file': file_path,
+                    'package_name': package_name,
+                    'package_version': None,  # Gradle often doesn't specify versions in build files
+                    'package_manager': 'gradle',
+                    'dependency_type': 'package_dependency',
+                    'dependency_category': 'external_dependencies'
+                })
         
-        return None
+        return dependencies
+    
+    def _resolve_relative_path(self, source_file: str, relative_import: str) -> Optional[str]:
+        """Resolve a relative import to an absolute file path."""
+        # Siblings in one directory share the cache entry for each imported module
+        return _resolve_relative_path_cached(os.path.dirname(source_file), relative_import)
     
-    def _is_standard_library(self, import_name: str) -> bool:
+    @staticmethod
+    def _is_standard_library(import_name: str) -> bool:
         """Check if an import is from the standard library."""
-        # Common standard library modules for different languages
-        python_stdlib = {
-            'os', 'sys', 're', 'json', 'datetime', 'pathlib', 'typing',
-            'collections', 'itertools', 'functools', 'logging', 'argparse'
-        }
-        
-        java_stdlib = {
-            'java.lang', 'java.util', 'java.io', 'java.net', 'java.math'
-        }
-        
-        js_stdlib = {
-            'fs', 'path', 'http', 'https', 'url', 'querystring', 'crypto'
-        }
-        
         # Check Python standard library
-        if import_name in python_stdlib:
+        if import_name in PYTHON_STDLIB:
             return True
         
-        # Check Java standard library
-        if any(import_name.startswith(lib) for lib in java_stdlib):
+        # Check Java standard library by package prefix, e.g. java.util.List -> java.util
+        if '.'.join(import_name.split('.', 2)[:2]) in JAVA_STDLIB_PACKAGES:
             return True
         
         # Check JavaScript standard library
-        if import_name in js_stdlib:
+        if import_name in JS_STDLIB:
             return True
         
         return False
     
-    def get_dependency_statistics(self, dependencies: List[Dict]) -> Dict:
+    def get_dependency_statistics(self, dependencies: List[Union[Dependency, Dict]]) -> Dict:
         """Get statistics about parsed dependencies."""
-        stats = {
+        # Counter does the tallying in C instead of a per-record if/elif ladder
+        type_counts = Counter(dep.get('dependency_type', 'unknown') for dep in dependencies)
+        manager_counts = Counter(dep['package_manager'] for dep in dependencies if dep.get('package_manager'))
+        
+        return {
             'total_dependencies': len(dependencies),
-            'direct_imports': 0,
-            'relative_imports': 0,
-            'external_dependencies': 0,
-            'package_dependencies': 0,
+            'direct_imports': type_counts['direct_import'],
+            'relative_imports': type_counts['relative_import'],
+            'external_dependencies': type_counts['external_dependency'],
+            'package_dependencies': type_counts['package_dependency'],
             'by_language': {},
-            'by_package_manager': {}
+            'by_package_manager': dict(manager_counts)
         }
+
+
+# Per-process parser used by parse_dependencies_job. Workers build it once in
+# init_parser_worker so the compiled patterns are not pickled with every job.
+_worker_parser: Optional[DependencyParser] = None
+
+
+def init_parser_worker():
+    """Initializer for pool workers: build the process-wide parser."""
+    global _worker_parser
+    _worker_parser = DependencyParser()
+
+
+def parse_dependencies_job(job: Tuple[str, str, str, bool]) -> List[Union[Dependency, Dict]]:
+    """
+    Parse one file in a worker process.
+    
+    Args:
+        job: (file_path, content, language, is_package_file) tuple
         
-        for dep in dependencies:
-            dep_type = dep.get('dependency_type', 'unknown')
-            dep_category = dep.get('dependency_category', 'unknown')
-            
-            if dep_type == 'direct_import':
-                stats['direct_imports'] += 1
-            elif dep_type == 'relative_import':
-                stats['relative_imports'] += 1
-            elif dep_type == 'external_dependency':
-                stats['external_dependencies'] += 1
-            elif dep_type == 'package_dependency':
-                stats['package_dependencies'] += 1
-            
-            # Count by package manager
-            package_manager = dep.get('package_manager')
-            if package_manager:
-                stats['by_package_manager'][package_manager] = stats['by_package_manager'].get(package_manager, 0) + 1
-        
-        return stats 
\ No newline at end of file
+    Returns:
+        Dependency records for source imports and dictionaries for package dependencies
+    """
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = DependencyParser()
+    
+    file_path, content, language, is_package_file = job
+    dependencies = _worker_parser.parse_file_dependencies(file_path, content, language)
+    if is_package_file:
+        dependencies.extend(_worker_parser.parse_package_dependencies(file_path, content))
+    return dependencies
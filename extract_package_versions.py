@@ -1,3 +1,4 @@
+import functools
 import re
 import os
 import sys
@@ -13,6 +14,37 @@ else:
     except ImportError:
         import toml as tomllib
 
+# Package name with an optional version specifier, e.g. "flask>=2.0.0" or "flask"
+REQUIREMENT_RE = re.compile(r'^([a-zA-Z0-9_\-\.]+)(?:\s*([=<>!~]+)\s*([0-9\.]+.*))?')
+# The same, applied to every line of a requirements file in one scan; comment
+# and blank lines cannot match since neither starts with a name character
+REQUIREMENT_LINE_RE = re.compile(
+    r'^[ \t]*([a-zA-Z0-9_\-\.]+)(?:[ \t]*([=<>!~]+)[ \t]*([0-9\.]+[^\r\n]*))?', re.MULTILINE
+)
+# Leading caret/tilde of Poetry version constraints
+POETRY_PREFIX_RE = re.compile(r'^[\^~]')
+
+# Directories that never hold the project's own dependency files
+SKIP_DIRS = {'.git', 'node_modules', '__pycache__', '.venv', 'venv', '.tox', '.mypy_cache'}
+
+
+def _parse_dep_string(dep: str, packages: Dict[str, str]):
+    """
+    Record the package and version from a requirement string like "flask>=2.0.0".
+    
+    A package without a version is stored as "Unknown", without overwriting a
+    version already found for it.
+    """
+    match = REQUIREMENT_RE.match(dep)
+    if not match:
+        return
+    if match.group(3):
+        # For simplicity, store the version regardless of operator
+        packages[match.group(1).lower()] = match.group(3)
+    else:
+        packages.setdefault(match.group(1).lower(), "Unknown")
+
+
 def parse_requirements_txt(file_path: str) -> Dict[str, str]:
     """
     Parse requirements.txt file and extract package versions.
@@ -23,29 +55,18 @@ def parse_requirements_txt(file_path: str) -> Dict[str, str]:
     packages = {}
     
     try:
-        with open(file_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                # Skip comments and empty lines
-                if not line or line.startswith('#'):
-                    continue
-                
-                # Match various version specifiers
-                # Examples: package==1.2.3, package>=1.2.3, package~=1.2.3
-                match = re.match(r'^([a-zA-Z0-9_\-\.]+)\s*([=<>!~]+)\s*([0-9\.]+.*)', line)
-                if match:
-                    package_name = match.group(1).lower()
-                    version_spec = match.group(2)
-                    version = match.group(3)
-                    
-                    # For simplicity, store the version regardless of operator
-                    # In production, you might want to handle version ranges
-                    packages[package_name] = version
-                else:
-                    # Package without version
-                    package_match = re.match(r'^([a-zA-Z0-9_\-\.]+)', line)
-                    if package_match:
-                        packages[package_match.group(1).lower()] = "Unknown"
+        # Decode the raw bytes once; the pattern tolerates '\r\n', so no newline translation is needed
+        content = Path(file_path).read_bytes().decode('utf-8', 'replace')
+        
+        # Match various version specifiers
+        # Examples: package==1.2.3, package>=1.2.3, package~=1.2.3
+        for match in REQUIREMENT_LINE_RE.finditer(content):
+            package_name, _, version = match.groups()
+            if version:
+                # For simplicity, store the version regardless of operator
+                packages[package_name.lower()] = version.rstrip()
+            else:
+                packages.setdefault(package_name.lower(), "Unknown")
     
     except Exception as e:
         print(f"Error parsing {file_path}: {e}")
@@ -53,6 +74,17 @@ def parse_requirements_txt(file_path: str) -> Dict[str, str]:
     return packages
 
 
+@functools.lru_cache(maxsize=256)
+def _load_pyproject(file_path: str, mtime: float) -> dict:
+    """Parse a pyproject.toml file; cached per (path, mtime) so unchanged files parse once."""
+    # tomllib requires binary mode
+    if hasattr(tomllib, 'load'):
+        with open(file_path, 'rb') as f:
+            return tomllib.load(f)
+    # Old toml library uses text mode
+    return tomllib.load(file_path)
+
+
 def parse_pyproject_toml(file_path: str) -> Dict[str, str]:
     """
     Parse pyproject.toml file and extract package versions.
@@ -63,71 +95,38 @@ def parse_pyproject_toml(file_path: str) -> Dict[str, str]:
     packages = {}
     
     try:
-        # tomllib requires binary mode
-        if hasattr(tomllib, 'load'):
-            with open(file_path, 'rb') as f:
-                data = tomllib.load(f)
-        else:
-            # Old toml library uses text mode
-            data = tomllib.load(file_path)
+        data = _load_pyproject(file_path, os.path.getmtime(file_path))
+        project = data.get('project') or {}
         
         # Check project.dependencies
-        if 'project' in data and 'dependencies' in data['project']:
-            for dep in data['project']['dependencies']:
-                # Parse dependency strings like "flask>=2.0.0"
-                match = re.match(r'^([a-zA-Z0-9_\-\.]+)\s*([=<>!~]+)\s*([0-9\.]+.*)', dep)
-                if match:
-                    package_name = match.group(1).lower()
-                    version = match.group(3)
-                    packages[package_name] = version
-                else:
-                    # Package without version
-                    package_match = re.match(r'^([a-zA-Z0-9_\-\.]+)', dep)
-                    if package_match:
-                        packages[package_match.group(1).lower()] = "Unknown"
+        for dep in project.get('dependencies', ()):
+            _parse_dep_string(dep, packages)
         
-        # Check optional dependencies
-        if 'project' in data and 'optional-dependencies' in data['project']:
-            for group, deps in data['project']['optional-dependencies'].items():
-                for dep in deps:
-                    match = re.match(r'^([a-zA-Z0-9_\-\.]+)\s*([=<>!~]+)\s*([0-9\.]+.*)', dep)
-                    if match:
-                        package_name = match.group(1).lower()
-                        version = match.group(3)
-                        packages[package_name] = version
-                    else:
-                        package_match = re.match(r'^([a-zA-Z0-9_\-\.]+)', dep)
-                        if package_match:
-                            packages[package_match.group(1).lower()] = "Unknown"
-        
-        # Check dependency-groups (new PEP 735 format)
-        if 'dependency-groups' in data:
-            for group, deps in data['dependency-groups'].items():
-                for dep in deps:
-                    if isinstance(dep, str):
-                        match = re.match(r'^([a-zA-Z0-9_\-\.]+)\s*([=<>!~]+)\s*([0-9\.]+.*)', dep)
-                        if match:
-                            package_name = match.group(1).lower()
-                            version = match.group(3)
-                            packages[package_name] = version
-                        else:
-                            package_match = re.match(r'^([a-zA-Z0-9_\-\.]+)', dep)
-                            if package_match:
-                                packages[package_match.group(1).lower()] = "Unknown"
+        # Check optional dependencies and dependency-groups (new PEP 735 format)
+        grouped_deps = [
+            dep
+            for groups in (project.get('optional-dependencies') or {}, data.get('dependency-groups') or {})
+            for deps in groups.values()
+            for dep in deps
+        ]
+        for dep in grouped_deps:
+            # dependency-groups may also hold {include-group = ...} tables
+            if isinstance(dep, str):
+                _parse_dep_string(dep, packages)
         
         # Check tool.poetry.dependencies if it's a Poetry project
-        if 'tool' in data and 'poetry' in data['tool'] and 'dependencies' in data['tool']['poetry']:
-            for pkg, version_spec in data['tool']['poetry']['dependencies'].items():
-                if pkg.lower() != 'python':  # Skip Python version requirement
-                    if isinstance(version_spec, str):
-                        # Remove caret, tilde, etc.
-                        version = re.sub(r'^[\^~]', '', version_spec)
-                        packages[pkg.lower()] = version
-                    elif isinstance(version_spec, dict) and 'version' in version_spec:
-                        version = re.sub(r'^[\^~]', '', version_spec['version'])
-                        packages[pkg.lower()] = version
-                    else:
-                        packages[pkg.lower()] = "Unknown"
+        poetry_deps = ((data.get('tool') or {}).get('poetry') or {}).get('dependencies') or {}
+        for pkg, version_spec in poetry_deps.items():
+            if pkg.lower() != 'python':  # Skip Python version requirement
+                if isinstance(version_spec, str):
+                    # Remove caret, tilde, etc.
+                    version = POETRY_PREFIX_RE.sub('', version_spec)
+                    packages[pkg.lower()] = version
+                elif isinstance(version_spec, dict) and 'version' in version_spec:
+                    version = POETRY_PREFIX_RE.sub('', version_spec['version'])
+                    packages[pkg.lower()] = version
+                else:
+                    packages[pkg.lower()] = "Unknown"
     
     except Exception as e:
         print(f"Error parsing {file_path}: {e}")
@@ -143,28 +142,27 @@ def get_flask_package_versions() -> Dict[str, str]:
         Dict mapping package names to versions
     """
     flask_repo_path = r"C:\Users\meets\AI Bootcamp\github-repo-dependency-scanner\flask-main"
-    all_packages = {}
+    requirements_results = []
+    pyproject_results = []
     
-    # Search for requirements.txt files in flask-main
+    # One walk finds both requirements*.txt and pyproject.toml files
     for root, dirs, files in os.walk(flask_repo_path):
+        # Don't descend into VCS metadata, environments or caches
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        
         for file in files:
             if file.startswith('requirements') and file.endswith('.txt'):
-                file_path = os.path.join(root, file)
-                packages = parse_requirements_txt(file_path)
-                # Update with new packages or newer versions
-                for pkg, version in packages.items():
-                    if pkg not in all_packages or version != "Unknown":
-                        all_packages[pkg] = version
-    
-    # Search for pyproject.toml files in flask-main
-    for root, dirs, files in os.walk(flask_repo_path):
-        if 'pyproject.toml' in files:
-            file_path = os.path.join(root, 'pyproject.toml')
-            packages = parse_pyproject_toml(file_path)
-            # Update with new packages or newer versions
-            for pkg, version in packages.items():
-                if pkg not in all_packages or version != "Unknown":
-                    all_packages[pkg] = version
+                requirements_results.append(parse_requirements_txt(os.path.join(root, file)))
+            elif file == 'pyproject.toml':
+                pyproject_results.append(parse_pyproject_toml(os.path.join(root, file)))
+    
+    # Merge every requirements file before any pyproject.toml, so pyproject versions win
+    all_packages = {}
+    for packages in requirements_results + pyproject_results:
+        # Update with new packages or newer versions
+        for pkg, version in packages.items():
+            if pkg not in all_packages or version != "Unknown":
+                all_packages[pkg] = version
     
     return all_packages
 
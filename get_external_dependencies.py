@@ -1,4 +1,4 @@
-from neo4j import GraphDatabase
+from neo4j_manager import get_driver
 from config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
 from typing import List, Tuple, Dict
 from extract_package_versions import get_flask_package_versions
@@ -10,32 +10,25 @@ def get_external_dependencies() -> List[Tuple[str, str]]:
     Returns:
         List of (module_name, version) tuples
     """
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    modules = []
+    driver = get_driver(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
     
     # First, get version information from Flask project files
     package_versions = get_flask_package_versions()
     
-    try:
-        with driver.session() as session:
-            # Query to get all Module nodes (external dependencies)
-            query = """
-            MATCH (m:Module)
-            WHERE m.type = 'external_module'
-            RETURN DISTINCT m.name AS module_name
-            ORDER BY m.name
-            """
-            
-            result = session.run(query)
-            
-            for record in result:
-                module_name = record["module_name"]
-                # Look up version from Flask project dependency files
-                version = package_versions.get(module_name.lower(), "Unknown")
-                modules.append((module_name, version))
-            
-    finally:
-        driver.close()
+    with driver.session() as session:
+        # Query to get all Module nodes (external dependencies)
+        query = """
+        MATCH (m:Module)
+        WHERE m.type = 'external_module'
+        RETURN DISTINCT m.name AS module_name
+        ORDER BY m.name
+        """
+        
+        # Drain the single column inside the transaction so it closes right away
+        module_names = session.execute_read(lambda tx: tx.run(query).value("module_name"))
+    
+    # Look up versions from Flask project dependency files (keys are already lower-case)
+    modules = [(name, package_versions.get(name.lower(), "Unknown")) for name in module_names]
     
     return modules
 
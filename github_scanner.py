@@ -1,33 +1,259 @@
 import os
 import re
+import sys
 import base64
+import asyncio
+import fnmatch
+import functools
+import itertools
+import json
+import tempfile
+import time
 from typing import Dict, List, Tuple, Optional, Set
-from pathlib import Path
 import requests
-from github import Github
+import aiohttp
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from tqdm import tqdm
 import config
 
+# Large tree and GraphQL responses are decoded with orjson when it is installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+# Maximum number of file downloads in flight at once
+FETCH_CONCURRENCY = 8
+# Keep-alive connections per host shared by the API and raw download clients
+HTTP_POOL_SIZE = 16
+# Below this many remaining API calls, requests are spread out until the limit resets
+RATE_LIMIT_LOW_WATER = 100
+# Times a request rejected by the rate limit is resent before the rejection is returned
+RATE_LIMIT_MAX_RETRIES = 3
+# Files requested per GraphQL query when fetching blob text
+GRAPHQL_BATCH_SIZE = 50
+GRAPHQL_URL = "https://api.github.com/graphql"
+# Seconds between progress bar redraws; each redraw writes to the terminal
+PROGRESS_MININTERVAL = 0.5
+# Trees are cached per commit SHA and file contents per blob SHA, so re-scans
+# only download what changed
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'github-scanner')
+
+# Standard library modules for different languages, built once instead of per lookup
+JAVA_STDLIB_PREFIXES = ('java.', 'javax.', 'sun.', 'com.sun.', 'org.w3c.', 'org.xml.')
+NODE_STDLIB = frozenset({
+    'fs', 'path', 'http', 'https', 'url', 'querystring', 'crypto',
+    'stream', 'events', 'util', 'buffer', 'os', 'child_process',
+    'cluster', 'dgram', 'dns', 'domain', 'net', 'readline', 'repl',
+    'string_decoder', 'tls', 'tty', 'v8', 'vm', 'zlib'
+})
+# sys.stdlib_module_names (Python 3.10+) lists every stdlib module; older
+# interpreters fall back to the common ones
+PYTHON_STDLIB = frozenset(getattr(sys, 'stdlib_module_names', (
+    'os', 'sys', 're', 'json', 'datetime', 'collections', 'itertools',
+    'functools', 'pathlib', 'typing', 'abc', 'threading', 'asyncio',
+    'logging', 'urllib', 'http', 'socket', 'subprocess', 'tempfile',
+    'shutil', 'glob', 'fnmatch', 'pickle', 'copy', 'hashlib', 'base64'
+)))
+TOP_LEVEL_STDLIBS = {
+    'python': PYTHON_STDLIB,
+    'javascript': NODE_STDLIB,
+    'typescript': NODE_STDLIB
+}
+# Substrings marking an import as internal to the scanned project (Spring Framework specific)
+SPRING_PATTERNS = (
+    'org.springframework', 'spring', 'framework', 'core', 'context',
+    'beans', 'web', 'data', 'security', 'boot', 'cloud'
+)
+
+
+def progress_bar(iterable=None, total: Optional[int] = None, **kwargs) -> tqdm:
+    """tqdm bar that redraws at most every PROGRESS_MININTERVAL seconds and ~200 times overall.
+    
+    Args:
+        iterable: Items to iterate over, or None for a manually updated bar
+        total: Number of items (defaults to len(iterable) when available)
+        **kwargs: Passed through to tqdm (desc, leave, ...)
+        
+    Returns:
+        tqdm instance
+    """
+    if total is None and hasattr(iterable, '__len__'):
+        total = len(iterable)
+    return tqdm(iterable, total=total, mininterval=PROGRESS_MININTERVAL,
+                miniters=max(1, (total or 0) // 200), smoothing=0.1, **kwargs)
+
 
 class GitHubScanner:
     """Scans GitHub repositories for dependency information."""
     
-    def __init__(self, token: str = None):
+    def __init__(self, token: str = None, tokens: List[str] = None, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
         """Initialize the GitHub scanner.
         
         Args:
-            token: GitHub API token for authentication
+            token: GitHub API token for authentication; a comma-separated list
+                enables rotation across several tokens
+            tokens: GitHub API tokens to rotate between (overrides token)
+            cache_dir: Directory for cached trees and file contents (None disables caching)
         """
-        self.token = token or config.GITHUB_TOKEN
+        self.cache_dir = cache_dir
+        if not tokens:
+            tokens = [t.strip() for t in (token or config.GITHUB_TOKEN or '').split(',') if t.strip()]
+        self.tokens = tokens
+        self.token = tokens[0] if tokens else None
+        
+        # Requests round-robin over the tokens; tokens close to their limit are
+        # skipped until the reset time recorded here
+        self._token_cycle = itertools.cycle(tokens)
+        self._token_reset: Dict[str, float] = {}
+        # While quota is low, the next request is held back until this time
+        self._next_request_at = 0.0
+        
         if self.token:
-            print(f"🔑 Using GitHub token (length: {len(self.token)})")
-            self.github = Github(self.token)
+            print(f"🔑 Using {len(self.tokens)} GitHub token(s) (length: {len(self.token)})")
         else:
             print("⚠️  No GitHub token provided - using unauthenticated requests")
-            self.github = None
+        self._github = None
+        
+        # One pooled session for API calls and raw.githubusercontent.com downloads,
+        # so connections (and their TLS handshakes) are reused across requests; the
+        # adapter retries transient errors and the response hook owns rate limiting
         self.session = requests.Session()
-        if self.token:
-            self.session.headers.update({'Authorization': f'token {self.token}'})
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE,
+                              max_retries=self._make_retry(rate_limit=False))
+        self.session.mount('https://api.github.com', adapter)
+        self.session.mount('https://raw.githubusercontent.com', adapter)
+        self.session.auth = self._authorize
+        self.session.hooks['response'].append(self._rate_limit_hook)
+        
+        # Path filters, compiled once instead of looping over the config lists per file
+        self._exclude_dirs = frozenset(config.EXCLUDE_DIRS)
+        self._ext_lang = dict(config.SUPPORTED_EXTENSIONS)
+        self._exclude_files_re = re.compile(
+            '|'.join(fnmatch.translate(pattern) for pattern in config.EXCLUDE_FILES) or '(?!)'
+        )
+        
+        # Repository and revision of the last listing, used to fetch blob text by path
+        self._repo: Optional[Tuple[str, str]] = None
+        self._ref = "HEAD"
+    
+    @property
+    def github(self):
+        """PyGithub client for occasional convenience calls, created on first use.
+        
+        Listing and downloading go through self.session; this is None without a token.
+        """
+        if self._github is None and self.token:
+            from github import Github
+            self._github = Github(self.token, retry=self._make_retry(), pool_size=HTTP_POOL_SIZE)
+        return self._github
+    
+    @staticmethod
+    def _make_retry(rate_limit: bool = True) -> Retry:
+        """Retry policy for transient GitHub errors, and 429s unless rate_limit is False.
+        
+        The session passes rate_limit=False because its response hook already handles
+        429s; retrying them in both layers would wait twice per rejection.
+        """
+        statuses = [429, 502, 503, 504] if rate_limit else [502, 503, 504]
+        return Retry(total=5, backoff_factor=0.5, status_forcelist=statuses)
+    
+    def _fresh_token(self) -> Optional[str]:
+        """Return the next token in rotation that is not close to its rate limit, or None."""
+        now = time.time()
+        for _ in range(len(self.tokens)):
+            token = next(self._token_cycle)
+            if self._token_reset.get(token, 0) <= now:
+                return token
+        return None
+    
+    def _next_token(self) -> str:
+        """Return the token to use for the next request, preferring ones with quota left."""
+        return self._fresh_token() or min(self.tokens, key=lambda token: self._token_reset.get(token, 0))
+    
+    def _auth_headers(self) -> Dict[str, str]:
+        """Authorization header for the next request."""
+        return {'Authorization': f'token {self._next_token()}'} if self.tokens else {}
+    
+    def _authorize(self, request: requests.PreparedRequest) -> requests.PreparedRequest:
+        """requests auth callable that paces requests while quota is low and rotates the token."""
+        delay = self._next_request_at - time.time()
+        if delay > 0:
+            if delay >= 1:
+                print(f"⏳ GitHub rate limit: waiting {delay:.0f}s")
+            time.sleep(delay)
+        request.headers.update(self._auth_headers())
+        return request
+    
+    def _note_rate_limit(self, authorization: Optional[str], headers):
+        """Record that the token behind a response is running low on quota."""
+        remaining = headers.get('X-RateLimit-Remaining')
+        if authorization and remaining and remaining.isdigit() and int(remaining) < RATE_LIMIT_LOW_WATER:
+            token = authorization.split(' ', 1)[-1]
+            self._token_reset[token] = float(headers.get('X-RateLimit-Reset', 0))
+    
+    @staticmethod
+    def _rate_limit_delay(status: int, headers) -> float:
+        """Seconds to wait before the next request, based on GitHub's rate-limit headers.
+        
+        Args:
+            status: HTTP status code of the response
+            headers: Response headers
+            
+        Returns:
+            0 when there is quota to spare, otherwise the delay to apply
+        """
+        retry_after = headers.get('Retry-After')
+        if status in (403, 429) and retry_after and retry_after.isdigit():
+            return float(retry_after)
+        
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is None or not remaining.isdigit() or int(remaining) >= RATE_LIMIT_LOW_WATER:
+            return 0.0
+        
+        until_reset = max(0.0, float(headers.get('X-RateLimit-Reset', 0)) - time.time())
+        # Exhausted: wait for the reset; running low: spread the remaining calls over the window
+        return until_reset / (int(remaining) + 1)
+    
+    def _rate_limit_hook(self, response: requests.Response, *args, **kwargs) -> requests.Response:
+        """Session response hook that paces requests, and resends ones rejected by the rate limit.
+        
+        A rejected request is resent at most RATE_LIMIT_MAX_RETRIES times; after that
+        the rejection is returned to the caller.
+        """
+        self._note_rate_limit(response.request.headers.get('Authorization'), response.headers)
+        delay = self._rate_limit_delay(response.status_code, response.headers)
+        if delay <= 0:
+            return response
+        
+        rate_limited = response.status_code in (403, 429) and (
+            'Retry-After' in response.headers or response.headers.get('X-RateLimit-Remaining') == '0'
+        )
+        # Another token still has quota, so switch to it instead of waiting
+        switch_token = len(self.tokens) > 1 and self._fresh_token() is not None
+        
+        if not rate_limited:
+            # Running low: hold back the next request once, rather than this response
+            if not switch_token:
+                self._next_request_at = max(self._next_request_at, time.time() + delay)
+            return response
+        
+        retries = getattr(response.request, 'rate_limit_retries', 0)
+        if retries >= RATE_LIMIT_MAX_RETRIES:
+            return response
+        response.request.rate_limit_retries = retries + 1
+        
+        if not switch_token:
+            if delay >= 1:
+                print(f"⏳ GitHub rate limit: waiting {delay:.0f}s")
+            time.sleep(delay)
+        return self.session.send(self._authorize(response.request), **kwargs)
     
     def get_repo_contents(self, owner: str, repo: str, path: str = "") -> List[Dict]:
         """Get repository contents recursively.
@@ -41,38 +267,100 @@ class GitHubScanner:
             List of file/directory information
         """
         print(f"🔍 Getting contents for path: {path or 'root'}")
-        if self.github:
-            return self._get_contents_via_api(owner, repo, path)
-        else:
-            return self._get_contents_via_web(owner, repo, path)
-    
-    def _get_contents_via_api(self, owner: str, repo: str, path: str = "") -> List[Dict]:
-        """Get contents using GitHub API."""
+        self._repo = (owner, repo)
+        self._ref = "HEAD"
         try:
-            repository = self.github.get_repo(f"{owner}/{repo}")
-            contents = repository.get_contents(path)
+            return self._get_contents_via_tree_api(owner, repo, path)
+        except (requests.RequestException, KeyError, ValueError) as e:
+            print(f"Error getting contents via tree API, falling back to contents API: {e}")
+        
+        return self._get_contents_via_web(owner, repo, path)
+    
+    def _get_contents_via_tree_api(self, owner: str, repo: str, path: str = "") -> List[Dict]:
+        """Get contents with one recursive Git Tree API call instead of one request per directory.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            path: Path within repository (empty for root)
             
-            files = []
-            for content in contents:
-                if content.type == "dir":
-                    # Recursively get contents of subdirectories
-                    sub_files = self._get_contents_via_api(owner, repo, content.path)
-                    files.extend(sub_files)
-                else:
-                    # Check if file should be included
-                    if self._should_include_file(content.path):
-                        files.append({
-                            'path': content.path,
-                            'name': content.name,
-                            'size': content.size,
-                            'type': content.type,
-                            'sha': content.sha,
-                            'url': content.download_url
-                        })
-            return files
-        except Exception as e:
-            print(f"Error getting contents via API: {e}")
-            return []
+        Returns:
+            List of file information
+        """
+        repo_url = f"https://api.github.com/repos/{owner}/{repo}"
+        
+        response = self.session.get(repo_url)
+        response.raise_for_status()
+        branch = response.json()['default_branch']
+        
+        response = self.session.get(f"{repo_url}/branches/{branch}")
+        response.raise_for_status()
+        commit_sha = response.json()['commit']['sha']
+        self._ref = commit_sha
+        
+        # A commit's tree never changes, so a cached listing is always valid
+        tree_cache_path = os.path.join(self.cache_dir, 'trees', f"{commit_sha}.json") if self.cache_dir else None
+        entries = None
+        if tree_cache_path and os.path.exists(tree_cache_path):
+            try:
+                with open(tree_cache_path, 'rb') as f:
+                    entries = _json_loads(f.read())
+            except (OSError, ValueError):
+                entries = None
+        if entries is None:
+            entries = [
+                {'path': entry['path'], 'sha': entry['sha'], 'size': entry.get('size', 0)}
+                for entry in self._get_tree_entries(repo_url, commit_sha)
+            ]
+            if tree_cache_path:
+                self._write_cache_file(tree_cache_path, _json_dumps(entries))
+        
+        prefix = path.strip('/')
+        files = []
+        for entry in entries:
+            entry_path = entry['path']
+            if prefix and not entry_path.startswith(prefix + '/'):
+                continue
+            extension = self._included_extension(entry_path)
+            if extension is not None:
+                files.append({
+                    'path': entry_path,
+                    'name': entry_path.rsplit('/', 1)[-1],
+                    'size': entry.get('size', 0),
+                    'type': 'file',
+                    'sha': entry['sha'],
+                    'url': f"https://raw.githubusercontent.com/{owner}/{repo}/{commit_sha}/{entry_path}",
+                    'extension': extension
+                })
+        return files
+    
+    def _get_tree_entries(self, repo_url: str, tree_sha: str, prefix: str = "") -> List[Dict]:
+        """Get all blob entries below a tree, with paths relative to the repository root.
+        
+        GitHub truncates very large recursive trees; in that case the tree is
+        listed one level deep and each subtree is fetched recursively on its own.
+        """
+        response = self.session.get(f"{repo_url}/git/trees/{tree_sha}", params={'recursive': 1})
+        response.raise_for_status()
+        tree = _json_loads(response.content)
+        
+        if not tree.get('truncated'):
+            return [
+                dict(entry, path=prefix + entry['path'])
+                for entry in tree['tree'] if entry['type'] == 'blob'
+            ]
+        
+        response = self.session.get(f"{repo_url}/git/trees/{tree_sha}")
+        response.raise_for_status()
+        
+        entries = []
+        for entry in _json_loads(response.content)['tree']:
+            entry_path = prefix + entry['path']
+            if entry['type'] == 'blob':
+                entries.append(dict(entry, path=entry_path))
+            elif entry['type'] == 'tree' and entry['path'] not in config.EXCLUDE_DIRS:
+                entries.extend(self._get_tree_entries(repo_url, entry['sha'], entry_path + '/'))
+        return entries
     
     def _get_contents_via_web(self, owner: str, repo: str, path: str = "") -> List[Dict]:
         """Get contents using GitHub web interface (fallback)."""
@@ -81,7 +369,7 @@ class GitHubScanner:
             response = self.session.get(url)
             response.raise_for_status()
             
-            contents = response.json()
+            contents = _json_loads(response.content)
             if not isinstance(contents, list):
                 contents = [contents]
             
@@ -93,14 +381,16 @@ class GitHubScanner:
                     files.extend(sub_files)
                 else:
                     # Check if file should be included
-                    if self._should_include_file(content['path']):
+                    extension = self._included_extension(content['path'])
+                    if extension is not None:
                         files.append({
                             'path': content['path'],
                             'name': content['name'],
                             'size': content['size'],
                             'type': content['type'],
                             'sha': content['sha'],
-                            'url': content.get('download_url')
+                            'url': content.get('download_url') or self._raw_url(owner, repo, content['path']),
+                            'extension': extension
                         })
             return files
         except Exception as e:
@@ -116,40 +406,32 @@ class GitHubScanner:
         Returns:
             True if file should be included, False otherwise
         """
-        path_parts = Path(file_path).parts
+        return self._included_extension(file_path) is not None
+    
+    def _included_extension(self, file_path: str) -> Optional[str]:
+        """Return the lower-cased extension of a file that should be scanned, else None.
+        
+        The extension is kept on the file info, so later steps need no Path objects.
+        """
+        parts = file_path.split('/')
         
         # Check if any directory in the path should be excluded
-        for part in path_parts:
-            if part in config.EXCLUDE_DIRS:
-                return False
+        if not self._exclude_dirs.isdisjoint(parts):
+            return None
         
-        # Check file extension
-        file_ext = Path(file_path).suffix.lower()
-        if file_ext not in config.SUPPORTED_EXTENSIONS:
-            return False
+        # Check file extension (like os.path.splitext, without building a tuple)
+        file_name = parts[-1]
+        dot = file_name.rfind('.')
+        extension = file_name[dot:].lower() if dot > 0 else ''
+        if extension not in self._ext_lang:
+            return None
         
         # Check file name patterns
-        file_name = Path(file_path).name
-        for pattern in config.EXCLUDE_FILES:
-            if self._matches_pattern(file_name, pattern):
-                return False
-        
-        return True
+        return None if self._exclude_files_re.match(file_name) else extension
     
-    def _matches_pattern(self, filename: str, pattern: str) -> bool:
-        """Check if filename matches a pattern.
-        
-        Args:
-            filename: Name of the file
-            pattern: Pattern to match against
-            
-        Returns:
-            True if filename matches pattern, False otherwise
-        """
-        if pattern.startswith('*.'):
-            ext = pattern[1:]
-            return filename.endswith(ext)
-        return filename == pattern
+    def _raw_url(self, owner: str, repo: str, path: str) -> str:
+        """raw.githubusercontent.com URL of a file at the revision being scanned."""
+        return f"https://raw.githubusercontent.com/{owner}/{repo}/{self._ref}/{path}"
     
     def get_file_content(self, file_info: Dict) -> Optional[str]:
         """Get the content of a file.
@@ -160,22 +442,193 @@ class GitHubScanner:
         Returns:
             File content as string, or None if error
         """
+        cached = self._read_cached_blob(file_info)
+        if cached is not None:
+            return cached
+        
+        url = file_info.get('url')
+        if not url:
+            owner, repo = self._repo or (config.REPO_OWNER, config.REPO_NAME)
+            url = self._raw_url(owner, repo, file_info['path'])
+        
         try:
-            if file_info.get('url'):
-                response = self.session.get(file_info['url'])
-                response.raise_for_status()
-                return response.text
-            else:
-                # Fallback: try to get content via API
-                if self.github:
-                    owner, repo = config.REPO_OWNER, config.REPO_NAME
-                    repository = self.github.get_repo(f"{owner}/{repo}")
-                    content = repository.get_contents(file_info['path'])
-                    return content.decoded_content.decode('utf-8', errors='ignore')
+            response = self.session.get(url)
+            response.raise_for_status()
+            self._write_cached_blob(file_info, response.text)
+            return response.text
         except Exception as e:
             print(f"Error getting file content for {file_info['path']}: {e}")
             return None
     
+    def get_file_contents(self, file_infos: List[Dict]) -> List[Optional[str]]:
+        """Get the contents of many files concurrently.
+        
+        Args:
+            file_infos: File information dictionaries
+            
+        Returns:
+            File contents in the same order as file_infos, None where a download failed
+        """
+        # Unchanged files are served from the blob cache without any request
+        contents = [self._read_cached_blob(file_info) for file_info in file_infos]
+        uncached = [i for i, content in enumerate(contents) if content is None]
+        
+        # GraphQL needs a token; it returns the text of a whole batch of files per request
+        if uncached and self.token and self._repo:
+            owner, repo = self._repo
+            texts = self._graphql_fetch_blobs(owner, repo, [file_infos[i]['path'] for i in uncached])
+            for i in uncached:
+                contents[i] = texts.get(file_infos[i]['path'])
+        
+        # Binary, truncated or failed blobs fall back to individual downloads
+        missing = [i for i in uncached if contents[i] is None]
+        if missing:
+            fetched = asyncio.run(self._fetch_all_contents([file_infos[i] for i in missing]))
+            for i, content in zip(missing, fetched):
+                contents[i] = content
+        
+        for i in uncached:
+            if contents[i] is not None:
+                self._write_cached_blob(file_infos[i], contents[i])
+        return contents
+    
+    def _blob_cache_path(self, file_info: Dict) -> Optional[str]:
+        """Path of a file's cached content, keyed by its blob SHA (None when caching is off)."""
+        sha = file_info.get('sha')
+        if not self.cache_dir or not sha:
+            return None
+        return os.path.join(self.cache_dir, 'blobs', sha[:2], sha)
+    
+    def _read_cached_blob(self, file_info: Dict) -> Optional[str]:
+        """Return a file's content from the blob cache, or None on a miss."""
+        cache_path = self._blob_cache_path(file_info)
+        if cache_path is None:
+            return None
+        try:
+            with open(cache_path, 'rb') as f:
+                return f.read().decode('utf-8')
+        except (OSError, UnicodeDecodeError):
+            return None
+    
+    def _write_cached_blob(self, file_info: Dict, content: str):
+        """Store a file's content in the blob cache."""
+        cache_path = self._blob_cache_path(file_info)
+        if cache_path is not None:
+            self._write_cache_file(cache_path, content.encode('utf-8'))
+    
+    @staticmethod
+    def _write_cache_file(cache_path: str, data: bytes):
+        """Write a cache entry atomically, so readers never see a partial file."""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path))
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"Warning: could not write cache entry {cache_path}: {e}")
+    
+    def _graphql_fetch_blobs(self, owner: str, repo: str, paths: List[str]) -> Dict[str, Optional[str]]:
+        """Fetch the text of many files with batched GraphQL queries.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            paths: File paths within the repository
+            
+        Returns:
+            Dictionary mapping path to text, None for binary, truncated or missing blobs
+        """
+        texts: Dict[str, Optional[str]] = {}
+        batches = [paths[i:i + GRAPHQL_BATCH_SIZE] for i in range(0, len(paths), GRAPHQL_BATCH_SIZE)]
+        
+        for batch in progress_bar(batches, desc="Fetching files (GraphQL)", leave=False):
+            # One aliased object() lookup per file; expressions are passed as variables
+            declarations = ", ".join(f"$e{i}: String!" for i in range(len(batch)))
+            fields = " ".join(
+                f"f{i}: object(expression: $e{i}) {{ ... on Blob {{ text isBinary isTruncated }} }}"
+                for i in range(len(batch))
+            )
+            query = (f"query($owner: String!, $name: String!, {declarations}) "
+                     f"{{ repository(owner: $owner, name: $name) {{ {fields} }} }}")
+            variables = {'owner': owner, 'name': repo}
+            variables.update({f"e{i}": f"{self._ref}:{path}" for i, path in enumerate(batch)})
+            
+            try:
+                response = self.session.post(GRAPHQL_URL, json={'query': query, 'variables': variables})
+                response.raise_for_status()
+                repository = (_json_loads(response.content).get('data') or {}).get('repository') or {}
+            except (requests.RequestException, ValueError) as e:
+                print(f"Error fetching files via GraphQL: {e}")
+                repository = {}
+            
+            for i, path in enumerate(batch):
+                blob = repository.get(f"f{i}") or {}
+                if blob.get('isBinary') or blob.get('isTruncated'):
+                    texts[path] = None
+                else:
+                    texts[path] = blob.get('text')
+        
+        return texts
+    
+    async def _fetch_all_contents(self, file_infos: List[Dict]) -> List[Optional[str]]:
+        """Download all files over one aiohttp session with bounded concurrency."""
+        semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+        connector = aiohttp.TCPConnector(limit=FETCH_CONCURRENCY)
+        
+        async with aiohttp.ClientSession(connector=connector) as session:
+            with progress_bar(total=len(file_infos), desc="Fetching files", leave=False) as progress:
+                async def fetch(file_info: Dict) -> Optional[str]:
+                    try:
+                        return await self._fetch_content(semaphore, session, file_info)
+                    finally:
+                        progress.update(1)
+                
+                results = await asyncio.gather(*(fetch(file_info) for file_info in file_infos),
+                                               return_exceptions=True)
+        
+        contents = []
+        for file_info, result in zip(file_infos, results):
+            if isinstance(result, BaseException):
+                print(f"Error getting file content for {file_info['path']}: {result}")
+                result = None
+            contents.append(result)
+        return contents
+    
+    async def _fetch_content(self, semaphore: asyncio.Semaphore, session: aiohttp.ClientSession,
+                             file_info: Dict) -> Optional[str]:
+        """Download one file, pausing while the rate limit is exhausted."""
+        url = file_info.get('url')
+        if not url:
+            owner, repo = self._repo or (config.REPO_OWNER, config.REPO_NAME)
+            url = self._raw_url(owner, repo, file_info['path'])
+        
+        async with semaphore:
+            for attempt in range(2):
+                headers = self._auth_headers()
+                async with session.get(url, headers=headers) as response:
+                    self._note_rate_limit(headers.get('Authorization'), response.headers)
+                    delay = self._rate_limit_delay(response.status, response.headers)
+                    rate_limited = response.status in (403, 429) and delay > 0
+                    if delay > 0 and len(self.tokens) > 1 and self._fresh_token():
+                        # Another token still has quota, so switch to it instead of waiting
+                        delay = 0.0
+                    if rate_limited and attempt == 0:
+                        # Rejected by the rate limit: wait it out if needed, then try once more
+                        await asyncio.sleep(delay)
+                        continue
+                    response.raise_for_status()
+                    text = await response.text(errors='ignore')
+                
+                # Waiting while holding the slot makes the other downloads back off too
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                return text
+    
     def scan_repository(self, owner: str, repo: str) -> List[Dict]:
         """Scan entire repository for files.
         
@@ -189,18 +642,38 @@ class GitHubScanner:
         print(f"Scanning repository: {owner}/{repo}")
         files = self.get_repo_contents(owner, repo)
         print("Scanning finished")
-        # Filter and categorize files
-        categorized_files = []
-        for file_info in tqdm(files, desc="Processing files"):
-            file_ext = Path(file_info['path']).suffix.lower()
-            language = config.SUPPORTED_EXTENSIONS.get(file_ext, 'unknown')
-            
-            file_info['language'] = language
-            file_info['extension'] = file_ext
-            categorized_files.append(file_info)
+        # Categorize files; a plain loop, too cheap per file to be worth a progress bar
+        ext_lang = self._ext_lang
+        for file_info in files:
+            file_info['language'] = ext_lang.get(file_info['extension'], 'unknown')
         
-        print(f"Found {len(categorized_files)} files to analyze")
-        return categorized_files
+        print(f"Found {len(files)} files to analyze")
+        return files
+
+
+@functools.lru_cache(maxsize=8192)
+def _classify_dependency(import_name: str, language: str) -> str:
+    """Classify an import as 'internal', 'external' or 'standard_library' (memoized).
+    
+    The same imports recur across thousands of files, and the result depends
+    only on the name and language.
+    """
+    # Check if it's a standard library import
+    if language == 'java':
+        # str.startswith checks the whole prefix tuple in one call
+        if import_name.startswith(JAVA_STDLIB_PREFIXES):
+            return 'standard_library'
+    elif language in TOP_LEVEL_STDLIBS:
+        # For Python, JS, TS, check if it's a top-level standard library module
+        if import_name.split('.', 1)[0] in TOP_LEVEL_STDLIBS[language]:
+            return 'standard_library'
+    
+    # Check if it's likely an internal dependency (Spring Framework specific)
+    name_lower = import_name.lower()
+    if any(pattern in name_lower for pattern in SPRING_PATTERNS):
+        return 'internal'
+    
+    return 'external'
 
 
 class DependencyParser:
@@ -209,15 +682,27 @@ class DependencyParser:
     def __init__(self):
         """Initialize the dependency parser."""
         self.compiled_patterns = {}
+        # language -> {outer group name: range of that pattern's own capture groups}
+        self._pattern_groups = {}
         self._compile_patterns()
     
     def _compile_patterns(self):
-        """Compile regex patterns for better performance."""
+        """Compile each language's patterns into one alternation scanned over the whole file."""
         for language, patterns in config.IMPORT_PATTERNS.items():
-            self.compiled_patterns[language] = [
-                re.compile(pattern, re.MULTILINE | re.IGNORECASE)
-                for pattern in patterns
-            ]
+            alternatives = []
+            groups = {}
+            group_index = 0
+            for i, pattern in enumerate(patterns):
+                # Each pattern becomes named group g<i>; its own groups follow it in numbering
+                inner_groups = re.compile(pattern).groups
+                alternatives.append(f'(?P<g{i}>{pattern})')
+                groups[f'g{i}'] = range(group_index + 2, group_index + 2 + inner_groups)
+                group_index += 1 + inner_groups
+            
+            self.compiled_patterns[language] = re.compile(
+                '|'.join(alternatives), re.MULTILINE | re.IGNORECASE
+            )
+            self._pattern_groups[language] = groups
     
     def parse_dependencies(self, file_path: str, content: str, language: str) -> List[Dict]:
         """Parse dependencies from file content.
@@ -235,28 +720,32 @@ class DependencyParser:
         if language not in self.compiled_patterns:
             return dependencies
         
-        lines = content.split('\n')
-        for line_num, line in enumerate(lines, 1):
-            for pattern in self.compiled_patterns[language]:
-                matches = pattern.findall(line)
-                for match in matches:
-                    if isinstance(match, tuple):
-                        # Handle patterns with multiple groups
-                        for group in match:
-                            if group:
-                                dep = self._create_dependency(
-                                    file_path, group, line.strip(), line_num, language
-                                )
-                                if dep:
-                                    dependencies.append(dep)
-                    else:
-                        # Handle patterns with single group
-                        if match:
-                            dep = self._create_dependency(
-                                file_path, match, line.strip(), line_num, language
-                            )
-                            if dep:
-                                dependencies.append(dep)
+        pattern_groups = self._pattern_groups[language]
+        # Line numbers are counted incrementally from the previous match, since
+        # finditer yields matches in order; no per-line list is built
+        line_num, counted_to = 1, 0
+        
+        for match in self.compiled_patterns[language].finditer(content):
+            # The outer group closes last, so lastgroup names the pattern that matched
+            inner_groups = pattern_groups[match.lastgroup]
+            # Patterns with groups yield every non-empty group, as findall did
+            matched = [k for k in inner_groups if match.group(k)] if inner_groups else [0]
+            names = [match.group(k) for k in matched if match.group(k)]
+            if not names:
+                continue
+            
+            # Take the line of the import name; a leading \s* may have spanned blank lines
+            position = match.start(matched[0])
+            line_num += content.count('\n', counted_to, position)
+            counted_to = position
+            line_start = content.rfind('\n', 0, position) + 1
+            line_end = content.find('\n', position)
+            line = content[line_start:line_end if line_end != -1 else len(content)].strip()
+            
+            for name in names:
+                dep = self._create_dependency(file_path, name, line, line_num, language)
+                if dep:
+                    dependencies.append(dep)
         
         return dependencies
     
@@ -302,51 +791,4 @@ class DependencyParser:
         Returns:
             Dependency type ('internal', 'external', 'standard_library')
         """
-        # Standard library modules for different languages
-        std_libs = {
-            'java': {
-                'java.', 'javax.', 'sun.', 'com.sun.', 'org.w3c.', 'org.xml.'
-            },
-            'python': {
-                'os', 'sys', 're', 'json', 'datetime', 'collections', 'itertools',
-                'functools', 'pathlib', 'typing', 'abc', 'threading', 'asyncio',
-                'logging', 'urllib', 'http', 'socket', 'subprocess', 'tempfile',
-                'shutil', 'glob', 'fnmatch', 'pickle', 'copy', 'hashlib', 'base64'
-            },
-            'javascript': {
-                'fs', 'path', 'http', 'https', 'url', 'querystring', 'crypto',
-                'stream', 'events', 'util', 'buffer', 'os', 'child_process',
-                'cluster', 'dgram', 'dns', 'domain', 'net', 'readline', 'repl',
-                'string_decoder', 'tls', 'tty', 'v8', 'vm', 'zlib'
-            },
-            'typescript': {
-                'fs', 'path', 'http', 'https', 'url', 'querystring', 'crypto',
-                'stream', 'events', 'util', 'buffer', 'os', 'child_process',
-                'cluster', 'dgram', 'dns', 'domain', 'net', 'readline', 'repl',
-                'string_decoder', 'tls', 'tty', 'v8', 'vm', 'zlib'
-            }
-        }
-        
-        # Check if it's a standard library import
-        if language in std_libs:
-            if language == 'java':
-                for std_prefix in std_libs[language]:
-                    if import_name.startswith(std_prefix):
-                        return 'standard_library'
-            else:
-                # For Python, JS, TS, check if it's a top-level standard library module
-                first_part = import_name.split('.')[0]
-                if first_part in std_libs[language]:
-                    return 'standard_library'
-        
-        # Check if it's likely an internal dependency (Spring Framework specific)
-        spring_patterns = [
-            'org.springframework', 'spring', 'framework', 'core', 'context',
-            'beans', 'web', 'data', 'security', 'boot', 'cloud'
-        ]
-        
-        for pattern in spring_patterns:
-            if pattern.lower() in import_name.lower():
-                return 'internal'
-        
-        return 'external' 
\ No newline at end of file
+        return _classify_dependency(import_name, language)
\ No newline at end of file
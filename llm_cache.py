@@ -0,0 +1,84 @@
+"""
+LLM Response Cache - Two-tier cache for LLM completions.
+
+Responses are keyed by a SHA-256 hash of the full request (model, messages and
+sampling parameters), kept in a bounded in-memory LRU and persisted to SQLite
+so each lookup or insert touches a single row instead of the whole cache. The
+database runs in WAL mode so parallel workers can share one cache file, and a
+lock lets threads share one cache instance.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class LLMResponseCache:
+    """In-memory LRU in front of an on-disk SQLite store of LLM responses."""
+
+    def __init__(self, path: str = "llm_cache.sqlite", memory_size: int = 1000,
+                 mmap_size: int = 64 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file backing the cache
+            memory_size: Maximum number of responses kept in memory
+            mmap_size: Bytes of the database file SQLite may memory-map for reads
+        """
+        self.path = path
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        # WAL lets several worker processes read the same store concurrently while
+        # one writes, and mmap'd reads share the OS page cache between them
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA mmap_size={mmap_size}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(**request: Any) -> str:
+        """Hash the canonical JSON form of a completion request."""
+        canonical = json.dumps(request, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+            row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            self._remember(key, row[0])
+            return row[0]
+
+    def set(self, key: str, value: str):
+        """Store a response in memory and on disk."""
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (key, value))
+            self._conn.commit()
+            self._remember(key, value)
+
+    def _remember(self, key: str, value: str):
+        """Insert into the in-memory LRU, evicting the least recently used entry."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
@@ -15,6 +15,9 @@ Options:
     --clear-db           Clear database before scanning
     --export-graph       Export graph data to JSON
     --analyze            Run analysis queries after scanning
+    --workers N          Processes used to parse dependencies (default: CPU count)
+    --no-cache           Do not use the on-disk cache of GitHub trees and files
+    --verbose            Print per-directory progress and per-dependency skip messages
     --help               Show this help message
 """
 
@@ -22,15 +25,23 @@ import argparse
 import sys
 import time
 import os
-from typing import List, Dict
-from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Iterator, Optional, Tuple
 from pathlib import Path
 
-from github_scanner import GitHubScanner
-from dependency_parser import DependencyParser
-from neo4j_manager import Neo4jManager
+from github_scanner import GitHubScanner, progress_bar
+from dependency_parser import DependencyParser, init_parser_worker, parse_dependencies_job
+from neo4j_manager import Neo4jManager, FILE_NODE_BATCH_SIZE
 import config
 
+# Files handed to a worker process per task, and the fewest files worth starting a pool for
+PARSE_CHUNK_SIZE = 64
+PARALLEL_PARSE_MIN_FILES = 2 * PARSE_CHUNK_SIZE
+# Files whose contents are fetched and held in memory together
+CONTENT_WINDOW_SIZE = 1024
+# Dependencies resolved and written to Neo4j per batch
+NEO4J_BATCH_SIZE = 500
+
 
 def parse_arguments():
     """Parse command line arguments."""
@@ -83,9 +94,105 @@ def parse_arguments():
         help='Maximum number of files to process (for testing)'
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the on-disk cache of GitHub trees and file contents'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of processes used to parse dependencies (default: CPU count)'
+    )
+    
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Print per-directory progress and per-dependency skip messages'
+    )
+    
     return parser.parse_args()
 
 
+def iter_parse_jobs(scanner, files: List[Dict]) -> Iterator[Tuple[List[Tuple], int]]:
+    """Fetch file contents one window at a time and turn them into parse jobs.
+    
+    Args:
+        scanner: GitHubScanner or LocalFileScanner providing get_file_contents
+        files: File information dictionaries
+        
+    Returns:
+        Iterator of (jobs, skipped) per window, where skipped counts files without content
+    """
+    for start in range(0, len(files), CONTENT_WINDOW_SIZE):
+        window = files[start:start + CONTENT_WINDOW_SIZE]
+        contents = scanner.get_file_contents(window)
+        
+        jobs = []
+        for file_info, content in zip(window, contents):
+            if content:
+                is_package_file = file_info['name'] in config.PACKAGE_DEPENDENCY_FILES.get(file_info['language'], [])
+                jobs.append((file_info['path'], content, file_info['language'], is_package_file))
+        yield jobs, len(window) - len(jobs)
+
+
+def parse_dependencies(scanner, files: List[Dict], workers: Optional[int] = None) -> Iterator[List]:
+    """Fetch and parse files, in a process pool when worthwhile.
+    
+    Only two windows of file contents are held at once: the next window is
+    downloaded while the workers parse the current one.
+    
+    Args:
+        scanner: GitHubScanner or LocalFileScanner providing get_file_contents
+        files: File information dictionaries
+        workers: Number of worker processes (default: CPU count)
+        
+    Returns:
+        Iterator with one list of dependencies per file (empty for files without content)
+    """
+    windows = iter_parse_jobs(scanner, files)
+    
+    # Starting workers costs more than parsing a handful of files, so small scans stay in-process
+    if workers == 1 or len(files) < PARALLEL_PARSE_MIN_FILES:
+        init_parser_worker()
+        for jobs, skipped in windows:
+            yield from [[]] * skipped
+            yield from map(parse_dependencies_job, jobs)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_parser_worker) as executor:
+        pending = iter(())
+        for jobs, skipped in windows:
+            # Submitted before draining the previous window, so parsing overlaps the next download
+            results = executor.map(parse_dependencies_job, jobs, chunksize=PARSE_CHUNK_SIZE)
+            yield from pending
+            yield from [[]] * skipped
+            pending = results
+        yield from pending
+
+
+def merge_dependency_statistics(total: Dict, stats: Dict) -> Dict:
+    """Add one batch's DependencyParser statistics into a running total.
+    
+    Args:
+        total: Running statistics, updated in place
+        stats: Statistics of one batch of dependencies
+        
+    Returns:
+        The updated total
+    """
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            merged = total.setdefault(key, {})
+            for name, count in value.items():
+                merged[name] = merged.get(name, 0) + count
+        else:
+            total[key] = total.get(key, 0) + value
+    return total
+
+
 class LocalFileScanner:
     """Scanner for local repository files."""
     
@@ -94,6 +201,10 @@ class LocalFileScanner:
         self.supported_extensions = config.SUPPORTED_EXTENSIONS
         self.exclude_dirs = config.EXCLUDE_DIRS
         self.exclude_files = config.EXCLUDE_FILES
+        
+        # Precomputed once so the per-entry checks are a single C-level call
+        self._exclude_suffixes = tuple(pattern.replace('*', '') for pattern in self.exclude_files)
+        self._exclude_dirs = frozenset(self.exclude_dirs)
     
     def scan_repository(self, max_files: int = None) -> List[Dict]:
         """Scan local repository for files to analyze."""
@@ -103,56 +214,71 @@ class LocalFileScanner:
             raise FileNotFoundError(f"Repository path does not exist: {self.repo_path}")
         
         files = []
-        scanned_count = 0
+        root_prefix = os.path.join(str(self.repo_path), '')
         
         # Walk through the repository directory
-        for root, dirs, files_in_dir in os.walk(self.repo_path):
-            # Skip excluded directories
-            dirs[:] = [d for d in dirs if d not in self.exclude_dirs]
+        for entry in self._walk(str(self.repo_path)):
+            file_name = entry.name
             
-            for file_name in files_in_dir:
-                # Skip excluded files
-                if any(file_name.endswith(pattern.replace('*', '')) for pattern in self.exclude_files):
+            # Skip excluded files
+            if file_name.endswith(self._exclude_suffixes):
+                continue
+            
+            extension = os.path.splitext(file_name)[1].lower()
+            
+            # Check if file extension is supported
+            if extension in self.supported_extensions:
+                # Get file info; only accepted files are stat'ed
+                try:
+                    stat = entry.stat()
+                except OSError as e:
+                    print(f"Error reading file {entry.path}: {e}")
                     continue
                 
-                file_path = Path(root) / file_name
-                extension = file_path.suffix.lower()
+                files.append({
+                    'path': entry.path[len(root_prefix):],
+                    'name': file_name,
+                    'extension': extension,
+                    'language': self.supported_extensions[extension],
+                    'size': stat.st_size,
+                    'last_modified': stat.st_mtime
+                })
                 
-                # Check if file extension is supported
-                if extension in self.supported_extensions:
-                    # Get relative path from repository root
-                    relative_path = str(file_path.relative_to(self.repo_path))
-                    
-                    # Get file info
-                    try:
-                        stat = file_path.stat()
-                        file_info = {
-                            'path': relative_path,
-                            'name': file_name,
-                            'extension': extension,
-                            'language': self.supported_extensions[extension],
-                            'size': stat.st_size,
-                            'last_modified': stat.st_mtime
-                        }
-                        files.append(file_info)
-                        scanned_count += 1
-                        
-                        # Check max files limit
-                        if max_files and scanned_count >= max_files:
-                            print(f"Reached maximum file limit: {max_files}")
-                            break
-                            
-                    except (OSError, IOError) as e:
-                        print(f"Error reading file {file_path}: {e}")
-                        continue
-            
-            # Break if max files reached
-            if max_files and scanned_count >= max_files:
-                break
+                # Check max files limit
+                if max_files and len(files) >= max_files:
+                    print(f"Reached maximum file limit: {max_files}")
+                    break
         
         print(f"Found {len(files)} files to analyze")
         return files
     
+    def _walk(self, path: str) -> Iterator[os.DirEntry]:
+        """Yield the files below a directory in os.walk order, skipping excluded directories.
+        
+        os.scandir serves the file/directory check from the directory listing
+        itself, so entries are not stat'ed just to be classified.
+        """
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        # Like os.walk, symlinked directories are not descended into
+                        if entry.name not in self._exclude_dirs and not entry.is_symlink():
+                            subdirs.append(entry.path)
+                    else:
+                        yield entry
+        except OSError as e:
+            print(f"Error reading directory {path}: {e}")
+            return
+        
+        for subdir in subdirs:
+            yield from self._walk(subdir)
+    
+    def get_file_contents(self, file_infos: List[Dict]) -> List[str]:
+        """Get the contents of many files from local repository."""
+        return [self.get_file_content(file_info) for file_info in file_infos]
+    
     def get_file_content(self, file_info: Dict) -> str:
         """Get content of a file from local repository."""
         try:
@@ -184,9 +310,9 @@ def main():
     if args.local_path:
         scanner = LocalFileScanner(args.local_path)
     else:
-        scanner = GitHubScanner()
+        scanner = GitHubScanner(cache_dir=None) if args.no_cache else GitHubScanner()
     parser = DependencyParser()
-    neo4j_manager = Neo4jManager()
+    neo4j_manager = Neo4jManager(verbose=args.verbose)
     
     try:
         # Connect to Neo4j
@@ -220,16 +346,16 @@ def main():
                 
                 files = []
                 for path in test_paths:
-                    print(f"  Scanning: {path}")
+                    if args.verbose:
+                        print(f"  Scanning: {path}")
                     try:
                         path_files = scanner.get_repo_contents(args.repo_owner, args.repo_name, path)
-                        # Add language information to file_info objects
+                        # Add language information to file_info objects (extension is set by the listing)
                         for file_info in path_files:
-                            file_ext = Path(file_info['path']).suffix.lower()
-                            file_info['language'] = config.SUPPORTED_EXTENSIONS.get(file_ext, 'unknown')
-                            file_info['extension'] = file_ext
+                            file_info['language'] = config.SUPPORTED_EXTENSIONS.get(file_info['extension'], 'unknown')
                         files.extend(path_files)
-                        print(f"  Found {len(path_files)} files in {path}")
+                        if args.verbose:
+                            print(f"  Found {len(path_files)} files in {path}")
                         if len(files) >= args.max_files:
                             break
                     except Exception as e:
@@ -246,42 +372,43 @@ def main():
             print("No files found to analyze.")
             return
         
-        # Create file nodes
+        # Create file nodes; the writes of steps 5 and 6 share one session
         print(f"\n5. Creating file nodes in Neo4j...")
+        neo4j_manager.begin_ingest()
         successful_files = 0
-        for file_info in tqdm(files, desc="Creating file nodes"):
-            if neo4j_manager.create_file_node(file_info):
-                successful_files += 1
+        with progress_bar(total=len(files), desc="Creating file nodes") as progress:
+            for start in range(0, len(files), FILE_NODE_BATCH_SIZE):
+                batch = files[start:start + FILE_NODE_BATCH_SIZE]
+                successful_files += neo4j_manager.create_file_nodes(batch)
+                progress.update(len(batch))
         
         print(f"Created {successful_files} file nodes out of {len(files)} files")
+        neo4j_manager.prime_path_cache()
         
-        # Parse dependencies
-        print(f"\n6. Parsing dependencies...")
-        all_dependencies = []
+        # Parse dependencies and create their relationships in one streaming pass; all
+        # file nodes exist by now, so each batch can be resolved and written as it fills
+        print(f"\n6. Parsing dependencies and creating relationships in Neo4j...")
+        dep_stats = parser.get_dependency_statistics([])
+        successful_deps = 0
+        pending = []
         
-        for file_info in tqdm(files, desc="Parsing dependencies"):
-            content = scanner.get_file_content(file_info)
-            if content:
-                # Parse source code dependencies
-                file_dependencies = parser.parse_file_dependencies(
-                    file_info['path'],
-                    content,
-                    file_info['language']
-                )
-                all_dependencies.extend(file_dependencies)
-                
-                # Parse package dependencies from configuration files
-                if file_info['name'] in config.PACKAGE_DEPENDENCY_FILES.get(file_info['language'], []):
-                    package_dependencies = parser.parse_package_dependencies(
-                        file_info['path'],
-                        content
-                    )
-                    all_dependencies.extend(package_dependencies)
-        
-        print(f"Found {len(all_dependencies)} dependencies")
-        
-        # Get dependency statistics
-        dep_stats = parser.get_dependency_statistics(all_dependencies)
+        def flush_dependencies():
+            nonlocal successful_deps
+            merge_dependency_statistics(dep_stats, parser.get_dependency_statistics(pending))
+            successful_deps += neo4j_manager.create_dependency_relationships(pending)
+            pending.clear()
+        
+        # Contents are fetched window by window while the previous window is parsed
+        for file_dependencies in progress_bar(parse_dependencies(scanner, files, args.workers),
+                                              total=len(files), desc="Parsing dependencies"):
+            pending.extend(file_dependencies)
+            if len(pending) >= NEO4J_BATCH_SIZE:
+                flush_dependencies()
+        if pending:
+            flush_dependencies()
+        neo4j_manager.end_ingest()
+        
+        print(f"Found {dep_stats['total_dependencies']} dependencies")
         print(f"  Direct imports: {dep_stats['direct_imports']}")
         print(f"  Relative imports: {dep_stats['relative_imports']}")
         print(f"  Package dependencies: {dep_stats['package_dependencies']}")
@@ -292,18 +419,10 @@ def main():
             for manager, count in dep_stats['by_package_manager'].items():
                 print(f"    {manager}: {count}")
         
-        # Create dependency relationships
-        print(f"\n7. Creating dependency relationships in Neo4j...")
-        successful_deps = 0
-        
-        for dependency in tqdm(all_dependencies, desc="Creating dependencies"):
-            if neo4j_manager.create_dependency_relationship(dependency):
-                successful_deps += 1
-        
-        print(f"Created {successful_deps} dependency relationships out of {len(all_dependencies)}")
+        print(f"Created {successful_deps} dependency relationships out of {dep_stats['total_dependencies']}")
         
         # Get statistics
-        print(f"\n8. Generating statistics...")
+        print(f"\n7. Generating statistics...")
         stats = neo4j_manager.get_dependency_statistics()
         
         print("\n" + "=" * 40)
@@ -331,12 +450,12 @@ def main():
         
         # Export graph data if requested
         if args.export_graph:
-            print(f"\n9. Exporting graph data...")
+            print(f"\n8. Exporting graph data...")
             neo4j_manager.export_graph_data("dependency_graph.json")
         
         # Run analysis if requested
         if args.analyze:
-            print(f"\n10. Running analysis queries...")
+            print(f"\n9. Running analysis queries...")
             neo4j_manager.run_analysis_queries()
         
         print("\n" + "=" * 40)
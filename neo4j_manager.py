@@ -1,86 +1,600 @@
-from typing import Dict, List, Optional
-from neo4j import GraphDatabase
+import asyncio
+import atexit
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+from neo4j import AsyncGraphDatabase, GraphDatabase, RoutingControl
 import config
 
+# Graph export is serialized with orjson when it is installed
+try:
+    import orjson
+    
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+# Connection pool settings; config.py or the environment may override them
+NEO4J_POOL_SIZE = int(getattr(config, 'NEO4J_POOL_SIZE', os.getenv('NEO4J_POOL_SIZE', 50)))
+NEO4J_ACQ_TIMEOUT = float(getattr(config, 'NEO4J_ACQ_TIMEOUT', os.getenv('NEO4J_ACQ_TIMEOUT', 60)))
+NEO4J_MAX_CONNECTION_LIFETIME = 3600
+
+# $parameter references in a single-row query, rewritten to row.<parameter> for UNWIND batches
+UNWIND_PARAM_RE = re.compile(r'\$(\w+)')
+# File nodes written per UNWIND transaction
+FILE_NODE_BATCH_SIZE = 5000
+# Relationship groups above LARGE_BATCH_ROWS rows are not written in one transaction:
+# APOC's periodic.iterate splits them server-side, otherwise they are split client-side,
+# SERVER_BATCH_SIZE rows per transaction either way
+LARGE_BATCH_ROWS = 20000
+SERVER_BATCH_SIZE = 5000
+PERIODIC_ITERATE_QUERY = (
+    "CALL apoc.periodic.iterate('UNWIND $rows AS row RETURN row', $action, "
+    "{batchSize: $batch_size, parallel: false, params: {rows: $rows}}) "
+    "YIELD failedOperations, errorMessages RETURN failedOperations, errorMessages"
+)
+# Batched relative imports whose target File is looked up inside the write query;
+# found targets get a relative dependency, missing ones an external module
+RELATIVE_OR_EXTERNAL = 'relative_or_external'
+# Positions in $paths of the relative-import targets that have no File node
+MISSING_TARGETS_QUERY = (
+    "UNWIND range(0, size($paths) - 1) AS i "
+    "WITH i WHERE NOT EXISTS { MATCH (:File {path: $paths[i]}) } "
+    "RETURN collect(i) AS missing"
+)
+
+# Every index the project's queries rely on, created by setup_database() and by
+# the query CLI and upgrade analyzer through create_indexes():
+# - resolver lookups: equality on the file name (the last path segment) and a
+#   TEXT index, which serves ENDS WITH / CONTAINS on the path
+# - report and analyzer lookups: the properties they filter, group and sort on
+INDEX_QUERIES = [
+    "CREATE INDEX file_name IF NOT EXISTS FOR (f:File) ON (f.name)",
+    "CREATE TEXT INDEX file_path_text IF NOT EXISTS FOR (f:File) ON (f.path)",
+    "CREATE INDEX file_path IF NOT EXISTS FOR (f:File) ON (f.path)",
+    "CREATE INDEX file_language IF NOT EXISTS FOR (f:File) ON (f.language)",
+    "CREATE INDEX file_extension IF NOT EXISTS FOR (f:File) ON (f.extension)",
+    "CREATE INDEX module_name IF NOT EXISTS FOR (m:Module) ON (m.name)",
+    "CREATE INDEX module_type IF NOT EXISTS FOR (m:Module) ON (m.type)",
+    "CREATE INDEX package_name IF NOT EXISTS FOR (p:Package) ON (p.name)",
+    "CREATE INDEX package_dependency_manager IF NOT EXISTS "
+    "FOR ()-[r:PACKAGE_DEPENDENCIES]-() ON (r.package_manager)",
+]
+
+# Every statistic of get_dependency_statistics in one query, as (stat, key, value) rows
+STATISTICS_QUERY = """
+MATCH (f:File) RETURN 'total_files' AS stat, null AS key, count(f) AS value
+UNION ALL
+MATCH (f:File) RETURN 'files_by_language' AS stat, f.language AS key, count(f) AS value
+UNION ALL
+MATCH ()-[r:DIRECT_IMPORTS]->() RETURN 'dependencies_by_type' AS stat, 'direct_imports' AS key, count(r) AS value
+UNION ALL
+MATCH ()-[r:RELATIVE_IMPORTS]->() RETURN 'dependencies_by_type' AS stat, 'relative_imports' AS key, count(r) AS value
+UNION ALL
+MATCH ()-[r:EXTERNAL_DEPENDENCIES]->() RETURN 'dependencies_by_type' AS stat, 'external_dependencies' AS key, count(r) AS value
+UNION ALL
+MATCH ()-[r:PACKAGE_DEPENDENCIES]->() RETURN 'dependencies_by_type' AS stat, 'package_dependencies' AS key, count(r) AS value
+UNION ALL
+MATCH (f:File)-[r:DIRECT_IMPORTS|RELATIVE_IMPORTS|EXTERNAL_DEPENDENCIES|PACKAGE_DEPENDENCIES]->()
+WITH f, count(r) AS value ORDER BY value DESC LIMIT 10
+RETURN 'most_dependent_files' AS stat, f.path AS key, value
+UNION ALL
+MATCH ()-[r:DIRECT_IMPORTS|RELATIVE_IMPORTS]->(f:File)
+WITH f, count(r) AS value ORDER BY value DESC LIMIT 10
+RETURN 'most_depended_on_files' AS stat, f.path AS key, value
+UNION ALL
+MATCH ()-[r:PACKAGE_DEPENDENCIES]->(p:Package)
+RETURN 'package_dependencies_by_manager' AS stat, r.package_manager AS key, count(r) AS value
+"""
+
+# Lookup queries, kept as constants so every call sends identical text and hits
+# the server's plan cache
+FILE_PATH_QUERY = "MATCH (f:File) WHERE f.path = $path RETURN f.path AS path"
+# Existence checks only need a row back, not the path property
+FILE_EXISTS_QUERY = "MATCH (f:File {path: $path}) RETURN 1 LIMIT 1"
+FILE_BY_NAME_QUERY = "MATCH (f:File) WHERE f.name = $name RETURN f.path AS path LIMIT 1"
+PACKAGE_INIT_QUERY = (
+    "MATCH (f:File {name: '__init__.py'}) WHERE f.path ENDS WITH $init_file RETURN f.path AS path LIMIT 1"
+)
+# CONTAINS is served by the TEXT index on File.path
+PACKAGE_FILE_QUERY = (
+    "MATCH (f:File) WHERE f.path CONTAINS $package_name AND f.path ENDS WITH '.py' "
+    "RETURN f.path AS path ORDER BY size(f.path) ASC LIMIT 1"
+)
+MODULE_FILE_QUERY = (
+    "MATCH (f:File) WHERE f.name = $module_basename AND f.path ENDS WITH $module_file "
+    "RETURN f.path AS path LIMIT 1"
+)
+LIST_FILES_QUERY = "MATCH (f:File) RETURN f.path AS path ORDER BY f.path"
+LIST_FILES_MATCHING_QUERY = "MATCH (f:File) WHERE f.path CONTAINS $pattern RETURN f.path AS path ORDER BY f.path"
+
+# Import names resolved per query by _find_target_file_paths
+RESOLVE_BATCH_SIZE = 1000
+# All of _query_target_file_path's lookups for a batch of imports in one query;
+# rank keeps its order of preference, and lookups whose parameter is null are skipped
+RESOLVE_TARGETS_QUERY = """
+UNWIND $imports AS imp
+CALL {
+    WITH imp
+    WITH imp WHERE imp.spring_path IS NOT NULL
+    MATCH (f:File) WHERE f.path = imp.spring_path
+    RETURN f.path AS path, 0 AS rank LIMIT 1
+    UNION
+    WITH imp
+    WITH imp WHERE imp.class_file IS NOT NULL
+    MATCH (f:File) WHERE f.name = imp.class_file
+    RETURN f.path AS path, 1 AS rank LIMIT 1
+    UNION
+    WITH imp
+    WITH imp WHERE imp.init_file IS NOT NULL
+    MATCH (f:File {name: '__init__.py'}) WHERE f.path ENDS WITH imp.init_file
+    RETURN f.path AS path, 2 AS rank LIMIT 1
+    UNION
+    WITH imp
+    WITH imp WHERE imp.package_name IS NOT NULL
+    MATCH (f:File) WHERE f.path CONTAINS imp.package_name AND f.path ENDS WITH '.py'
+    RETURN f.path AS path, 3 AS rank ORDER BY size(f.path) ASC LIMIT 1
+    UNION
+    WITH imp
+    WITH imp WHERE imp.module_file IS NOT NULL
+    MATCH (f:File) WHERE f.name = imp.module_basename AND f.path ENDS WITH imp.module_file
+    RETURN f.path AS path, 4 AS rank LIMIT 1
+    UNION
+    WITH imp
+    WITH imp WHERE imp.module_name IS NOT NULL
+    MATCH (f:File) WHERE f.name = imp.module_name
+    RETURN f.path AS path, 5 AS rank LIMIT 1
+}
+WITH imp.key AS key, path, rank
+ORDER BY rank
+RETURN key, collect(path)[0] AS path
+"""
+
+
+def create_indexes(session):
+    """Create the INDEX_QUERIES indexes if they do not exist yet.
+    
+    Args:
+        session: Open Neo4j session
+    """
+    for query in INDEX_QUERIES:
+        try:
+            session.run(query).consume()
+        except Exception as e:
+            # e.g. the property is already backed by a uniqueness constraint
+            print(f"Warning: Could not create index: {e}")
+
+
+@lru_cache(maxsize=None)
+def get_driver(uri: str, user: str, password: str):
+    """Return the process-wide driver for a database, creating it on first use.
+    
+    The driver and its connection pool are reused by every Neo4jManager in the
+    process and closed when the interpreter exits.
+    
+    Args:
+        uri: Neo4j database URI
+        user: Database username
+        password: Database password
+    """
+    driver = GraphDatabase.driver(
+        uri, auth=(user, password),
+        max_connection_pool_size=NEO4J_POOL_SIZE,
+        connection_acquisition_timeout=NEO4J_ACQ_TIMEOUT,
+        max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME,
+        keep_alive=True
+    )
+    atexit.register(driver.close)
+    return driver
+
 
 class Neo4jManager:
     """Manages Neo4j database operations for dependency graphs."""
     
-    def __init__(self, uri: str = None, user: str = None, password: str = None):
+    def __init__(self, uri: str = None, user: str = None, password: str = None, database: str = None,
+                 verbose: bool = False):
         """Initialize Neo4j manager.
         
         Args:
             uri: Neo4j database URI
             user: Database username
             password: Database password
+            database: Database name (default: config.NEO4J_DATABASE, else the server default)
+            verbose: Print a line for every skipped or unresolved dependency
         """
         self.uri = uri or config.NEO4J_URI
         self.user = user or config.NEO4J_USER
         self.password = password or config.NEO4J_PASSWORD
+        self.database = database or getattr(config, 'NEO4J_DATABASE', None)
+        self.verbose = verbose
         self.driver = None
+        # Session shared by every write between begin_ingest() and end_ingest(), and
+        # the thread that opened it; sessions are not thread-safe, so other threads
+        # (e.g. the resolvers run by write_concurrently) open their own
+        self._sess = None
+        self._sess_thread = None
+        # Async driver for pipelined single-record writes, created on first use
+        self.async_driver = None
+        # Whether the server has apoc.periodic.iterate, detected on connect()
+        self._has_apoc = False
+        # File nodes queued by create_file_node until a full batch is written
+        self._file_node_buffer: List[Dict] = []
+        # (import name, source language) -> resolved target file path (None for misses)
+        self._resolve_cache: Dict[Tuple[str, Optional[str]], Optional[str]] = {}
+        # Paths of all File nodes once prime_path_cache() has run
+        self._known_paths: Optional[Set[str]] = None
     
     def connect(self):
         """Connect to Neo4j database."""
         try:
-            self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
+            self.driver = get_driver(self.uri, self.user, self.password)
             # Test connection
-            with self.driver.session() as session:
-                session.run("RETURN 1")
+            self._execute_query("RETURN 1")
+            self._has_apoc = self._detect_apoc()
             print("Successfully connected to Neo4j database")
         except Exception as e:
             print(f"Failed to connect to Neo4j: {e}")
             raise
     
+    def _detect_apoc(self) -> bool:
+        """Check whether the server provides apoc.periodic.iterate."""
+        try:
+            records = self._execute_query(
+                "SHOW PROCEDURES YIELD name WHERE name = 'apoc.periodic.iterate' RETURN count(*) AS found",
+                write=False
+            )
+            return bool(records and records[0]['found'])
+        except Exception:
+            return False
+    
     def disconnect(self):
         """Disconnect from Neo4j database."""
         if self.driver:
-            self.driver.close()
+            self.flush_file_nodes()
+            self.end_ingest()
+            # The shared driver stays open for later connections and is closed at exit
+            self.driver = None
             print("Disconnected from Neo4j database")
     
+    def begin_ingest(self):
+        """Open one session that all writes reuse until end_ingest() is called."""
+        if self._sess is None:
+            self._sess = self.driver.session(database=self.database)
+            self._sess_thread = threading.get_ident()
+    
+    def end_ingest(self):
+        """Close the session opened by begin_ingest()."""
+        if self._sess is not None:
+            self._sess.close()
+            self._sess = self._sess_thread = None
+    
+    def _ingest_session(self):
+        """The ingest session if one is open and owned by the calling thread, else None."""
+        if self._sess is not None and self._sess_thread == threading.get_ident():
+            return self._sess
+        return None
+    
+    @contextmanager
+    def _session(self):
+        """Yield the calling thread's ingest session if one is open, else a new session on the configured database."""
+        ingest_session = self._ingest_session()
+        if ingest_session is not None:
+            yield ingest_session
+        else:
+            with self.driver.session(database=self.database) as session:
+                yield session
+    
+    def _execute_query(self, query: str, parameters: Optional[Dict] = None, write: bool = True):
+        """Run one query in its own managed transaction on a pooled connection.
+        
+        Args:
+            query: Cypher query
+            parameters: Query parameters
+            write: Route to the writer (True) or a reader (False)
+            
+        Returns:
+            List of result records
+        """
+        records, _, _ = self.driver.execute_query(
+            query, parameters_=parameters, database_=self.database,
+            routing_=RoutingControl.WRITE if write else RoutingControl.READ
+        )
+        return records
+    
     def setup_database(self):
         """Set up database constraints and indexes."""
-        with self.driver.session() as session:
-            for query in config.CYPHER_QUERIES['create_constraints']:
-                try:
-                    session.run(query)
-                    print(f"Executed: {query}")
-                except Exception as e:
-                    print(f"Warning: Could not create constraint: {e}")
+        for query in config.CYPHER_QUERIES['create_constraints']:
+            try:
+                self._execute_query(query)
+                print(f"Executed: {query}")
+            except Exception as e:
+                print(f"Warning: Could not create constraint: {e}")
+        with self._session() as session:
+            create_indexes(session)
     
     def clear_database(self):
         """Clear all data from the database."""
-        with self.driver.session() as session:
-            for query in config.CYPHER_QUERIES['clear_database']:
-                session.run(query)
+        for query in config.CYPHER_QUERIES['clear_database']:
+            self._execute_query(query)
+        self._resolve_cache.clear()
+        self._known_paths = None
         print("Cleared all data from database")
     
     def create_file_node(self, file_info: Dict) -> bool:
-        """Create a file node in the database.
+        """Queue a file node; nodes are written in batches of FILE_NODE_BATCH_SIZE.
+        
+        Call flush_file_nodes() (or disconnect()) before relying on the node existing.
         
         Args:
             file_info: File information dictionary
             
+        Returns:
+            True once the node is queued, False if writing a full batch failed
+        """
+        self._file_node_buffer.append(file_info)
+        if len(self._file_node_buffer) < FILE_NODE_BATCH_SIZE:
+            return True
+        return self.flush_file_nodes() > 0
+    
+    def flush_file_nodes(self) -> int:
+        """Write the file nodes queued by create_file_node.
+        
+        Returns:
+            Number of file nodes written
+        """
+        if not self._file_node_buffer:
+            return 0
+        file_infos, self._file_node_buffer = self._file_node_buffer, []
+        return self.create_file_nodes(file_infos)
+    
+    def create_file_nodes(self, file_infos: List[Dict], batch_size: int = FILE_NODE_BATCH_SIZE) -> int:
+        """Create file nodes with one UNWIND query per batch, all over a single session.
+        
+        Args:
+            file_infos: File information dictionaries
+            batch_size: Rows written per transaction
+            
+        Returns:
+            Number of file nodes written
+        """
+        # New files can turn cached misses into hits
+        self._resolve_cache.clear()
+        written = 0
+        with self._session() as session:
+            for start in range(0, len(file_infos), batch_size):
+                rows = [self._file_node_row(file_info) for file_info in file_infos[start:start + batch_size]]
+                try:
+                    session.execute_write(self._run_unwind, config.CYPHER_QUERIES['create_file_node'], rows)
+                    written += len(rows)
+                    if self._known_paths is not None:
+                        self._known_paths.update(row['path'] for row in rows)
+                except Exception as e:
+                    print(f"Error creating {len(rows)} file nodes: {e}")
+        return written
+    
+    @staticmethod
+    def _file_node_row(file_info: Dict) -> Dict:
+        """Parameters of the create_file_node query for one file."""
+        return {
+            'path': file_info['path'],
+            'name': file_info['name'],
+            'extension': file_info.get('extension', ''),
+            'language': file_info.get('language', 'unknown'),
+            'size': file_info.get('size', 0),
+            'last_modified': file_info.get('last_modified', '')
+        }
+    
+    def create_file_nodes_bulk(self, file_infos: List[Dict]) -> int:
+        """Create many file nodes with one UNWIND query in a single transaction.
+        
+        Args:
+            file_infos: File information dictionaries
+            
+        Returns:
+            Number of file nodes written
+        """
+        return self.create_file_nodes(file_infos, batch_size=max(1, len(file_infos)))
+    
+    def create_dependency_relationship(self, dependency: Dict) -> bool:
+        """Create a dependency relationship between files.
+        
+        Args:
+            dependency: Dependency information dictionary
+            
         Returns:
             True if successful, False otherwise
         """
         try:
-            with self.driver.session() as session:
-                result = session.run(
-                    config.CYPHER_QUERIES['create_file_node'],
-                    path=file_info['path'],
-                    name=file_info['name'],
-                    extension=file_info.get('extension', ''),
-                    language=file_info.get('language', 'unknown'),
-                    size=file_info.get('size', 0),
-                    last_modified=file_info.get('last_modified', '')
-                )
+            with self._session() as session:
+                planned = self._plan_dependency(session, dependency)
+                if planned is None:
+                    return False
+                
+                query_name, params = planned
+                session.run(config.CYPHER_QUERIES[query_name], **params).consume()
                 return True
+        except Exception as e:
+            print(f"Error creating dependency for {dependency['source_file']}: {e}")
+            return False
+    
+    def create_dependency_relationships(self, dependencies: List[Dict]) -> int:
+        """Create many dependency relationships in one transaction, one UNWIND query per kind.
+        
+        Direct-import targets are resolved once per distinct import name, and
+        relative-import targets are checked inside the write transaction itself.
+        
+        Args:
+            dependencies: Dependency information dictionaries
+            
+        Returns:
+            Number of relationships written
+        """
+        direct_imports = {
+            (dependency['import_name'], dependency.get('source_language'))
+            for dependency in dependencies
+            if dependency.get('dependency_type') == 'direct_import'
+        }
+        target_paths = self._find_target_file_paths(direct_imports)
+        
+        rows_by_query = defaultdict(list)
+        for dependency in dependencies:
+            try:
+                planned = self._plan_dependency(None, dependency, target_paths)
+            except Exception as e:
+                print(f"Error creating dependency for {dependency['source_file']}: {e}")
+                continue
+            if planned is not None:
+                query_name, params = planned
+                rows_by_query[query_name].append(params)
+        
+        # Huge groups would make one transaction exhaust the server's heap
+        small = {name: rows for name, rows in rows_by_query.items() if len(rows) <= LARGE_BATCH_ROWS}
+        large = {name: rows for name, rows in rows_by_query.items() if len(rows) > LARGE_BATCH_ROWS}
+        
+        written = 0
+        missing = 0
+        try:
+            with self._session() as session:
+                missing += session.execute_write(self._write_dependency_rows, small)
+                written += sum(len(rows) for rows in small.values())
+                
+                for query_name, rows in large.items():
+                    if self._has_apoc and query_name != RELATIVE_OR_EXTERNAL:
+                        written += self._run_periodic_iterate(session, config.CYPHER_QUERIES[query_name], rows)
+                        continue
+                    for start in range(0, len(rows), SERVER_BATCH_SIZE):
+                        chunk = rows[start:start + SERVER_BATCH_SIZE]
+                        missing += session.execute_write(self._write_dependency_rows, {query_name: chunk})
+                        written += len(chunk)
+        except Exception as e:
+            print(f"Error creating {len(dependencies)} dependencies: {e}")
+        
+        if missing:
+            print(f"⚠️  {missing} relative import target(s) not found in database; recorded as external modules")
+        return written
+    
+    def create_dependency_relationships_bulk(self, dependencies: List[Dict]) -> int:
+        """Alias of create_dependency_relationships."""
+        return self.create_dependency_relationships(dependencies)
+    
+    @classmethod
+    def _write_dependency_rows(cls, tx, rows_by_query: Dict[str, List[Dict]]) -> int:
+        """Write grouped dependency rows in one transaction.
+        
+        Returns:
+            Number of relative imports whose target file was not found
+        """
+        missing = 0
+        for query_name, rows in rows_by_query.items():
+            if query_name == RELATIVE_OR_EXTERNAL:
+                missing += cls._run_relative_unwind(tx, rows)
+            else:
+                cls._run_unwind(tx, config.CYPHER_QUERIES[query_name], rows)
+        return missing
+    
+    @staticmethod
+    def _run_unwind(tx, query: str, rows: List[Dict]):
+        """Run a single-row write query once per row with UNWIND.
+        
+        The query's $parameters are rewritten to fields of the unwound row and it
+        runs as a subquery, so the queries in config.CYPHER_QUERIES are reused as-is.
+        """
+        body = UNWIND_PARAM_RE.sub(r'row.\1', query)
+        tx.run(f"UNWIND $rows AS row CALL {{ WITH row {body} }} RETURN count(*) AS count", rows=rows).consume()
+    
+    @staticmethod
+    def _run_periodic_iterate(session, query: str, rows: List[Dict]) -> int:
+        """Write a large batch with apoc.periodic.iterate, SERVER_BATCH_SIZE rows per transaction.
+        
+        Batches run one after another (parallel: false) so they never contend
+        for locks on the same nodes.
+        
+        Returns:
+            Number of rows written
+        """
+        action = UNWIND_PARAM_RE.sub(r'row.\1', query)
+        record = session.run(PERIODIC_ITERATE_QUERY, rows=rows, action=action,
+                             batch_size=SERVER_BATCH_SIZE).single()
+        if record['failedOperations']:
+            print(f"Error creating {record['failedOperations']} dependencies: {record['errorMessages']}")
+        return len(rows) - record['failedOperations']
+    
+    @classmethod
+    def _run_relative_unwind(cls, tx, rows: List[Dict]) -> int:
+        """Write relative imports, checking in the same transaction that each target File exists.
+        
+        Rows whose target exists get the relative dependency query, the rest the
+        external dependency query (as a 'relative_module'). Each group is written
+        by its own UNWIND statement, so the config queries may RETURN rows.
+        
+        Returns:
+            Number of rows whose target file was not found
+        """
+        paths = [row['target_path'] for row in rows]
+        missing = set(tx.run(MISSING_TARGETS_QUERY, paths=paths).single()['missing'])
+        found_rows = [row for i, row in enumerate(rows) if i not in missing]
+        missing_rows = [row for i, row in enumerate(rows) if i in missing]
+        if found_rows:
+            cls._run_unwind(tx, config.CYPHER_QUERIES['create_relative_dependency'], found_rows)
+        if missing_rows:
+            cls._run_unwind(tx, config.CYPHER_QUERIES['create_external_dependency'], missing_rows)
+        return len(missing_rows)
+    
+    def _get_async_driver(self):
+        """Async driver with the same pool settings as the sync one, created on first use.
+        
+        It is bound to the running event loop; close it with aclose() before the loop ends.
+        """
+        if self.async_driver is None:
+            self.async_driver = AsyncGraphDatabase.driver(
+                self.uri, auth=(self.user, self.password),
+                max_connection_pool_size=NEO4J_POOL_SIZE,
+                connection_acquisition_timeout=NEO4J_ACQ_TIMEOUT,
+                max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME,
+                keep_alive=True
+            )
+        return self.async_driver
+    
+    async def aclose(self):
+        """Close the async driver, if one was created."""
+        if self.async_driver is not None:
+            await self.async_driver.close()
+            self.async_driver = None
+    
+    async def _aexecute_write(self, query: str, parameters: Dict):
+        """Run one write query on the async driver."""
+        await self._get_async_driver().execute_query(
+            query, parameters_=parameters, database_=self.database, routing_=RoutingControl.WRITE
+        )
+    
+    async def acreate_file_node(self, file_info: Dict) -> bool:
+        """Create a file node right away on the async driver.
+        
+        Args:
+            file_info: File information dictionary
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            await self._aexecute_write(config.CYPHER_QUERIES['create_file_node'], self._file_node_row(file_info))
+            return True
         except Exception as e:
             print(f"Error creating file node for {file_info['path']}: {e}")
             return False
     
-    def create_dependency_relationship(self, dependency: Dict) -> bool:
-        """Create a dependency relationship between files.
+    async def acreate_dependency_relationship(self, dependency: Dict) -> bool:
+        """Create a dependency relationship right away on the async driver.
+        
+        Target resolution still uses the (cached) sync lookups, off the event loop.
         
         Args:
             dependency: Dependency information dictionary
@@ -89,116 +603,184 @@ class Neo4jManager:
             True if successful, False otherwise
         """
         try:
-            with self.driver.session() as session:
-                dependency_type = dependency.get('dependency_type', 'unknown')
-                
-                if dependency_type == 'direct_import':
-                    # Handle direct imports
-                    target_path = self._find_target_file_path(dependency['import_name'])
-                    if target_path:
-                        # Prevent self-referential relationships
-                        if target_path == dependency['source_file']:
-                            print(f"Skipping self-referential dependency: {dependency['source_file']} -> {target_path}")
-                            return False
-                        
-                        result = session.run(
-                            config.CYPHER_QUERIES['create_direct_dependency'],
-                            source_path=dependency['source_file'],
-                            target_path=target_path,
-                            import_statement=dependency['import_statement'],
-                            line_number=dependency['line_number']
-                        )
-                    else:
-                        # Create external module node for unresolved direct imports
-                        result = session.run(
-                            config.CYPHER_QUERIES['create_external_dependency'],
-                            source_path=dependency['source_file'],
-                            module_name=dependency['import_name'],
-                            module_type='external_module',
-                            import_statement=dependency['import_statement'],
-                            line_number=dependency['line_number']
-                        )
-                
-                elif dependency_type == 'relative_import':
-                    # Handle relative imports
-                    target_path = dependency.get('resolved_path')
-                    if target_path:
-                        # Verify that the resolved target file actually exists in the database
-                        result = session.run("""
-                            MATCH (f:File)
-                            WHERE f.path = $target_path
-                            RETURN f.path as path
-                        """, target_path=target_path)
-                        
-                        if result.single():
-                            # Target file exists - create relative dependency
-                            # Prevent self-referential relationships
-                            if target_path == dependency['source_file']:
-                                print(f"Skipping self-referential dependency: {dependency['source_file']} -> {target_path}")
-                                return False
-                            
-                            result = session.run(
-                                config.CYPHER_QUERIES['create_relative_dependency'],
-                                source_path=dependency['source_file'],
-                                target_path=target_path,
-                                import_statement=dependency['import_statement'],
-                                line_number=dependency['line_number']
-                            )
-                        else:
-                            # Target file doesn't exist in database - create external dependency
-                            print(f"⚠️  Relative import target not found in database: {target_path}")
-                            print(f"   Source: {dependency['source_file']}")
-                            print(f"   Import: {dependency['import_statement']}")
-                            print(f"   This is expected if the file wasn't scanned or doesn't exist")
-                            result = session.run(
-                                config.CYPHER_QUERIES['create_external_dependency'],
-                                source_path=dependency['source_file'],
-                                module_name=dependency['import_name'],
-                                module_type='relative_module',
-                                import_statement=dependency['import_statement'],
-                                line_number=dependency['line_number']
-                            )
-                    else:
-                        # No resolved path - create external module node for unresolved relative imports
-                        result = session.run(
-                            config.CYPHER_QUERIES['create_external_dependency'],
-                            source_path=dependency['source_file'],
-                            module_name=dependency['import_name'],
-                            module_type='relative_module',
-                            import_statement=dependency['import_statement'],
-                            line_number=dependency['line_number']
-                        )
-                
-                elif dependency_type == 'package_dependency':
-                    # Handle package dependencies
-                    result = session.run(
-                        config.CYPHER_QUERIES['create_package_dependency'],
-                        source_path=dependency['source_file'],
-                        package_name=dependency['package_name'],
-                        package_version=dependency.get('package_version'),
-                        package_manager=dependency.get('package_manager', 'unknown'),
-                        source_file=dependency['source_file']
-                    )
+            loop = asyncio.get_running_loop()
+            planned = await loop.run_in_executor(None, self._plan_dependency, None, dependency)
+            if planned is None:
+                return False
+            
+            query_name, params = planned
+            if query_name == RELATIVE_OR_EXTERNAL:
+                records, _, _ = await self._get_async_driver().execute_query(
+                    FILE_EXISTS_QUERY, parameters_={'path': params['target_path']},
+                    database_=self.database, routing_=RoutingControl.READ
+                )
+                query_name = 'create_relative_dependency' if records else 'create_external_dependency'
+            await self._aexecute_write(config.CYPHER_QUERIES[query_name], params)
+            return True
+        except Exception as e:
+            print(f"Error creating dependency for {dependency['source_file']}: {e}")
+            return False
+    
+    def write_concurrently(self, file_infos: List[Dict] = (), dependencies: List[Dict] = ()) -> Tuple[int, int]:
+        """Write records one by one, with up to NEO4J_POOL_SIZE writes in flight.
+        
+        For callers that cannot batch; round-trips overlap instead of running
+        back to back. File nodes are all written before any dependency.
+        
+        Args:
+            file_infos: File information dictionaries
+            dependencies: Dependency information dictionaries
+            
+        Returns:
+            (file nodes written, relationships written)
+        """
+        async def run() -> Tuple[int, int]:
+            semaphore = asyncio.Semaphore(NEO4J_POOL_SIZE)
+            
+            async def bounded(coroutine) -> bool:
+                async with semaphore:
+                    return await coroutine
+            
+            try:
+                files = await asyncio.gather(*(bounded(self.acreate_file_node(f)) for f in file_infos))
+                deps = await asyncio.gather(*(bounded(self.acreate_dependency_relationship(d)) for d in dependencies))
+            finally:
+                await self.aclose()
+            return sum(files), sum(deps)
+        
+        return asyncio.run(run())
+    
+    def _plan_dependency(self, session, dependency: Dict,
+                         target_paths: Optional[Dict[Tuple[str, Optional[str]], Optional[str]]] = None
+                         ) -> Optional[Tuple[str, Dict]]:
+        """Resolve a dependency to the query that records it.
+        
+        Args:
+            session: Open Neo4j session used for lookups, or None to leave the
+                relative-import target check to the write (RELATIVE_OR_EXTERNAL)
+            dependency: Dependency information dictionary
+            target_paths: Direct-import targets already resolved by (import name, source language)
+            
+        Returns:
+            (name of the query in config.CYPHER_QUERIES, parameters), or None to skip it
+        """
+        dependency_type = dependency.get('dependency_type', 'unknown')
+        
+        if dependency_type == 'direct_import':
+            # Handle direct imports
+            key = (dependency['import_name'], dependency.get('source_language'))
+            if target_paths is not None and key in target_paths:
+                target_path = target_paths[key]
+            else:
+                target_path = self._find_target_file_path(*key)
+            if target_path:
+                # Prevent self-referential relationships
+                if target_path == dependency['source_file']:
+                    if self.verbose:
+                        print(f"Skipping self-referential dependency: {dependency['source_file']} -> {target_path}")
+                    return None
                 
-                elif dependency_type == 'external_dependency':
-                    # Handle external dependencies (legacy support)
-                    result = session.run(
-                        config.CYPHER_QUERIES['create_external_dependency'],
-                        source_path=dependency['source_file'],
-                        module_name=dependency['import_name'],
-                        module_type=dependency.get('type', 'external_module'),
-                        import_statement=dependency['import_statement'],
-                        line_number=dependency['line_number']
-                    )
+                return 'create_direct_dependency', {
+                    'source_path': dependency['source_file'],
+                    'target_path': target_path,
+                    'import_statement': dependency['import_statement'],
+                    'line_number': dependency['line_number']
+                }
+            
+            # Create external module node for unresolved direct imports
+            return 'create_external_dependency', {
+                'source_path': dependency['source_file'],
+                'module_name': dependency['import_name'],
+                'module_type': 'external_module',
+                'import_statement': dependency['import_statement'],
+                'line_number': dependency['line_number']
+            }
+        
+        elif dependency_type == 'relative_import':
+            # Handle relative imports
+            target_path = dependency.get('resolved_path')
+            if target_path and session is None:
+                # Prevent self-referential relationships
+                if target_path == dependency['source_file']:
+                    if self.verbose:
+                        print(f"Skipping self-referential dependency: {dependency['source_file']} -> {target_path}")
+                    return None
                 
+                return RELATIVE_OR_EXTERNAL, {
+                    'source_path': dependency['source_file'],
+                    'target_path': target_path,
+                    'module_name': dependency['import_name'],
+                    'module_type': 'relative_module',
+                    'import_statement': dependency['import_statement'],
+                    'line_number': dependency['line_number']
+                }
+            
+            if target_path:
+                # Verify that the resolved target file actually exists in the database
+                if self._known_paths is not None:
+                    target_exists = target_path in self._known_paths
                 else:
-                    print(f"Unknown dependency type: {dependency_type}")
-                    return False
+                    target_exists = session.run(FILE_EXISTS_QUERY, path=target_path).single() is not None
                 
-                return True
-        except Exception as e:
-            print(f"Error creating dependency for {dependency['source_file']}: {e}")
-            return False
+                if target_exists:
+                    # Target file exists - create relative dependency
+                    # Prevent self-referential relationships
+                    if target_path == dependency['source_file']:
+                        if self.verbose:
+                            print(f"Skipping self-referential dependency: {dependency['source_file']} -> {target_path}")
+                        return None
+                    
+                    return 'create_relative_dependency', {
+                        'source_path': dependency['source_file'],
+                        'target_path': target_path,
+                        'import_statement': dependency['import_statement'],
+                        'line_number': dependency['line_number']
+                    }
+                
+                # Target file doesn't exist in database - create external dependency
+                if self.verbose:
+                    print(f"⚠️  Relative import target not found in database: {target_path} "
+                          f"({dependency['source_file']}: {dependency['import_statement']})")
+            
+            # Create external module node for unresolved relative imports
+            return 'create_external_dependency', {
+                'source_path': dependency['source_file'],
+                'module_name': dependency['import_name'],
+                'module_type': 'relative_module',
+                'import_statement': dependency['import_statement'],
+                'line_number': dependency['line_number']
+            }
+        
+        elif dependency_type == 'package_dependency':
+            # Handle package dependencies
+            return 'create_package_dependency', {
+                'source_path': dependency['source_file'],
+                'package_name': dependency['package_name'],
+                'package_version': dependency.get('package_version'),
+                'package_manager': dependency.get('package_manager', 'unknown'),
+                'source_file': dependency['source_file']
+            }
+        
+        elif dependency_type == 'external_dependency':
+            # Handle external dependencies (legacy support)
+            return 'create_external_dependency', {
+                'source_path': dependency['source_file'],
+                'module_name': dependency['import_name'],
+                'module_type': dependency.get('type', 'external_module'),
+                'import_statement': dependency['import_statement'],
+                'line_number': dependency['line_number']
+            }
+        
+        print(f"Unknown dependency type: {dependency_type}")
+        return None
+    
+    def prime_path_cache(self):
+        """Load every File path once so existence checks no longer query the database.
+        
+        Call it once the file nodes are written; later writes through this
+        manager keep the cache up to date.
+        """
+        self._known_paths = set(self.list_files_in_database())
     
     def file_exists_in_database(self, file_path: str) -> bool:
         """Check if a file exists in the database.
@@ -209,146 +791,170 @@ class Neo4jManager:
         Returns:
             True if file exists, False otherwise
         """
+        if self._known_paths is not None:
+            return file_path in self._known_paths
+        
         try:
-            with self.driver.session() as session:
-                result = session.run("""
-                    MATCH (f:File)
-                    WHERE f.path = $file_path
-                    RETURN f.path as path
-                """, file_path=file_path)
-                
-                return result.single() is not None
+            ingest_session = self._ingest_session()
+            if ingest_session is not None:
+                return ingest_session.run(FILE_EXISTS_QUERY, path=file_path).single() is not None
+            records = self._execute_query(FILE_EXISTS_QUERY, {'path': file_path}, write=False)
+            
+            return bool(records)
         except Exception as e:
             print(f"Error checking if file exists: {e}")
             return False
 
-    def _find_target_file_path(self, import_name: str) -> Optional[str]:
+    def _find_target_file_paths(self, imports) -> Dict[Tuple[str, Optional[str]], Optional[str]]:
+        """Resolve the target file path of each distinct import.
+        
+        Imports not in the cache are resolved RESOLVE_BATCH_SIZE at a time with one
+        UNWIND query each, instead of several lookups per name.
+        
+        Args:
+            imports: (import name, source language) pairs
+            
+        Returns:
+            Dictionary mapping each pair to its target file path (None if not found)
+        """
+        keys = set(imports)
+        uncached = [key for key in keys if key not in self._resolve_cache]
+        
+        if uncached:
+            try:
+                with self._session() as session:
+                    for start in range(0, len(uncached), RESOLVE_BATCH_SIZE):
+                        batch = uncached[start:start + RESOLVE_BATCH_SIZE]
+                        params = [dict(self._resolve_params(*key), key=i) for i, key in enumerate(batch)]
+                        found = {record['key']: record['path']
+                                 for record in session.run(RESOLVE_TARGETS_QUERY, imports=params)}
+                        for i, key in enumerate(batch):
+                            self._resolve_cache[key] = found.get(i)
+            except Exception as e:
+                print(f"Error resolving {len(uncached)} import targets in bulk, resolving one by one: {e}")
+        
+        return {key: self._find_target_file_path(*key) for key in keys}
+    
+    @staticmethod
+    def _resolve_params(import_name: str, source_language: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """Parameters of RESOLVE_TARGETS_QUERY for one import, mirroring _query_target_file_path."""
+        params = {'spring_path': None, 'class_file': None, 'init_file': None,
+                  'package_name': None, 'module_file': None, 'module_basename': None, 'module_name': None}
+        
+        parts = import_name.split('.')
+        if source_language != 'python':
+            if import_name.startswith('org.springframework') and len(parts) >= 4:
+                package_path = '/'.join(parts[3:-1])
+                params['spring_path'] = f"spring-{parts[2]}/src/main/java/{package_path}/{parts[-1]}.java"
+            if '.' in import_name:
+                params['class_file'] = f"{parts[-1]}.java"
+        if source_language != 'java' and not import_name.startswith('.'):
+            module_path = import_name.replace('.', '/')
+            params['init_file'] = f"{module_path}/__init__.py"
+            params['package_name'] = import_name
+            params['module_file'] = f"{module_path}.py"
+            params['module_basename'] = f"{parts[-1]}.py"
+            params['module_name'] = f"{import_name}.py"
+        return params
+    
+    def _find_target_file_path(self, import_name: str, source_language: Optional[str] = None) -> Optional[str]:
         """Find the target file path for an import name.
         
+        The same imports recur across a codebase, so results (misses included)
+        are cached per import until the File nodes change.
+        
         Args:
             import_name: Name of the imported module/class
+            source_language: Language of the importing file; Java imports skip the
+                Python lookups and Python imports skip the Java ones
             
         Returns:
             Target file path if found, None otherwise
         """
+        key = (import_name, source_language)
         try:
-            with self.driver.session() as session:
-                # For Java imports like "org.springframework.core.ClassPathResource"
-                # We need to find the exact file that contains this class
-                
-                # Method 1: For Spring Framework imports, construct the exact expected path
-                if import_name.startswith('org.springframework'):
-                    parts = import_name.split('.')
-                    if len(parts) >= 4:
-                        # org.springframework.core.ClassPathResource -> 
-                        # spring-core/src/main/java/org/springframework/core/ClassPathResource.java
-                        module_name = parts[2]  # core, context, beans, etc.
-                        package_path = '/'.join(parts[3:-1])  # org/springframework/core
-                        class_name = parts[-1]  # ClassPathResource
-                        
-                        # Look for exact file match
-                        expected_path = f"spring-{module_name}/src/main/java/{package_path}/{class_name}.java"
-                        result = session.run("""
-                            MATCH (f:File)
-                            WHERE f.path = $expected_path
-                            RETURN f.path as path
-                        """, expected_path=expected_path)
-                        
-                        record = result.single()
-                        if record:
-                            return record['path']
-                        
-                        # If exact match not found, try partial match with class name at the end
-                        result = session.run("""
-                            MATCH (f:File)
-                            WHERE f.path ENDS WITH $class_file
-                            RETURN f.path as path
-                            LIMIT 1
-                        """, class_file=f"{class_name}.java")
-                        
-                        record = result.single()
-                        if record:
-                            return record['path']
-                
-                # Method 2: For other Java imports, try to find exact class file
-                if '.' in import_name:
-                    class_name = import_name.split('.')[-1]
-                    
-                    # Look for exact class file match
-                    result = session.run("""
-                        MATCH (f:File)
-                        WHERE f.path ENDS WITH $class_file
-                        RETURN f.path as path
-                        LIMIT 1
-                    """, class_file=f"{class_name}.java")
-                    
-                    record = result.single()
-                    if record:
-                        return record['path']
-                
-                # Method 3: For Python imports, try to find exact module file
-                if not import_name.startswith('.'):  # Not a relative import
-                    # Convert import name to file path
-                    module_path = import_name.replace('.', '/')
-                    
-                    # For Python packages, first try to find the package directory's __init__.py
-                    # This handles cases like "from flask import request" -> look for flask/__init__.py
-                    # Should match: src/flask/__init__.py, flask/__init__.py, etc.
-                    result = session.run("""
-                        MATCH (f:File)
-                        WHERE f.path ENDS WITH $init_file
-                        RETURN f.path as path
-                        LIMIT 1
-                    """, init_file=f"{module_path}/__init__.py")
-                    
-                    record = result.single()
-                    if record:
-                        return record['path']
-                    
-                    # Also try to find the package directory itself (for cases where __init__.py might not be scanned)
-                    # This handles cases where we have flask/ but no __init__.py in our scanned files
-                    result = session.run("""
-                        MATCH (f:File)
-                        WHERE f.path CONTAINS $package_name AND f.path ENDS WITH '.py'
-                        AND f.path CONTAINS $package_name
-                        RETURN f.path as path
-                        ORDER BY size(f.path) ASC
-                        LIMIT 1
-                    """, package_name=import_name)
-                    
-                    record = result.single()
-                    if record:
-                        return record['path']
-                    
-                    # If no package found, try to find a standalone .py file
-                    # This handles cases like "from mymodule import something" -> look for mymodule.py
-                    result = session.run("""
-                        MATCH (f:File)
-                        WHERE f.path ENDS WITH $module_file
-                        RETURN f.path as path
-                        LIMIT 1
-                    """, module_file=f"{module_path}.py")
+            return self._resolve_cache[key]
+        except KeyError:
+            pass
+        
+        try:
+            target_path = self._query_target_file_path(import_name, source_language)
+        except Exception as e:
+            print(f"Error finding target file for {import_name}: {e}")
+            return None
+        
+        self._resolve_cache[key] = target_path
+        return target_path
+    
+    def _query_target_file_path(self, import_name: str, source_language: Optional[str] = None) -> Optional[str]:
+        """Look up the target file path for an import name in the database (uncached)."""
+        java_lookups = source_language != 'python'
+        python_lookups = source_language != 'java'
+        
+        with self._session() as session:
+            # For Java imports like "org.springframework.core.ClassPathResource"
+            # We need to find the exact file that contains this class
+            
+            # Method 1: For Spring Framework imports, construct the exact expected path
+            if java_lookups and import_name.startswith('org.springframework'):
+                parts = import_name.split('.')
+                if len(parts) >= 4:
+                    # org.springframework.core.ClassPathResource -> 
+                    # spring-core/src/main/java/org/springframework/core/ClassPathResource.java
+                    module_name = parts[2]  # core, context, beans, etc.
+                    package_path = '/'.join(parts[3:-1])  # org/springframework/core
+                    class_name = parts[-1]  # ClassPathResource
                     
-                    record = result.single()
+                    # Look for exact file match
+                    expected_path = f"spring-{module_name}/src/main/java/{package_path}/{class_name}.java"
+                    record = session.run(FILE_PATH_QUERY, path=expected_path).single()
                     if record:
                         return record['path']
                     
-                    # Try exact module name match as fallback
-                    result = session.run("""
-                        MATCH (f:File)
-                        WHERE f.name = $module_name
-                        RETURN f.path as path
-                        LIMIT 1
-                    """, module_name=f"{import_name}.py")
-                    
-                    record = result.single()
+                    # If exact match not found, try any file of that class name
+                    record = session.run(FILE_BY_NAME_QUERY, name=f"{class_name}.java").single()
                     if record:
                         return record['path']
+            
+            # Method 2: For other Java imports, try to find exact class file
+            if java_lookups and '.' in import_name:
+                class_name = import_name.split('.')[-1]
                 
-                return None
+                # Look for exact class file match
+                record = session.run(FILE_BY_NAME_QUERY, name=f"{class_name}.java").single()
+                if record:
+                    return record['path']
+            
+            # Method 3: For Python imports, try to find exact module file
+            if python_lookups and not import_name.startswith('.'):  # Not a relative import
+                # Convert import name to file path
+                module_path = import_name.replace('.', '/')
                 
-        except Exception as e:
-            print(f"Error finding target file for {import_name}: {e}")
+                # For Python packages, first try to find the package directory's __init__.py
+                # This handles cases like "from flask import request" -> look for flask/__init__.py
+                # Should match: src/flask/__init__.py, flask/__init__.py, etc.
+                record = session.run(PACKAGE_INIT_QUERY, init_file=f"{module_path}/__init__.py").single()
+                if record:
+                    return record['path']
+                
+                # Also try to find the package directory itself (for cases where __init__.py might not be scanned)
+                # This handles cases where we have flask/ but no __init__.py in our scanned files
+                record = session.run(PACKAGE_FILE_QUERY, package_name=import_name).single()
+                if record:
+                    return record['path']
+                
+                # If no package found, try to find a standalone .py file
+                # This handles cases like "from mymodule import something" -> look for mymodule.py
+                record = session.run(MODULE_FILE_QUERY, module_basename=f"{import_name.split('.')[-1]}.py",
+                                     module_file=f"{module_path}.py").single()
+                if record:
+                    return record['path']
+                
+                # Try exact module name match as fallback
+                record = session.run(FILE_BY_NAME_QUERY, name=f"{import_name}.py").single()
+                if record:
+                    return record['path']
+            
             return None
     
     def list_files_in_database(self, pattern: str = None) -> List[str]:
@@ -361,22 +967,12 @@ class Neo4jManager:
             List of file paths
         """
         try:
-            with self.driver.session() as session:
-                if pattern:
-                    result = session.run("""
-                        MATCH (f:File)
-                        WHERE f.path CONTAINS $pattern
-                        RETURN f.path as path
-                        ORDER BY f.path
-                    """, pattern=pattern)
-                else:
-                    result = session.run("""
-                        MATCH (f:File)
-                        RETURN f.path as path
-                        ORDER BY f.path
-                    """)
-                
-                return [record['path'] for record in result]
+            if pattern:
+                records = self._execute_query(LIST_FILES_MATCHING_QUERY, {'pattern': pattern}, write=False)
+            else:
+                records = self._execute_query(LIST_FILES_QUERY, write=False)
+            
+            return [record['path'] for record in records]
         except Exception as e:
             print(f"Error listing files: {e}")
             return []
@@ -387,197 +983,147 @@ class Neo4jManager:
         Returns:
             Dictionary with statistics
         """
-        with self.driver.session() as session:
-            stats = {}
-            
-            # Total files
-            result = session.run("MATCH (f:File) RETURN count(f) as count")
-            stats['total_files'] = result.single()['count']
-            
-            # Files by language
-            result = session.run("""
-                MATCH (f:File)
-                RETURN f.language as language, count(f) as count
-                ORDER BY count DESC
-            """)
-            stats['files_by_language'] = {record['language']: record['count'] for record in result}
-            
-            # Total dependencies (sum of all relationship types)
-            result = session.run("""
-                MATCH ()-[r:DIRECT_IMPORTS]->() RETURN count(r) as count
-                UNION ALL
-                MATCH ()-[r:RELATIVE_IMPORTS]->() RETURN count(r) as count
-                UNION ALL
-                MATCH ()-[r:EXTERNAL_DEPENDENCIES]->() RETURN count(r) as count
-                UNION ALL
-                MATCH ()-[r:PACKAGE_DEPENDENCIES]->() RETURN count(r) as count
-            """)
-            total_deps = sum([record['count'] for record in result])
-            stats['total_dependencies'] = total_deps
-            
-            # Dependencies by type
-            direct_count = session.run("MATCH ()-[r:DIRECT_IMPORTS]->() RETURN count(r) as count").single()['count']
-            relative_count = session.run("MATCH ()-[r:RELATIVE_IMPORTS]->() RETURN count(r) as count").single()['count']
-            external_count = session.run("MATCH ()-[r:EXTERNAL_DEPENDENCIES]->() RETURN count(r) as count").single()['count']
-            package_count = session.run("MATCH ()-[r:PACKAGE_DEPENDENCIES]->() RETURN count(r) as count").single()['count']
-            
-            stats['dependencies_by_type'] = {
-                'direct_imports': direct_count,
-                'relative_imports': relative_count,
-                'external_dependencies': external_count,
-                'package_dependencies': package_count
-            }
-            
-            # Most dependent files (sum of all dependency types)
-            result = session.run("""
-                MATCH (f:File)-[r:DIRECT_IMPORTS]->() RETURN f.path as file, count(r) as count
-                UNION ALL
-                MATCH (f:File)-[r:RELATIVE_IMPORTS]->() RETURN f.path as file, count(r) as count
-                UNION ALL
-                MATCH (f:File)-[r:EXTERNAL_DEPENDENCIES]->() RETURN f.path as file, count(r) as count
-                UNION ALL
-                MATCH (f:File)-[r:PACKAGE_DEPENDENCIES]->() RETURN f.path as file, count(r) as count
-            """)
-            
-            file_deps = {}
-            for record in result:
-                file_path = record['file']
-                file_deps[file_path] = file_deps.get(file_path, 0) + record['count']
-            
-            # Sort by count and get top 10
-            sorted_files = sorted(file_deps.items(), key=lambda x: x[1], reverse=True)[:10]
-            stats['most_dependent_files'] = dict(sorted_files)
-            
-            # Most depended on files
-            result = session.run("""
-                MATCH ()-[r:DIRECT_IMPORTS]->(f:File) RETURN f.path as file, count(r) as count
-                UNION ALL
-                MATCH ()-[r:RELATIVE_IMPORTS]->(f:File) RETURN f.path as file, count(r) as count
-            """)
-            
-            file_dependents = {}
-            for record in result:
-                file_path = record['file']
-                file_dependents[file_path] = file_dependents.get(file_path, 0) + record['count']
-            
-            # Sort by count and get top 10
-            sorted_dependents = sorted(file_dependents.items(), key=lambda x: x[1], reverse=True)[:10]
-            stats['most_depended_on_files'] = dict(sorted_dependents)
-            
-            # Package dependencies by manager
-            result = session.run("""
-                MATCH ()-[r:PACKAGE_DEPENDENCIES]->(p:Package)
-                RETURN r.package_manager as manager, count(r) as count
-                ORDER BY count DESC
-            """)
-            stats['package_dependencies_by_manager'] = {record['manager']: record['count'] for record in result}
-            
-            return stats
+        grouped = defaultdict(dict)
+        total_files = 0
+        for record in self._execute_query(STATISTICS_QUERY, write=False):
+            if record['stat'] == 'total_files':
+                total_files = record['value']
+            else:
+                grouped[record['stat']][record['key']] = record['value']
+        
+        # The four relationship counts make up the total, so it needs no scan of its own
+        dependencies_by_type = {
+            'direct_imports': grouped['dependencies_by_type'].get('direct_imports', 0),
+            'relative_imports': grouped['dependencies_by_type'].get('relative_imports', 0),
+            'external_dependencies': grouped['dependencies_by_type'].get('external_dependencies', 0),
+            'package_dependencies': grouped['dependencies_by_type'].get('package_dependencies', 0)
+        }
+        
+        def by_count(stat: str) -> Dict:
+            return dict(sorted(grouped[stat].items(), key=lambda x: x[1], reverse=True))
+        
+        return {
+            'total_files': total_files,
+            'files_by_language': by_count('files_by_language'),
+            'total_dependencies': sum(dependencies_by_type.values()),
+            'dependencies_by_type': dependencies_by_type,
+            # Top 10 by count, aggregated and limited by the server
+            'most_dependent_files': by_count('most_dependent_files'),
+            'most_depended_on_files': by_count('most_depended_on_files'),
+            'package_dependencies_by_manager': by_count('package_dependencies_by_manager')
+        }
     
     def export_graph_data(self, output_file: str = "dependency_graph.json"):
         """Export the dependency graph data to JSON format.
         
+        Records are written as they stream from the database, so the graph is
+        never held in memory as a whole.
+        
         Args:
             output_file: Output file path
         """
-        import json
-        
-        with self.driver.session() as session:
+        # (key, query, record -> JSON-serializable row); nodes are returned as plain
+        # property maps, without their labels and ids
+        sections = [
             # Get all files
-            result = session.run("MATCH (f:File) RETURN f")
-            files = [dict(record['f']) for record in result]
-            
+            ('files', "MATCH (f:File) RETURN properties(f) AS f", lambda record: record['f']),
             # Get all dependencies
-            result = session.run("""
+            ('internal_dependencies', """
                 MATCH (source:File)-[r:DEPENDS_ON]->(target:File)
                 RETURN source.path as source, target.path as target, r.type as type
-            """)
-            dependencies = [dict(record) for record in result]
-            
+            """, dict),
             # Get external modules
-            result = session.run("MATCH (m:Module) RETURN m")
-            modules = [dict(record['m']) for record in result]
-            
+            ('modules', "MATCH (m:Module) RETURN properties(m) AS m", lambda record: record['m']),
             # Get external dependencies
-            result = session.run("""
+            ('external_dependencies', """
                 MATCH (source:File)-[r:DEPENDS_ON]->(target:Module)
                 RETURN source.path as source, target.name as target, r.type as type
-            """)
-            external_deps = [dict(record) for record in result]
-            
-            graph_data = {
-                'files': files,
-                'internal_dependencies': dependencies,
-                'modules': modules,
-                'external_dependencies': external_deps,
-                'statistics': self.get_dependency_statistics()
-            }
-            
-            with open(output_file, 'w') as f:
-                json.dump(graph_data, f, indent=2)
-            
-            print(f"Graph data exported to {output_file}")
+            """, dict),
+        ]
+        statistics = self.get_dependency_statistics()
+        
+        with open(output_file, 'wb') as f, self._session() as session:
+            f.write(b'{\n')
+            for key, query, to_row in sections:
+                f.write(b'  ' + _json_dumps(key) + b': [')
+                separator = b'\n    '
+                for record in session.run(query):
+                    f.write(separator + _json_dumps(to_row(record)))
+                    separator = b',\n    '
+                f.write(b'\n  ],\n')
+            f.write(b'  "statistics": ' + _json_dumps(statistics) + b'\n}\n')
+        
+        print(f"Graph data exported to {output_file}")
     
     def run_analysis_queries(self):
-        """Run analysis queries and print results."""
+        """Run analysis queries and print results.
+        
+        The queries are independent reads, so they run concurrently on pooled
+        connections; results are printed in order once all have returned.
+        """
         print("\n=== DEPENDENCY GRAPH ANALYSIS ===\n")
         
-        with self.driver.session() as session:
+        queries = [
             # 1. Circular dependencies
-            print("1. Checking for circular dependencies...")
-            result = session.run("""
+            """
                 MATCH path = (f:File)-[:DEPENDS_ON*]->(f)
                 RETURN f.path as file, length(path) as cycle_length
                 ORDER BY cycle_length DESC
                 LIMIT 5
-            """)
-            circular_deps = list(result)
-            if circular_deps:
-                print("Found circular dependencies:")
-                for record in circular_deps:
-                    print(f"  - {record['file']} (cycle length: {record['cycle_length']})")
-            else:
-                print("No circular dependencies found.")
-            
+            """,
             # 2. Files with most dependencies
-            print("\n2. Files with most outgoing dependencies:")
-            result = session.run("""
+            """
                 MATCH (f:File)-[r:DEPENDS_ON]->()
                 RETURN f.path as file, count(r) as dep_count
                 ORDER BY dep_count DESC
                 LIMIT 10
-            """)
-            for record in result:
-                print(f"  - {record['file']}: {record['dep_count']} dependencies")
-            
+            """,
             # 3. Most depended on files
-            print("\n3. Files with most incoming dependencies:")
-            result = session.run("""
+            """
                 MATCH ()-[r:DEPENDS_ON]->(f:File)
                 RETURN f.path as file, count(r) as dep_count
                 ORDER BY dep_count DESC
                 LIMIT 10
-            """)
-            for record in result:
-                print(f"  - {record['file']}: {record['dep_count']} dependents")
-            
+            """,
             # 4. External dependencies
-            print("\n4. Most common external dependencies:")
-            result = session.run("""
+            """
                 MATCH ()-[r:DEPENDS_ON]->(m:Module)
                 RETURN m.name as module, count(r) as dep_count
                 ORDER BY dep_count DESC
                 LIMIT 10
-            """)
-            for record in result:
-                print(f"  - {record['module']}: {record['dep_count']} usages")
-            
+            """,
             # 5. Language distribution
-            print("\n5. Files by programming language:")
-            result = session.run("""
+            """
                 MATCH (f:File)
                 RETURN f.language as language, count(f) as count
                 ORDER BY count DESC
-            """)
-            for record in result:
-                print(f"  - {record['language']}: {record['count']} files") 
\ No newline at end of file
+            """,
+        ]
+        with ThreadPoolExecutor(max_workers=min(len(queries), NEO4J_POOL_SIZE)) as executor:
+            circular_deps, most_dependencies, most_dependents, external_deps, languages = executor.map(
+                lambda query: self._execute_query(query, write=False), queries
+            )
+        
+        print("1. Checking for circular dependencies...")
+        if circular_deps:
+            print("Found circular dependencies:")
+            for record in circular_deps:
+                print(f"  - {record['file']} (cycle length: {record['cycle_length']})")
+        else:
+            print("No circular dependencies found.")
+        
+        print("\n2. Files with most outgoing dependencies:")
+        for record in most_dependencies:
+            print(f"  - {record['file']}: {record['dep_count']} dependencies")
+        
+        print("\n3. Files with most incoming dependencies:")
+        for record in most_dependents:
+            print(f"  - {record['file']}: {record['dep_count']} dependents")
+        
+        print("\n4. Most common external dependencies:")
+        for record in external_deps:
+            print(f"  - {record['module']}: {record['dep_count']} usages")
+        
+        print("\n5. Files by programming language:")
+        for record in languages:
+            print(f"  - {record['language']}: {record['count']} files")
\ No newline at end of file
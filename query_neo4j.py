@@ -10,230 +10,339 @@ This script queries the Neo4j database to show:
 """
 
 import argparse
+import shutil
 import sys
-from neo4j_manager import Neo4jManager
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from neo4j_manager import Neo4jManager, create_indexes
 import config
 
+# Cypher text in this module is static and every value that varies (page offsets,
+# limits) is passed as a parameter, so the server parses and plans each query once
 
-def get_comprehensive_stats(neo4j_manager):
+# Rows shown in the top-N sections of the reports
+TOP_N = 10
+# Relationships shown per type in the basic report's samples
+SAMPLE_SIZE = 5
+
+# All sections of the comprehensive statistics as (section, key, value) rows, so
+# the report costs one round-trip; top-N sections are limited by the server, and
+# group by node so only the kept files have their path read
+COMPREHENSIVE_STATS_QUERY = """
+CALL { MATCH (n) RETURN count(n) AS nodes }
+CALL { MATCH ()-[r]->() RETURN count(r) AS relationships }
+UNWIND [
+    ['nodes', nodes],
+    ['relationships', relationships],
+    ['density', CASE WHEN nodes > 1 THEN toFloat(relationships) / (nodes * (nodes - 1)) ELSE null END]
+] AS total
+RETURN 'totals' AS section, total[0] AS key, total[1] AS value
+UNION ALL
+MATCH (n) RETURN 'node_labels' AS section, labels(n) AS key, count(n) AS value
+UNION ALL
+MATCH (f:File) RETURN 'files_by_language' AS section, f.language AS key, count(f) AS value
+UNION ALL
+MATCH (f:File)
+WITH f.extension AS key, count(f) AS value
+RETURN 'files_by_extension' AS section, key, value ORDER BY value DESC LIMIT $top
+UNION ALL
+MATCH ()-[r]->() RETURN 'relationships_by_type' AS section, type(r) AS key, count(r) AS value
+UNION ALL
+MATCH ()-[r:DIRECT_IMPORTS|RELATIVE_IMPORTS|EXTERNAL_DEPENDENCIES|PACKAGE_DEPENDENCIES]->()
+RETURN 'dependencies_by_type' AS section, type(r) AS key, count(r) AS value
+UNION ALL
+MATCH (m:Module) RETURN 'modules_by_type' AS section, m.type AS key, count(m) AS value
+UNION ALL
+MATCH ()-[r:PACKAGE_DEPENDENCIES]->(p:Package)
+RETURN 'packages_by_manager' AS section, r.package_manager AS key, count(r) AS value
+UNION ALL
+MATCH (f:File)-[r]->()
+WITH f, count(r) AS value ORDER BY value DESC LIMIT $top
+RETURN 'most_outgoing' AS section, f.path AS key, value
+UNION ALL
+MATCH ()-[r]->(f:File)
+WITH f, count(r) AS value ORDER BY value DESC LIMIT $top
+RETURN 'most_incoming' AS section, f.path AS key, value
+"""
+
+# Rows fetched per round-trip when listing dependencies
+DEPENDENCY_PAGE_SIZE = 1000
+
+# Sections of the full dependency listing, each ordered so it can be paged; the
+# IS NOT NULL predicate lets the planner walk sources through the File.path index
+# in path order. It is not forced with a hint, so a missing index only costs a sort
+DIRECT_IMPORTS_LIST_QUERY = """
+    MATCH (source:File)-[r:DIRECT_IMPORTS]->(target)
+    WHERE source.path IS NOT NULL
+    RETURN source.path as source, target.path as target, r.import_statement as import_stmt, r.line_number as line
+    ORDER BY source.path, target.path
+"""
+RELATIVE_IMPORTS_LIST_QUERY = """
+    MATCH (source:File)-[r:RELATIVE_IMPORTS]->(target:File)
+    WHERE source.path IS NOT NULL
+    RETURN source.path as source, target.path as target, r.import_statement as import_stmt, r.line_number as line
+    ORDER BY source.path, target.path
+"""
+EXTERNAL_DEPENDENCIES_LIST_QUERY = """
+    MATCH (source:File)-[r:EXTERNAL_DEPENDENCIES]->(target:Module)
+    WHERE source.path IS NOT NULL
+    RETURN source.path as source, target.name as module, target.type as type, r.import_statement as import_stmt, r.line_number as line
+    ORDER BY source.path, target.name
+"""
+PACKAGE_DEPENDENCIES_LIST_QUERY = """
+    MATCH (source:File)-[r:PACKAGE_DEPENDENCIES]->(target:Package)
+    WHERE source.path IS NOT NULL
+    RETURN source.path as source, target.name as package, target.version as version, r.package_manager as manager
+    ORDER BY source.path, target.name
+"""
+
+def get_comprehensive_stats(session):
     """Get comprehensive statistics about all nodes and dependencies."""
     print("=" * 80)
     print("COMPREHENSIVE DATABASE STATISTICS")
     print("=" * 80)
     
-    with neo4j_manager.driver.session() as session:
-        # 1. Node Statistics
-        print("\n1. NODE STATISTICS")
-        print("-" * 50)
-        
-        # Count all nodes by type
-        result = session.run("""
-            MATCH (n)
-            RETURN labels(n) as labels, count(n) as count
-            ORDER BY count DESC
-        """)
-        
-        total_nodes = 0
-        print("Nodes by type:")
-        for record in result:
-            labels = record['labels']
-            count = record['count']
-            total_nodes += count
-            print(f"  {labels}: {count}")
-        
-        print(f"\nTotal nodes: {total_nodes}")
-        
-        # 2. File Statistics
-        print("\n2. FILE STATISTICS")
-        print("-" * 50)
-        
-        # Files by language
-        result = session.run("""
-            MATCH (f:File)
-            RETURN f.language as language, count(f) as count
-            ORDER BY count DESC
-        """)
-        
-        print("Files by language:")
-        for record in result:
-            language = record['language'] or 'unknown'
-            count = record['count']
-            print(f"  {language}: {count}")
-        
-        # Files by extension
-        result = session.run("""
-            MATCH (f:File)
-            RETURN f.extension as extension, count(f) as count
-            ORDER BY count DESC
-            LIMIT 10
-        """)
-        
-        print("\nFiles by extension (top 10):")
-        for record in result:
-            extension = record['extension'] or 'no_extension'
-            count = record['count']
-            print(f"  {extension}: {count}")
-        
-        # 3. Relationship Statistics
-        print("\n3. RELATIONSHIP STATISTICS")
-        print("-" * 50)
-        
-        # Count all relationships by type
-        result = session.run("""
-            MATCH ()-[r]->()
-            RETURN type(r) as relationship_type, count(r) as count
-            ORDER BY count DESC
-        """)
-        
-        total_relationships = 0
-        print("Relationships by type:")
-        for record in result:
-            rel_type = record['relationship_type']
-            count = record['count']
-            total_relationships += count
-            print(f"  {rel_type}: {count}")
-        
-        print(f"\nTotal relationships: {total_relationships}")
-        
-        # 4. Dependency Statistics
-        print("\n4. DEPENDENCY STATISTICS")
-        print("-" * 50)
-        
-        # Direct imports
-        direct_count = session.run("MATCH ()-[r:DIRECT_IMPORTS]->() RETURN count(r) as count").single()['count']
-        print(f"Direct imports: {direct_count}")
-        
-        # Relative imports
-        relative_count = session.run("MATCH ()-[r:RELATIVE_IMPORTS]->() RETURN count(r) as count").single()['count']
-        print(f"Relative imports: {relative_count}")
-        
-        # External dependencies
-        external_count = session.run("MATCH ()-[r:EXTERNAL_DEPENDENCIES]->() RETURN count(r) as count").single()['count']
-        print(f"External dependencies: {external_count}")
-        
-        # Package dependencies
-        package_count = session.run("MATCH ()-[r:PACKAGE_DEPENDENCIES]->() RETURN count(r) as count").single()['count']
-        print(f"Package dependencies: {package_count}")
-        
-        total_deps = direct_count + relative_count + external_count + package_count
-        print(f"\nTotal dependencies: {total_deps}")
-        
-        # 5. Module Statistics
-        print("\n5. MODULE STATISTICS")
-        print("-" * 50)
-        
-        # External modules by type
-        result = session.run("""
-            MATCH (m:Module)
-            RETURN m.type as type, count(m) as count
-            ORDER BY count DESC
-        """)
-        
-        print("External modules by type:")
-        for record in result:
-            module_type = record['type'] or 'unknown'
-            count = record['count']
-            print(f"  {module_type}: {count}")
-        
-        # 6. Package Statistics
-        print("\n6. PACKAGE STATISTICS")
-        print("-" * 50)
-        
-        # Package dependencies by manager
-        result = session.run("""
-            MATCH ()-[r:PACKAGE_DEPENDENCIES]->(p:Package)
-            RETURN r.package_manager as manager, count(r) as count
-            ORDER BY count DESC
-        """)
-        
-        print("Package dependencies by manager:")
-        for record in result:
-            manager = record['manager'] or 'unknown'
-            count = record['count']
-            print(f"  {manager}: {count}")
-        
-        # 7. Most Connected Files
-        print("\n7. MOST CONNECTED FILES")
-        print("-" * 50)
-        
-        # Files with most outgoing dependencies
-        result = session.run("""
-            MATCH (f:File)-[r]->()
-            RETURN f.path as file, count(r) as outgoing_count
-            ORDER BY outgoing_count DESC
-            LIMIT 10
-        """)
-        
-        print("Files with most outgoing dependencies (top 10):")
-        for record in result:
-            file_path = record['file']
-            count = record['outgoing_count']
-            print(f"  {file_path}: {count} dependencies")
-        
-        # Files with most incoming dependencies
-        result = session.run("""
-            MATCH ()-[r]->(f:File)
-            RETURN f.path as file, count(r) as incoming_count
-            ORDER BY incoming_count DESC
-            LIMIT 10
-        """)
-        
-        print("\nFiles with most incoming dependencies (top 10):")
-        for record in result:
-            file_path = record['file']
-            count = record['incoming_count']
-            print(f"  {file_path}: {count} dependents")
-        
-        # 8. Graph Density
-        print("\n8. GRAPH DENSITY")
-        print("-" * 50)
-        
-        if total_nodes > 1:
-            density = total_relationships / (total_nodes * (total_nodes - 1))
-            print(f"Graph density: {density:.6f}")
-        else:
-            print("Graph density: N/A (insufficient nodes)")
-        
-        print(f"Average dependencies per file: {total_deps / max(1, total_nodes):.2f}")
-        
-        print("\n" + "=" * 80)
-        print("COMPREHENSIVE STATISTICS COMPLETED")
-        print("=" * 80)
+    # Every section comes back from one query as (section, key, value) rows
+    sections = defaultdict(dict)
+    for record in session.run(COMPREHENSIVE_STATS_QUERY, top=TOP_N):
+        key = record['key']
+        sections[record['section']][tuple(key) if isinstance(key, list) else key] = record['value']
+    
+    def by_count(section):
+        return sorted(sections[section].items(), key=lambda x: x[1], reverse=True)
+    
+    # 1. Node Statistics
+    print("\n1. NODE STATISTICS")
+    print("-" * 50)
+    
+    # Totals and density are computed by the server
+    totals = sections['totals']
+    total_nodes = totals.get('nodes', 0)
+    total_relationships = totals.get('relationships', 0)
+    
+    # Count all nodes by type
+    print("Nodes by type:")
+    for labels, count in by_count('node_labels'):
+        print(f"  {list(labels)}: {count}")
+    
+    print(f"\nTotal nodes: {total_nodes}")
+    
+    # 2. File Statistics
+    print("\n2. FILE STATISTICS")
+    print("-" * 50)
+    
+    # Files by language
+    print("Files by language:")
+    for language, count in by_count('files_by_language'):
+        print(f"  {language or 'unknown'}: {count}")
+    
+    # Files by extension
+    print(f"\nFiles by extension (top {TOP_N}):")
+    for extension, count in by_count('files_by_extension'):
+        print(f"  {extension or 'no_extension'}: {count}")
+    
+    # 3. Relationship Statistics
+    print("\n3. RELATIONSHIP STATISTICS")
+    print("-" * 50)
+    
+    # Count all relationships by type
+    print("Relationships by type:")
+    for rel_type, count in by_count('relationships_by_type'):
+        print(f"  {rel_type}: {count}")
+    
+    print(f"\nTotal relationships: {total_relationships}")
+    
+    # 4. Dependency Statistics
+    print("\n4. DEPENDENCY STATISTICS")
+    print("-" * 50)
+    
+    # One aggregation over the four dependency types; types with no relationships have no row
+    dependencies = sections['dependencies_by_type']
+    direct_count = dependencies.get('DIRECT_IMPORTS', 0)
+    print(f"Direct imports: {direct_count}")
+    
+    relative_count = dependencies.get('RELATIVE_IMPORTS', 0)
+    print(f"Relative imports: {relative_count}")
+    
+    external_count = dependencies.get('EXTERNAL_DEPENDENCIES', 0)
+    print(f"External dependencies: {external_count}")
+    
+    package_count = dependencies.get('PACKAGE_DEPENDENCIES', 0)
+    print(f"Package dependencies: {package_count}")
+    
+    total_deps = sum(dependencies.values())
+    print(f"\nTotal dependencies: {total_deps}")
+    
+    # 5. Module Statistics
+    print("\n5. MODULE STATISTICS")
+    print("-" * 50)
+    
+    # External modules by type
+    print("External modules by type:")
+    for module_type, count in by_count('modules_by_type'):
+        print(f"  {module_type or 'unknown'}: {count}")
+    
+    # 6. Package Statistics
+    print("\n6. PACKAGE STATISTICS")
+    print("-" * 50)
+    
+    # Package dependencies by manager
+    print("Package dependencies by manager:")
+    for manager, count in by_count('packages_by_manager'):
+        print(f"  {manager or 'unknown'}: {count}")
+    
+    # 7. Most Connected Files
+    print("\n7. MOST CONNECTED FILES")
+    print("-" * 50)
+    
+    # Files with most outgoing dependencies
+    print(f"Files with most outgoing dependencies (top {TOP_N}):")
+    for file_path, count in by_count('most_outgoing'):
+        print(f"  {file_path}: {count} dependencies")
+    
+    # Files with most incoming dependencies
+    print(f"\nFiles with most incoming dependencies (top {TOP_N}):")
+    for file_path, count in by_count('most_incoming'):
+        print(f"  {file_path}: {count} dependents")
+    
+    # 8. Graph Density
+    print("\n8. GRAPH DENSITY")
+    print("-" * 50)
+    
+    if totals.get('density') is not None:
+        print(f"Graph density: {totals['density']:.6f}")
+    else:
+        print("Graph density: N/A (insufficient nodes)")
+    
+    print(f"Average dependencies per file: {total_deps / max(1, total_nodes):.2f}")
+    
+    print("\n" + "=" * 80)
+    print("COMPREHENSIVE STATISTICS COMPLETED")
+    print("=" * 80)
 
 
-def get_all_files(neo4j_manager):
+def _write_lines(lines):
+    """Write a section's lines to stdout in one call instead of one print per line."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+def get_all_files(session):
     """Get a complete list of all files in the database."""
     print("=" * 80)
     print("COMPLETE LIST OF ALL FILES")
     print("=" * 80)
     
-    with neo4j_manager.driver.session() as session:
-        # Get all files with their details
-        result = session.run("""
-            MATCH (f:File)
-            RETURN f.path as path, f.language as language, f.extension as extension, f.size as size
-            ORDER BY f.path
-        """)
-        
-        file_count = 0
-        print(f"{'Path':<80} {'Language':<12} {'Extension':<10} {'Size':<8}")
-        print("-" * 120)
-        
-        for record in result:
-            path = record['path']
-            language = record['language'] or 'unknown'
-            extension = record['extension'] or 'none'
-            size = record['size'] or 0
-            
-            # Truncate long paths for display
-            display_path = path if len(path) <= 78 else path[:75] + "..."
-            
-            print(f"{display_path:<80} {language:<12} {extension:<10} {size:<8}")
-            file_count += 1
-        
-        print("-" * 120)
-        print(f"Total files: {file_count}")
-        print("=" * 80)
+    # Get all files with their details; the path index, when present, returns them in path order
+    result = session.run("""
+        MATCH (f:File)
+        WHERE f.path IS NOT NULL
+        RETURN f.path as path, f.language as language, f.extension as extension, f.size as size
+        ORDER BY f.path
+    """)
+    
+    file_count = 0
+    print(f"{'Path':<80} {'Language':<12} {'Extension':<10} {'Size':<8}")
+    print("-" * 120)
+    
+    lines = []
+    for record in result:
+        path = record['path']
+        language = record['language'] or 'unknown'
+        extension = record['extension'] or 'none'
+        size = record['size'] or 0
+        
+        # Truncate long paths for display
+        display_path = path if len(path) <= 78 else path[:75] + "..."
+        
+        lines.append(f"{display_path:<80} {language:<12} {extension:<10} {size:<8}")
+        file_count += 1
+    _write_lines(lines)
+    
+    print("-" * 120)
+    print(f"Total files: {file_count}")
+    print("=" * 80)
+
+
+def _paged_records(session, query, page_size=DEPENDENCY_PAGE_SIZE):
+    """Yield the records of an ordered query one SKIP/LIMIT page at a time.
+    
+    Args:
+        session: Neo4j session
+        query: Cypher query ending in ORDER BY, without SKIP/LIMIT
+        page_size: Records per page
+    """
+    paged_query = query + " SKIP $skip LIMIT $limit"
+    skip = 0
+    while True:
+        # Each page is read in full so the server can release the query before it is printed
+        records = list(session.run(paged_query, skip=skip, limit=page_size))
+        yield from records
+        if len(records) < page_size:
+            break
+        skip += page_size
+
+
+def _import_lines(record):
+    """Listing lines of one direct or relative import."""
+    return [
+        f"Source: {record['source']}",
+        f"Target: {record['target']}",
+        f"Import: {record['import_stmt']}",
+        f"Line:   {record['line']}",
+    ]
+
+
+def _external_dependency_lines(record):
+    """Listing lines of one external dependency."""
+    return [
+        f"Source: {record['source']}",
+        f"Module: {record['module']}",
+        f"Type:   {record['type']}",
+        f"Import: {record['import_stmt']}",
+        f"Line:   {record['line']}",
+    ]
+
+
+def _package_dependency_lines(record):
+    """Listing lines of one package dependency."""
+    return [
+        f"Source:  {record['source']}",
+        f"Package: {record['package']}",
+        f"Version: {record['version'] or 'unknown'}",
+        f"Manager: {record['manager'] or 'unknown'}",
+    ]
+
+
+def _spool_section(neo4j_manager, query, format_record):
+    """Format one dependency section into a temporary file, one page at a time.
+    
+    Only the page being formatted is held in memory, so the sections can be
+    fetched in parallel and printed in order afterwards.
+    
+    Args:
+        neo4j_manager: Connected Neo4jManager; the section runs on its own session
+        query: Ordered listing query
+        format_record: Record -> listing lines of one dependency
+        
+    Returns:
+        (temporary file rewound to its start, number of records)
+    """
+    spool = tempfile.TemporaryFile('w+', encoding='utf-8')
+    count = 0
+    with neo4j_manager.driver.session(database=neo4j_manager.database) as session:
+        for record in _paged_records(session, query):
+            spool.write("\n".join(format_record(record)) + "\n" + "-" * 80 + "\n")
+            count += 1
+    spool.seek(0)
+    return spool, count
+
+
+def _print_spool(spool):
+    """Copy a spooled section to stdout and close it."""
+    with spool:
+        shutil.copyfileobj(spool, sys.stdout)
 
 
 def get_all_dependencies(neo4j_manager):
@@ -242,120 +351,67 @@ def get_all_dependencies(neo4j_manager):
     print("COMPLETE LIST OF ALL DEPENDENCIES")
     print("=" * 80)
     
-    with neo4j_manager.driver.session() as session:
-        # 1. Direct Imports
-        print("\n1. DIRECT IMPORTS")
-        print("-" * 80)
-        result = session.run("""
-            MATCH (source:File)-[r:DIRECT_IMPORTS]->(target)
-            RETURN source.path as source, target.path as target, r.import_statement as import_stmt, r.line_number as line
-            ORDER BY source.path, target.path
-        """)
-        
-        direct_count = 0
-        for record in result:
-            source = record['source']
-            target = record['target']
-            import_stmt = record['import_stmt']
-            line = record['line']
-            
-            print(f"Source: {source}")
-            print(f"Target: {target}")
-            print(f"Import: {import_stmt}")
-            print(f"Line:   {line}")
-            print("-" * 80)
-            direct_count += 1
-        
-        print(f"Total direct imports: {direct_count}")
-        
-        # 2. Relative Imports
-        print("\n2. RELATIVE IMPORTS")
-        print("-" * 80)
-        result = session.run("""
-            MATCH (source:File)-[r:RELATIVE_IMPORTS]->(target:File)
-            RETURN source.path as source, target.path as target, r.import_statement as import_stmt, r.line_number as line
-            ORDER BY source.path, target.path
-        """)
-        
-        relative_count = 0
-        for record in result:
-            source = record['source']
-            target = record['target']
-            import_stmt = record['import_stmt']
-            line = record['line']
-            
-            print(f"Source: {source}")
-            print(f"Target: {target}")
-            print(f"Import: {import_stmt}")
-            print(f"Line:   {line}")
-            print("-" * 80)
-            relative_count += 1
-        
-        print(f"Total relative imports: {relative_count}")
-        
-        # 3. External Dependencies
-        print("\n3. EXTERNAL DEPENDENCIES")
-        print("-" * 80)
-        result = session.run("""
-            MATCH (source:File)-[r:EXTERNAL_DEPENDENCIES]->(target:Module)
-            RETURN source.path as source, target.name as module, target.type as type, r.import_statement as import_stmt, r.line_number as line
-            ORDER BY source.path, target.name
-        """)
-        
-        external_count = 0
-        for record in result:
-            source = record['source']
-            module = record['module']
-            module_type = record['type']
-            import_stmt = record['import_stmt']
-            line = record['line']
-            
-            print(f"Source: {source}")
-            print(f"Module: {module}")
-            print(f"Type:   {module_type}")
-            print(f"Import: {import_stmt}")
-            print(f"Line:   {line}")
-            print("-" * 80)
-            external_count += 1
-        
-        print(f"Total external dependencies: {external_count}")
-        
-        # 4. Package Dependencies
-        print("\n4. PACKAGE DEPENDENCIES")
-        print("-" * 80)
-        result = session.run("""
-            MATCH (source:File)-[r:PACKAGE_DEPENDENCIES]->(target:Package)
-            RETURN source.path as source, target.name as package, target.version as version, r.package_manager as manager
-            ORDER BY source.path, target.name
-        """)
-        
-        package_count = 0
-        for record in result:
-            source = record['source']
-            package = record['package']
-            version = record['version'] or 'unknown'
-            manager = record['manager'] or 'unknown'
-            
-            print(f"Source:  {source}")
-            print(f"Package: {package}")
-            print(f"Version: {version}")
-            print(f"Manager: {manager}")
-            print("-" * 80)
-            package_count += 1
-        
-        print(f"Total package dependencies: {package_count}")
-        
-        # Summary
-        total_deps = direct_count + relative_count + external_count + package_count
-        print(f"\n" + "=" * 80)
-        print("DEPENDENCY SUMMARY")
-        print("=" * 80)
-        print(f"Direct imports:      {direct_count}")
-        print(f"Relative imports:    {relative_count}")
-        print(f"External dependencies: {external_count}")
-        print(f"Package dependencies: {package_count}")
-        print(f"Total dependencies:  {total_deps}")
-        print("=" * 80)
+    # The four sections are independent reads, so they run in parallel on separate
+    # connections, each spooled to disk rather than kept in memory until printed
+    sections = [
+        (DIRECT_IMPORTS_LIST_QUERY, _import_lines),
+        (RELATIVE_IMPORTS_LIST_QUERY, _import_lines),
+        (EXTERNAL_DEPENDENCIES_LIST_QUERY, _external_dependency_lines),
+        (PACKAGE_DEPENDENCIES_LIST_QUERY, _package_dependency_lines),
+    ]
+    with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+        futures = [executor.submit(_spool_section, neo4j_manager, query, format_record)
+                   for query, format_record in sections]
+    spools = []
+    try:
+        for future in futures:
+            spools.append(future.result())
+    except Exception:
+        for spool, _ in spools:
+            spool.close()
+        raise
+    (direct, direct_count), (relative, relative_count), \
+        (external, external_count), (packages, package_count) = spools
+    
+    # 1. Direct Imports
+    print("\n1. DIRECT IMPORTS")
+    print("-" * 80)
+    _print_spool(direct)
+    
+    print(f"Total direct imports: {direct_count}")
+    
+    # 2. Relative Imports
+    print("\n2. RELATIVE IMPORTS")
+    print("-" * 80)
+    _print_spool(relative)
+    
+    print(f"Total relative imports: {relative_count}")
+    
+    # 3. External Dependencies
+    print("\n3. EXTERNAL DEPENDENCIES")
+    print("-" * 80)
+    _print_spool(external)
+    
+    print(f"Total external dependencies: {external_count}")
+    
+    # 4. Package Dependencies
+    print("\n4. PACKAGE DEPENDENCIES")
+    print("-" * 80)
+    _print_spool(packages)
+    
+    print(f"Total package dependencies: {package_count}")
+    
+    # Summary
+    total_deps = direct_count + relative_count + external_count + package_count
+    print(f"\n" + "=" * 80)
+    print("DEPENDENCY SUMMARY")
+    print("=" * 80)
+    print(f"Direct imports:      {direct_count}")
+    print(f"Relative imports:    {relative_count}")
+    print(f"External dependencies: {external_count}")
+    print(f"Package dependencies: {package_count}")
+    print(f"Total dependencies:  {total_deps}")
+    print("=" * 80)
 
 
 def main():
@@ -387,18 +443,21 @@ def main():
         print("Connecting to Neo4j...")
         neo4j_manager.connect()
         
-        if args.comprehensive:
-            get_comprehensive_stats(neo4j_manager)
-        elif args.files:
-            get_all_files(neo4j_manager)
-        elif args.dependencies:
-            get_all_dependencies(neo4j_manager)
-        elif args.basic:
-            # Original basic statistics
-            print("\n1. Basic Database Statistics:")
-            print("-" * 40)
+        # Every query of the run shares one session on the configured database
+        with neo4j_manager.driver.session(database=neo4j_manager.database) as session:
+            create_indexes(session)
             
-            with neo4j_manager.driver.session() as session:
+            if args.comprehensive:
+                get_comprehensive_stats(session)
+            elif args.files:
+                get_all_files(session)
+            elif args.dependencies:
+                get_all_dependencies(neo4j_manager)
+            elif args.basic:
+                # Original basic statistics
+                print("\n1. Basic Database Statistics:")
+                print("-" * 40)
+                
                 # Count all nodes by type
                 result = session.run("""
                     MATCH (n)
@@ -412,36 +471,35 @@ def main():
                     count = record['count']
                     print(f"  {labels}: {count}")
             
-            # Get dependency statistics
-            print("\n2. Dependency Statistics:")
-            print("-" * 40)
-            
-            stats = neo4j_manager.get_dependency_statistics()
-            
-            print(f"Total files: {stats.get('total_files', 0)}")
-            print(f"Total dependencies: {stats.get('total_dependencies', 0)}")
-            
-            if 'dependencies_by_type' in stats:
-                print("\nDependencies by type:")
-                for dep_type, count in stats['dependencies_by_type'].items():
-                    print(f"  {dep_type}: {count}")
-            
-            if 'package_dependencies_by_manager' in stats:
-                print("\nPackage dependencies by manager:")
-                for manager, count in stats['package_dependencies_by_manager'].items():
-                    print(f"  {manager}: {count}")
-            
-            # Show sample relationships
-            print("\n3. Sample Dependencies:")
-            print("-" * 40)
-            
-            with neo4j_manager.driver.session() as session:
+                # Get dependency statistics
+                print("\n2. Dependency Statistics:")
+                print("-" * 40)
+                
+                stats = neo4j_manager.get_dependency_statistics()
+                
+                print(f"Total files: {stats.get('total_files', 0)}")
+                print(f"Total dependencies: {stats.get('total_dependencies', 0)}")
+                
+                if 'dependencies_by_type' in stats:
+                    print("\nDependencies by type:")
+                    for dep_type, count in stats['dependencies_by_type'].items():
+                        print(f"  {dep_type}: {count}")
+                
+                if 'package_dependencies_by_manager' in stats:
+                    print("\nPackage dependencies by manager:")
+                    for manager, count in stats['package_dependencies_by_manager'].items():
+                        print(f"  {manager}: {count}")
+                
+                # Show sample relationships
+                print("\n3. Sample Dependencies:")
+                print("-" * 40)
+                
                 # Direct imports
                 result = session.run("""
                     MATCH (source:File)-[r:DIRECT_IMPORTS]->(target)
                     RETURN source.path as source, target.path as target, r.import_statement as import_stmt
-                    LIMIT 5
-                """)
+                    LIMIT $limit
+                """, limit=SAMPLE_SIZE)
                 
                 print("Direct imports (sample):")
                 for record in result:
@@ -452,8 +510,8 @@ def main():
                 result = session.run("""
                     MATCH (source:File)-[r:RELATIVE_IMPORTS]->(target)
                     RETURN source.path as source, target.path as target, r.import_statement as import_stmt
-                    LIMIT 5
-                """)
+                    LIMIT $limit
+                """, limit=SAMPLE_SIZE)
                 
                 print("\nRelative imports (sample):")
                 for record in result:
@@ -464,8 +522,8 @@ def main():
                 result = session.run("""
                     MATCH (source:File)-[r:PACKAGE_DEPENDENCIES]->(target:Package)
                     RETURN source.path as source, target.name as package, target.version as version, r.package_manager as manager
-                    LIMIT 5
-                """)
+                    LIMIT $limit
+                """, limit=SAMPLE_SIZE)
                 
                 print("\nPackage dependencies (sample):")
                 for record in result:
@@ -475,32 +533,32 @@ def main():
                 result = session.run("""
                     MATCH (source:File)-[r:EXTERNAL_DEPENDENCIES]->(target:Module)
                     RETURN source.path as source, target.name as module, target.type as type
-                    LIMIT 5
-                """)
+                    LIMIT $limit
+                """, limit=SAMPLE_SIZE)
                 
                 print("\nExternal dependencies (sample):")
                 for record in result:
                     print(f"  {record['source']} -> {record['module']} ({record['type']})")
             
-            # Show most dependent files
-            print("\n4. Most Dependent Files:")
-            print("-" * 40)
-            
-            if 'most_dependent_files' in stats:
-                for file_path, count in list(stats['most_dependent_files'].items())[:5]:
-                    print(f"  {file_path}: {count} dependencies")
-            
-            # Show most depended on files
-            print("\n5. Most Depended On Files:")
-            print("-" * 40)
-            
-            if 'most_depended_on_files' in stats:
-                for file_path, count in list(stats['most_depended_on_files'].items())[:5]:
-                    print(f"  {file_path}: {count} dependents")
-            
-            print("\n" + "=" * 60)
-            print("Query completed successfully!")
-            print("=" * 60)
+                # Show most dependent files
+                print("\n4. Most Dependent Files:")
+                print("-" * 40)
+                
+                if 'most_dependent_files' in stats:
+                    for file_path, count in list(stats['most_dependent_files'].items())[:5]:
+                        print(f"  {file_path}: {count} dependencies")
+                
+                # Show most depended on files
+                print("\n5. Most Depended On Files:")
+                print("-" * 40)
+                
+                if 'most_depended_on_files' in stats:
+                    for file_path, count in list(stats['most_depended_on_files'].items())[:5]:
+                        print(f"  {file_path}: {count} dependents")
+                
+                print("\n" + "=" * 60)
+                print("Query completed successfully!")
+                print("=" * 60)
         
     except Exception as e:
         print(f"Error querying database: {e}")
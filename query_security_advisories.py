@@ -1,8 +1,113 @@
+import json
+import operator
+import os
+import re
+import sqlite3
+import threading
+import time
 import requests
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, List, Dict, Optional, Tuple
 from packaging import version as pkg_version
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import GITHUB_TOKEN
 
+# GitHub GraphQL API endpoint
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+# Packages looked up per GraphQL request by query_security_advisories_batch
+ADVISORY_BATCH_SIZE = 20
+# Batch requests in flight at once; kept low to stay clear of GitHub's secondary rate limit
+ADVISORY_CONCURRENCY = 4
+# Advisories per (ecosystem, package) are kept on disk and reused for this many seconds
+ADVISORY_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'github-scanner', 'advisories.sqlite')
+ADVISORY_CACHE_TTL = 6 * 3600
+# Tries per advisory request when GitHub rate limits it or answers with a transient error
+ADVISORY_MAX_ATTEMPTS = 5
+ADVISORY_RETRY_STATUSES = (429, 502, 503, 504)
+
+# Module name patterns used by detect_ecosystem; each indicator list is compiled into
+# one alternation so a name is classified in a single scan
+JAVA_PACKAGE_PREFIXES = ("org.", "com.", "javax.", "java.")
+PYTHON_INDICATORS_RE = re.compile("|".join(map(re.escape, [
+    "django", "flask", "numpy", "pandas", "requests", "scipy", "matplotlib",
+    "pytest", "sqlalchemy", "celery", "pillow", "beautifulsoup"
+])))
+JS_INDICATORS_RE = re.compile("|".join(map(re.escape, [
+    "react", "vue", "angular", "express", "lodash", "axios", "webpack",
+    "babel", "eslint", "jest"
+])))
+
+# Selection set of a securityVulnerabilities field
+ADVISORY_NODES_SELECTION = """{
+        nodes {
+          advisory {
+            ghsaId
+            summary
+            description
+            severity
+            publishedAt
+            updatedAt
+            references {
+              url
+            }
+            cvss {
+              score
+              vectorString
+            }
+          }
+          vulnerableVersionRange
+          firstPatchedVersion {
+            identifier
+          }
+        }
+      }"""
+
+
+# Comparison for each operator GitHub uses in vulnerableVersionRange
+_RANGE_OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+}
+
+
+@lru_cache(maxsize=4096)
+def _parse_version(version: str) -> pkg_version.Version:
+    """Parse a version string once; the same versions and bounds recur across advisories."""
+    return pkg_version.parse(version)
+
+
+@lru_cache(maxsize=4096)
+def _compile_range(vulnerable_range: str) -> Optional[Tuple[Tuple[Callable, pkg_version.Version], ...]]:
+    """
+    Compile a vulnerable range into the (comparison, bound) pairs a version must all satisfy.
+    
+    Args:
+        vulnerable_range: The vulnerable range (e.g., "< 2.1.0", ">= 1.0.0, < 2.0.0")
+    
+    Returns:
+        Tuple of (comparison, bound) pairs, or None if a simple range has no known operator
+    """
+    # Handle range cases (e.g., ">= 1.0.0, < 2.0.0"); parts with an unknown operator are ignored
+    if ", " in vulnerable_range:
+        conditions = []
+        for part in vulnerable_range.split(", "):
+            op, _, bound = part.strip().partition(" ")
+            if op in _RANGE_OPERATORS:
+                conditions.append((_RANGE_OPERATORS[op], _parse_version(bound)))
+        return tuple(conditions)
+    
+    # Handle simple cases
+    op, _, bound = vulnerable_range.partition(" ")
+    if op not in _RANGE_OPERATORS:
+        return None
+    return ((_RANGE_OPERATORS[op], _parse_version(bound)),)
+
 
 def is_version_affected(version: str, vulnerable_range: str) -> bool:
     """
@@ -17,55 +122,16 @@ def is_version_affected(version: str, vulnerable_range: str) -> bool:
     """
     try:
         # Parse the version
-        ver = pkg_version.parse(version)
+        ver = _parse_version(version)
         
-        # Handle range cases (e.g., ">= 1.0.0, < 2.0.0")
-        if ", " in vulnerable_range:
-            parts = vulnerable_range.split(", ")
-            # For ranges, ALL conditions must be true
-            for part in parts:
-                part = part.strip()
-                if part.startswith("< "):
-                    max_ver = pkg_version.parse(part[2:])
-                    if not (ver < max_ver):
-                        return False
-                elif part.startswith("<= "):
-                    max_ver = pkg_version.parse(part[3:])
-                    if not (ver <= max_ver):
-                        return False
-                elif part.startswith("> "):
-                    min_ver = pkg_version.parse(part[2:])
-                    if not (ver > min_ver):
-                        return False
-                elif part.startswith(">= "):
-                    min_ver = pkg_version.parse(part[3:])
-                    if not (ver >= min_ver):
-                        return False
-                elif part.startswith("= "):
-                    exact_ver = pkg_version.parse(part[2:])
-                    if not (ver == exact_ver):
-                        return False
-            return True
-        
-        # Handle simple cases
-        if vulnerable_range.startswith("< "):
-            max_ver = pkg_version.parse(vulnerable_range[2:])
-            return ver < max_ver
-        elif vulnerable_range.startswith("<= "):
-            max_ver = pkg_version.parse(vulnerable_range[3:])
-            return ver <= max_ver
-        elif vulnerable_range.startswith("> "):
-            min_ver = pkg_version.parse(vulnerable_range[2:])
-            return ver > min_ver
-        elif vulnerable_range.startswith(">= "):
-            min_ver = pkg_version.parse(vulnerable_range[3:])
-            return ver >= min_ver
-        elif vulnerable_range.startswith("= "):
-            exact_ver = pkg_version.parse(vulnerable_range[2:])
-            return ver == exact_ver
+        conditions = _compile_range(vulnerable_range)
         
         # If we can't parse it, don't assume affected
-        return False
+        if conditions is None:
+            return False
+        
+        # For ranges, ALL conditions must be true
+        return all(compare(ver, bound) for compare, bound in conditions)
         
     except Exception as e:
         # If parsing fails, print for debugging but don't assume affected
@@ -73,148 +139,312 @@ def is_version_affected(version: str, vulnerable_range: str) -> bool:
         return False
 
 
-def query_security_advisories(package_name: str, version: Optional[str] = None, ecosystem: str = "PIP") -> List[Dict]:
+# One keep-alive session for all advisory queries, so requests reuse the TLS connection;
+# the adapter only retries connection errors, status codes are handled by _post_with_retries
+_SESSION = requests.Session()
+_SESSION.mount('https://api.github.com', HTTPAdapter(
+    pool_connections=ADVISORY_CONCURRENCY, pool_maxsize=ADVISORY_CONCURRENCY,
+    max_retries=Retry(total=3, backoff_factor=0.5, allowed_methods=None)
+))
+_SESSION.headers.update({
+    "Authorization": f"Bearer {GITHUB_TOKEN}",
+    "Content-Type": "application/json"
+})
+
+# With httpx and h2 installed, queries go over one multiplexed HTTP/2 connection instead
+try:
+    import httpx
+    _HTTP2_CLIENT = httpx.Client(
+        http2=True, timeout=30,
+        limits=httpx.Limits(max_connections=ADVISORY_CONCURRENCY),
+        headers=dict(_SESSION.headers)
+    )
+    _HTTP_ERRORS = (requests.exceptions.RequestException, httpx.HTTPError)
+except ImportError:
+    _HTTP2_CLIENT = None
+    _HTTP_ERRORS = (requests.exceptions.RequestException,)
+
+
+def _post_with_retries(post: Callable, payload: Dict):
     """
-    Query GitHub Security Advisories GraphQL API for vulnerabilities in a package.
+    POST a GraphQL payload with the retry policy shared by both transports.
+    
+    A rate limited response (403 or 429 with Retry-After) waits the advertised time,
+    other transient errors back off exponentially, and the last response is returned
+    after at most ADVISORY_MAX_ATTEMPTS tries.
     
     Args:
-        package_name: Name of the package to check
-        version: Package version to check (optional)
-        ecosystem: Package ecosystem (PIP for Python, NPM for JavaScript, MAVEN for Java, etc.)
+        post: The transport's post function (_SESSION.post or the HTTP/2 client's)
+        payload: GraphQL query and variables
+    """
+    for attempt in range(ADVISORY_MAX_ATTEMPTS):
+        response = post(GITHUB_GRAPHQL_URL, json=payload)
+        if attempt == ADVISORY_MAX_ATTEMPTS - 1:
+            break
+        
+        retry_after = response.headers.get('Retry-After')
+        if response.status_code in (403, 429) and retry_after and retry_after.isdigit():
+            print(f"GitHub rate limit: waiting {retry_after}s")
+            time.sleep(float(retry_after))
+        elif response.status_code in ADVISORY_RETRY_STATUSES:
+            time.sleep(0.5 * 2 ** attempt)
+        else:
+            break
+    return response
+
+
+_cache_conn: Optional[sqlite3.Connection] = None
+_cache_lock = threading.Lock()
+
+
+def _advisory_cache() -> Optional[sqlite3.Connection]:
+    """Open the on-disk advisory cache on first use (None if it cannot be opened)."""
+    global _cache_conn
+    if _cache_conn is None:
+        try:
+            os.makedirs(os.path.dirname(ADVISORY_CACHE_PATH), exist_ok=True)
+            _cache_conn = sqlite3.connect(ADVISORY_CACHE_PATH, timeout=30, check_same_thread=False)
+            _cache_conn.execute(
+                "CREATE TABLE IF NOT EXISTS advisories ("
+                "ecosystem TEXT NOT NULL, package TEXT NOT NULL, fetched_at REAL NOT NULL, "
+                "payload TEXT NOT NULL, PRIMARY KEY (ecosystem, package))"
+            )
+            _cache_conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: Advisory cache unavailable: {e}")
+            return None
+    return _cache_conn
+
+
+def _read_cached_nodes(keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], List[Dict]]:
+    """
+    Return the cached securityVulnerabilities nodes that are younger than ADVISORY_CACHE_TTL.
+    
+    Args:
+        keys: (package_name, ecosystem) pairs
     
     Returns:
-        List of security advisories for the package
+        Dictionary mapping each fresh pair to its nodes; stale or missing pairs are absent
     """
+    conn = _advisory_cache()
+    if conn is None:
+        return {}
     
-    # GitHub GraphQL API endpoint
-    url = "https://api.github.com/graphql"
+    oldest = time.time() - ADVISORY_CACHE_TTL
+    cached = {}
+    with _cache_lock:
+        for package_name, ecosystem in keys:
+            row = conn.execute(
+                "SELECT payload FROM advisories WHERE ecosystem = ? AND package = ? AND fetched_at >= ?",
+                (ecosystem, package_name, oldest)
+            ).fetchone()
+            if row is not None:
+                cached[(package_name, ecosystem)] = json.loads(row[0])
+    return cached
+
+
+def _write_cached_nodes(nodes_by_package: Dict[Tuple[str, str], List[Dict]]):
+    """Store freshly fetched securityVulnerabilities nodes per (package_name, ecosystem)."""
+    conn = _advisory_cache()
+    if conn is None or not nodes_by_package:
+        return
     
-    # GraphQL query to search for security advisories
-    query = """
-    query($package: String!, $ecosystem: SecurityAdvisoryEcosystem!) {
-      securityVulnerabilities(
-        first: 100
-        package: $package
-        ecosystem: $ecosystem
-      ) {
-        nodes {
-          advisory {
-            ghsaId
-            summary
-            description
-            severity
-            publishedAt
-            updatedAt
-            references {
-              url
-            }
-            cvss {
-              score
-              vectorString
-            }
-          }
-          vulnerableVersionRange
-          firstPatchedVersion {
-            identifier
-          }
-        }
-      }
-    }
+    now = time.time()
+    with _cache_lock:
+        conn.executemany(
+            "INSERT OR REPLACE INTO advisories (ecosystem, package, fetched_at, payload) VALUES (?, ?, ?, ?)",
+            [(ecosystem, package_name, now, json.dumps(nodes))
+             for (package_name, ecosystem), nodes in nodes_by_package.items()]
+        )
+        conn.commit()
+
+
+def _format_advisories(vulnerabilities: List[Dict], version: Optional[str] = None) -> List[Dict]:
     """
+    Format securityVulnerabilities nodes, keeping only those affecting the version if one is given.
     
-    # Variables for the GraphQL query
-    variables = {
-        "package": package_name,
-        "ecosystem": ecosystem
-    }
+    Args:
+        vulnerabilities: Nodes returned by the securityVulnerabilities query
+        version: Package version to check (optional)
     
-    headers = {
-        "Authorization": f"Bearer {GITHUB_TOKEN}",
-        "Content-Type": "application/json"
-    }
+    Returns:
+        List of security advisories
+    """
+    advisories = []
+    for vuln in vulnerabilities:
+        if vuln and vuln.get("advisory"):
+            advisory = vuln["advisory"]
+            vulnerable_range = vuln.get("vulnerableVersionRange", "")
+            
+            # If version is provided, check if it's affected
+            if version and version != "Unknown":
+                # Simple check - in production, you'd want proper version comparison
+                # This checks if the version appears to be in the vulnerable range
+                if not is_version_affected(version, vulnerable_range):
+                    continue
+            
+            advisories.append({
+                "ghsa_id": advisory.get("ghsaId", ""),
+                "summary": advisory.get("summary", ""),
+                "description": advisory.get("description", ""),
+                "severity": advisory.get("severity", ""),
+                "published_at": advisory.get("publishedAt", ""),
+                "updated_at": advisory.get("updatedAt", ""),
+                "vulnerable_range": vulnerable_range,
+                "first_patched_version": vuln.get("firstPatchedVersion", {}).get("identifier", "") if vuln.get("firstPatchedVersion") else "",
+                "cvss_score": advisory.get("cvss", {}).get("score", 0) if advisory.get("cvss") else 0,
+                "cvss_vector": advisory.get("cvss", {}).get("vectorString", "") if advisory.get("cvss") else "",
+                "references": [ref["url"] for ref in advisory.get("references", [])]
+            })
     
+    return advisories
+
+
+def _post_graphql(query: str, variables: Dict) -> Optional[Dict]:
+    """
+    POST a query to the GitHub GraphQL API.
+    
+    Returns:
+        The response's data, or None if the request failed or returned errors
+    """
+    payload = {"query": query, "variables": variables}
     try:
-        response = requests.post(url, json={"query": query, "variables": variables}, headers=headers)
+        post = _HTTP2_CLIENT.post if _HTTP2_CLIENT is not None else _SESSION.post
+        response = _post_with_retries(post, payload)
         response.raise_for_status()
         
         data = response.json()
         
         if "errors" in data:
             print(f"GraphQL errors: {data['errors']}")
-            return []
+            return None
         
-        vulnerabilities = data.get("data", {}).get("securityVulnerabilities", {}).get("nodes", [])
+        return data.get("data", {})
         
-        # Format the results
-        advisories = []
-        for vuln in vulnerabilities:
-            if vuln and vuln.get("advisory"):
-                advisory = vuln["advisory"]
-                vulnerable_range = vuln.get("vulnerableVersionRange", "")
-                
-                # If version is provided, check if it's affected
-                if version and version != "Unknown":
-                    # Simple check - in production, you'd want proper version comparison
-                    # This checks if the version appears to be in the vulnerable range
-                    if not is_version_affected(version, vulnerable_range):
-                        continue
-                
-                advisories.append({
-                    "ghsa_id": advisory.get("ghsaId", ""),
-                    "summary": advisory.get("summary", ""),
-                    "description": advisory.get("description", ""),
-                    "severity": advisory.get("severity", ""),
-                    "published_at": advisory.get("publishedAt", ""),
-                    "updated_at": advisory.get("updatedAt", ""),
-                    "vulnerable_range": vulnerable_range,
-                    "first_patched_version": vuln.get("firstPatchedVersion", {}).get("identifier", "") if vuln.get("firstPatchedVersion") else "",
-                    "cvss_score": advisory.get("cvss", {}).get("score", 0) if advisory.get("cvss") else 0,
-                    "cvss_vector": advisory.get("cvss", {}).get("vectorString", "") if advisory.get("cvss") else "",
-                    "references": [ref["url"] for ref in advisory.get("references", [])]
-                })
-        
-        return advisories
-        
-    except requests.exceptions.RequestException as e:
+    except _HTTP_ERRORS as e:
         print(f"Error querying GitHub API: {e}")
-        return []
+        return None
     except Exception as e:
         print(f"Unexpected error: {e}")
+        return None
+
+
+def query_security_advisories(package_name: str, version: Optional[str] = None, ecosystem: str = "PIP") -> List[Dict]:
+    """
+    Query GitHub Security Advisories GraphQL API for vulnerabilities in a package.
+    
+    Args:
+        package_name: Name of the package to check
+        version: Package version to check (optional)
+        ecosystem: Package ecosystem (PIP for Python, NPM for JavaScript, MAVEN for Java, etc.)
+    
+    Returns:
+        List of security advisories for the package
+    """
+    
+    # Advisories change slowly, so a recent lookup of the package is reused
+    cached = _read_cached_nodes([(package_name, ecosystem)])
+    if cached:
+        return _format_advisories(cached[(package_name, ecosystem)], version)
+    
+    # GraphQL query to search for security advisories
+    query = f"""
+    query($package: String!, $ecosystem: SecurityAdvisoryEcosystem!) {{
+      securityVulnerabilities(first: 100, package: $package, ecosystem: $ecosystem) {ADVISORY_NODES_SELECTION}
+    }}
+    """
+    
+    # Variables for the GraphQL query
+    variables = {
+        "package": package_name,
+        "ecosystem": ecosystem
+    }
+    
+    data = _post_graphql(query, variables)
+    if data is None:
         return []
+    
+    vulnerabilities = (data.get("securityVulnerabilities") or {}).get("nodes", [])
+    _write_cached_nodes({(package_name, ecosystem): vulnerabilities})
+    return _format_advisories(vulnerabilities, version)
 
 
-def detect_ecosystem(module_name: str) -> str:
+def _query_advisory_batch(batch: List[Tuple[str, str]]) -> Dict[Tuple[str, str], List[Dict]]:
     """
-    Try to detect the ecosystem based on module name patterns.
-    This is a simple heuristic approach.
+    Fetch the securityVulnerabilities nodes of several packages in one aliased GraphQL request.
+    
+    Args:
+        batch: (package_name, ecosystem) pairs
+    
+    Returns:
+        Dictionary mapping each pair to its nodes (empty if the request failed)
     """
-    # Common Python packages
-    python_indicators = ["django", "flask", "numpy", "pandas", "requests", "scipy", "matplotlib", 
-                        "pytest", "sqlalchemy", "celery", "pillow", "beautifulsoup"]
+    declarations = []
+    fields = []
+    variables = {}
+    for i, (package_name, ecosystem) in enumerate(batch):
+        declarations.append(f"$p{i}: String!, $e{i}: SecurityAdvisoryEcosystem!")
+        fields.append(f"p{i}: securityVulnerabilities(first: 100, package: $p{i}, ecosystem: $e{i}) {ADVISORY_NODES_SELECTION}")
+        variables[f"p{i}"] = package_name
+        variables[f"e{i}"] = ecosystem
+    query = f"query({', '.join(declarations)}) {{\n" + "\n".join(fields) + "\n}"
     
-    # Common Java packages
-    java_indicators = ["org.springframework", "com.google", "org.apache", "javax", "java.", 
-                      "org.junit", "org.hibernate"]
+    data = _post_graphql(query, variables)
+    if data is None:
+        return {}
+    return {key: (data.get(f"p{i}") or {}).get("nodes", []) for i, key in enumerate(batch)}
+
+
+def query_security_advisories_batch(packages: List[Tuple[str, Optional[str], str]]) -> Dict[Tuple[str, Optional[str], str], List[Dict]]:
+    """
+    Query advisories for many packages, ADVISORY_BATCH_SIZE packages per GraphQL request.
     
-    # Common JavaScript packages
-    js_indicators = ["react", "vue", "angular", "express", "lodash", "axios", "webpack", 
-                    "babel", "eslint", "jest"]
+    Each request holds one aliased securityVulnerabilities field per (package, ecosystem);
+    versions of the same package share that field. Packages looked up within
+    ADVISORY_CACHE_TTL are served from the on-disk cache without a request.
     
-    module_lower = module_name.lower()
+    Args:
+        packages: (package_name, version, ecosystem) tuples
+    
+    Returns:
+        Dictionary mapping each input tuple to its list of security advisories
+    """
+    unique = list(dict.fromkeys((package_name, ecosystem) for package_name, _, ecosystem in packages))
+    nodes_by_package = _read_cached_nodes(unique)
+    uncached = [key for key in unique if key not in nodes_by_package]
+    batches = [uncached[start:start + ADVISORY_BATCH_SIZE] for start in range(0, len(uncached), ADVISORY_BATCH_SIZE)]
+    
+    # Batches are independent requests, so a few are kept in flight at once
+    fetched: Dict[Tuple[str, str], List[Dict]] = {}
+    with ThreadPoolExecutor(max_workers=ADVISORY_CONCURRENCY) as executor:
+        for batch_nodes in executor.map(_query_advisory_batch, batches):
+            fetched.update(batch_nodes)
+    _write_cached_nodes(fetched)
+    nodes_by_package.update(fetched)
     
+    # Packages whose request failed have no nodes and are not cached
+    return {
+        (package_name, version, ecosystem): _format_advisories(nodes_by_package.get((package_name, ecosystem), []), version)
+        for package_name, version, ecosystem in packages
+    }
+
+
+def detect_ecosystem(module_name: str) -> str:
+    """
+    Try to detect the ecosystem based on module name patterns.
+    This is a simple heuristic approach.
+    """
     # Check for Java-style package names
-    if "." in module_name and (module_name.startswith("org.") or module_name.startswith("com.") or 
-                               module_name.startswith("javax.") or module_name.startswith("java.")):
+    if "." in module_name and module_name.startswith(JAVA_PACKAGE_PREFIXES):
         return "MAVEN"
     
     # Check against known patterns
-    for indicator in python_indicators:
-        if indicator in module_lower:
-            return "PIP"
+    module_lower = module_name.lower()
+    if PYTHON_INDICATORS_RE.search(module_lower):
+        return "PIP"
     
-    for indicator in js_indicators:
-        if indicator in module_lower:
-            return "NPM"
+    if JS_INDICATORS_RE.search(module_lower):
+        return "NPM"
     
     # Default to PIP for this Flask project
     return "PIP"
@@ -233,12 +463,15 @@ if __name__ == "__main__":
         print("Warning: No GitHub token found. API rate limits will be very restrictive.")
         print("Set GITHUB_PAT environment variable for better results.\n")
     
-    for package, version in test_packages:
+    # All packages are looked up together, in a single GraphQL request
+    packages = [(package, version, detect_ecosystem(package)) for package, version in test_packages]
+    advisories_by_package = query_security_advisories_batch(packages)
+    
+    for package, version, ecosystem in packages:
         print(f"\nChecking security advisories for: {package} version {version}")
         print("-" * 60)
         
-        ecosystem = detect_ecosystem(package)
-        advisories = query_security_advisories(package, version, ecosystem)
+        advisories = advisories_by_package[(package, version, ecosystem)]
         
         if advisories:
             print(f"Found {len(advisories)} security advisories affecting version {version}:")
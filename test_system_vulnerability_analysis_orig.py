@@ -115,7 +115,7 @@ class SystemVulnerabilityTests(unittest.TestCase):
             try:
                 # Delete any existing checkpoint file first
                 import os
-                checkpoint_file = 'traversal_checkpoint.pkl'
+                checkpoint_file = 'traversal_checkpoint.jsonl'
                 if os.path.exists(checkpoint_file):
                     os.remove(checkpoint_file)
                 
@@ -4,7 +4,7 @@ Vulnerability Scanner - Scans external dependencies for security advisories.
 
 from typing import List, Tuple, Dict, Any
 from get_external_dependencies import get_external_dependencies
-from query_security_advisories import query_security_advisories, detect_ecosystem
+from query_security_advisories import query_security_advisories_batch, detect_ecosystem
 import json
 
 
@@ -23,14 +23,19 @@ def get_vulnerable_packages() -> List[Tuple[str, str, List[Dict[str, Any]]]]:
     vulnerable_packages = []
     
     print(f"Checking {len(dependencies)} dependencies for vulnerabilities...")
-    for package_name, version in dependencies:
-        # Skip packages without version info
-        if version == "Unknown":
-            continue
-            
-        # Detect ecosystem and query advisories
-        ecosystem = detect_ecosystem(package_name)
-        advisories = query_security_advisories(package_name, version, ecosystem)
+    # Skip packages without version info, and detect each package's ecosystem
+    packages = [
+        (package_name, version, detect_ecosystem(package_name))
+        for package_name, version in dependencies
+        if version != "Unknown"
+    ]
+    
+    # Query advisories for many packages per request
+    advisories_by_package = query_security_advisories_batch(packages)
+    
+    for package in packages:
+        package_name, version, _ = package
+        advisories = advisories_by_package[package]
         
         # Only include packages with vulnerabilities
         if advisories: